@@ -1,26 +1,595 @@
 import argparse
 import asyncio
 import os
+import random
+import sys
 import time
+from collections.abc import Callable, Iterator
+from dataclasses import replace
 
-import httpx
+import orjson
+import psutil
 
+from type.comparison import Estimate
+from type.prompt import Prompt
+from type.report import Report
+from type.request import RequestResult
+from type.metrics import Deadline, ResourceUsage, RunPhase, ServerMetrics, TimeSeries
 from type.run_args import Args
-from utils.client_openai import build_payload, request_openai_format
-from utils.datasets import build_dataset
+from type.samples import Samples
+from type.timeline import Timeline
+from utils.arrival import build_arrival_schedule
+from utils.backends import LoadBalancer, backend_urls, build_load_balancer
+from utils.client_openai import (
+    build_payload,
+    encode_payload,
+    request_openai_format,
+)
+from utils.compare import (
+    build_comparison_report,
+    compare_estimates,
+    comparison_status,
+    estimates_from_log,
+    estimates_from_report,
+    print_comparison_report,
+    save_comparison_report_as_file,
+)
+from utils.datasets import build_dataset, dataset_label, parse_bucket_edges
 from utils.errors import save_error_as_file
+from utils.goodput import (
+    SLOTracker,
+    build_goodput_report,
+    evaluate_slos,
+    parse_slos,
+    print_goodput_report,
+    save_goodput_report_as_file,
+    slos_met,
+)
+from utils.http_client import H2_AVAILABLE, pool_size
+from utils.live_metrics import LiveMetrics, serve_live_metrics
+from utils.profiler import PROFILE_MODES, ClientProfiler, profile_path
 from utils.progress import text_progress_bar
 from utils.reporting import (
     generate_test_report,
+    print_test_report,
     save_report_as_file,
     generate_cv_style_report,
     save_cv_style_report_as_file,
     print_cv_style_report,
 )
 from utils.resource_monitor import ResourceMonitor
+from utils.result_log import (
+    ResultLog,
+    args_from_log,
+    is_result_log,
+    load_result_log,
+    log_header,
+    logged_duration,
+    samples_from_log,
+    timeline_from_log,
+)
+from utils.runner import build_request_target, run_load, run_load_multiprocess, time_bound
+from utils.server_metrics import (
+    PhaseCorrelator,
+    ServerMetricsScraper,
+    summarize_server_metrics,
+)
+from utils.steady_state import detect_steady_window, phase_row, window_samples
+from utils.sweep import (
+    build_sweep_report,
+    parse_concurrency_levels,
+    print_sweep_report,
+    save_sweep_report_as_file,
+)
+from utils.timeseries import build_timeseries, runner_breakdown
+from utils.trace import load_trace
+
+
+def build_schedule(args: Args) -> list[float] | None:
+    if args.trace:
+        offsets, _ = load_trace(args.trace, args.trace_speed, args.trace_time_unit, args.seed)
+        return list(offsets)
+    if args.request_rate <= 0:
+        return None
+    return build_arrival_schedule(
+        request_rate=args.request_rate,
+        distribution=args.arrival_distribution,
+        burstiness=args.burstiness,
+        seed=args.seed,
+        num_request=args.num_request,
+        duration=args.duration_time,
+    )
+
+
+def trace_span(args: Args) -> float | None:
+    # The trace may be gone when a report is rebuilt from a result log
+    if not args.trace or not os.path.isfile(args.trace):
+        return None
+    offsets, _ = load_trace(args.trace, args.trace_speed, args.trace_time_unit, args.seed)
+    return offsets[-1]
+
+
+def client_concurrency(args: Args) -> int:
+    # One client serves every sweep level / search step, so size it for the largest
+    if args.concurrency_sweep:
+        return args.concurrency_sweep[-1]
+    if args.goodput_search == "concurrency":
+        return int(args.search_max)
+    return args.concurrency
+
+
+def build_report(
+    args: Args,
+    samples: Samples,
+    total_requests: int,
+    duration: float,
+    server_metrics: ServerMetrics | None = None,
+    resources: ResourceUsage | None = None,
+    phases: list[RunPhase] | None = None,
+) -> Report:
+    return generate_test_report(
+        model=args.model,
+        max_tokens=args.max_tokens,
+        num_concurrency=args.concurrency,
+        # Sessions count as one unit of the budget but send one request per turn
+        requests=samples.num_requests if args.multi_turn else total_requests,
+        duration=duration,
+        dataset=dataset_label(args),
+        prompt=args.prompt,
+        ttft_hist=samples.ttft,
+        latency_hist=samples.latency,
+        token_hist=samples.token,
+        request_rate=args.request_rate if args.request_rate > 0 else None,
+        schedule_lag_hist=samples.schedule_lag,
+        client_cpu_time=samples.client_cpu_time,
+        num_chunks=samples.num_chunks,
+        itl_hist=samples.itl,
+        tpot_hist=samples.tpot,
+        decode_speed_hist=samples.decode_speed,
+        num_sessions=samples.num_sessions if args.multi_turn else None,
+        ttft_first_turn_hist=samples.ttft_first_turn,
+        ttft_follow_up_hist=samples.ttft_follow_up,
+        trace_speed=args.trace_speed if args.trace else None,
+        trace_span=trace_span(args),
+        pool_wait_hist=samples.pool_wait,
+        connect_hist=samples.connect,
+        response_headers_hist=samples.response_headers,
+        new_connections=samples.num_new_connections,
+        max_connections=pool_size(args, args.concurrency),
+        http2=args.http2,
+        backends=samples.backends,
+        server_metrics=server_metrics,
+        resources=resources,
+        loop_lag_hist=samples.loop_lag,
+        chunk_processing_hist=samples.chunk_processing,
+        loop_lag_threshold=args.loop_lag_threshold,
+        prompt_tokens_hist=samples.prompt_tokens,
+        output_tokens_hist=samples.output_tokens,
+        num_deltas=samples.num_deltas,
+        num_missing_usage=samples.num_missing_usage,
+        usage_fallback=args.usage_fallback,
+        phases=phases,
+        deadline=deadline_summary(args, samples),
+        timeseries=report_timeseries(args, samples),
+    )
+
+
+def build_cv_report(
+    args: Args,
+    samples: Samples,
+    total_requests: int,
+    duration: float,
+    resource_stats: dict | None,
+    server_metrics: ServerMetrics | None = None,
+    resources: ResourceUsage | None = None,
+    phases: list[RunPhase] | None = None,
+) -> dict:
+    return generate_cv_style_report(
+        model=args.model,
+        dataset=dataset_label(args) or args.prompt,
+        concurrency=args.concurrency,
+        total_requests=samples.num_requests if args.multi_turn else total_requests,
+        duration_s=duration,
+        ttft_hist=samples.ttft,
+        latency_hist=samples.latency,
+        token_hist=samples.token,
+        provider=None,
+        resource_stats=resource_stats,
+        request_rate=args.request_rate if args.request_rate > 0 else None,
+        schedule_lag_hist=samples.schedule_lag,
+        client_cpu_time=samples.client_cpu_time,
+        num_chunks=samples.num_chunks,
+        itl_hist=samples.itl,
+        tpot_hist=samples.tpot,
+        decode_speed_hist=samples.decode_speed,
+        num_sessions=samples.num_sessions if args.multi_turn else None,
+        ttft_first_turn_hist=samples.ttft_first_turn,
+        ttft_follow_up_hist=samples.ttft_follow_up,
+        trace_speed=args.trace_speed if args.trace else None,
+        trace_span=trace_span(args),
+        pool_wait_hist=samples.pool_wait,
+        connect_hist=samples.connect,
+        response_headers_hist=samples.response_headers,
+        new_connections=samples.num_new_connections,
+        max_connections=pool_size(args, args.concurrency),
+        http2=args.http2,
+        backends=samples.backends,
+        server_metrics=server_metrics,
+        resources=resources,
+        loop_lag_hist=samples.loop_lag,
+        chunk_processing_hist=samples.chunk_processing,
+        loop_lag_threshold=args.loop_lag_threshold,
+        prompt_tokens_hist=samples.prompt_tokens,
+        output_tokens_hist=samples.output_tokens,
+        num_deltas=samples.num_deltas,
+        num_missing_usage=samples.num_missing_usage,
+        usage_fallback=args.usage_fallback,
+        phases=phases,
+        deadline=deadline_summary(args, samples),
+        timeseries=report_timeseries(args, samples),
+        runners=runner_breakdown(
+            samples.timeline, args.concurrency, duration, samples.measured_span
+        ),
+    )
+
+
+def report_timeseries(args: Args, samples: Samples) -> TimeSeries | None:
+    # Over the whole run, including ramp, tail and drain
+    if args.timeseries_interval <= 0:
+        return None
+    return build_timeseries(samples.timeline, args.timeseries_interval)
+
+
+def deadline_summary(args: Args, samples: Samples) -> Deadline | None:
+    """How a duration run ended at its hard deadline; None for other runs."""
+    if not time_bound(args):
+        return None
+    window = float(args.duration_time)
+    ends = samples.timeline.columns["end"]
+    if args.deadline_policy == "drain":
+        in_flight = sum(1 for end in ends if end > window)
+    else:
+        in_flight = samples.num_cut_off
+    return Deadline(
+        policy=args.deadline_policy,
+        window=window,
+        in_flight=in_flight,
+        partial_tokens=samples.cut_off_tokens,
+        overrun=round(max(max(ends, default=0.0) - window, 0.0), 2),
+    )
+
+
+def measured_span(args: Args, timeline: Timeline, duration: float) -> tuple[float, float, float]:
+    """
+    The measured window ``(start, end)`` of a run and its deadline: up to
+    the deadline of a duration run, after the concurrency ramp, and with
+    ``steady_state`` the detected steady span, cutting the start-up and the
+    tail of stragglers.
+    """
+    ramp_time = args.ramp_time if args.request_rate <= 0 and not args.trace else 0.0
+    # Requests drained after a duration run's deadline stay out of the window
+    deadline = min(float(args.duration_time), duration) if time_bound(args) else duration
+    start, end = min(ramp_time, deadline), deadline
+    if args.steady_state:
+        detected = detect_steady_window(
+            timeline, deadline, args.steady_window, args.steady_tolerance, start_after=start
+        )
+        if detected is None:
+            print(
+                f"\n❗ Run too short to detect steady state (needs {3 * args.steady_window} s "
+                "after the ramp), reporting the whole run after the ramp"
+            )
+        else:
+            start, end = detected
+    return start, end, deadline
+
+
+def measurement_window(
+    args: Args,
+    samples: Samples,
+    total_requests: int,
+    duration: float,
+    warmup: RunPhase | None = None,
+) -> tuple[Samples, int, float, list[RunPhase] | None]:
+    """
+    Restrict the headline figures to the ``measured_span`` of the run.
+    Returns the samples, request count and duration to report, and the
+    phases the run was split into (None when nothing was trimmed).
+    """
+    start, end, deadline = measured_span(args, samples.timeline, duration)
+    if warmup is None and not args.steady_state and start == 0 and end == duration:
+        return samples, total_requests, duration, None
+
+    timeline = samples.timeline
+    phases = [warmup] if warmup is not None else []
+    if start > 0:
+        phases.append(phase_row("ramp-up", timeline, 0.0, start))
+    phases.append(phase_row("steady" if args.steady_state else "measured", timeline, start, end))
+    if end < deadline:
+        phases.append(phase_row("tail", timeline, end, deadline))
+    if deadline < duration and args.deadline_policy == "drain":
+        phases.append(phase_row("drain", timeline, deadline, duration))
+    if len(phases) == 1 and not args.steady_state:
+        # Only cut at the deadline, nothing else to show
+        phases = None
+    if start == 0 and end == duration:
+        return samples, total_requests, duration, phases
+
+    window, requests = window_samples(samples, start, end, backend_urls(args))
+    if end < deadline:
+        # Streams cut off at the deadline fall in the trimmed tail
+        window.cut_off_tokens = 0
+    return window, requests, end - start, phases
+
+
+async def run_warmup(
+    args: Args,
+    balancer: LoadBalancer,
+    datasets_cycle: Iterator[Prompt],
+    live_metrics: LiveMetrics | None = None,
+) -> RunPhase | None:
+    """Run ``warmup_requests`` requests or ``warmup_time`` seconds of load that stay out of the report."""
+    if not args.warmup_requests and not args.warmup_time:
+        return None
+    print(
+        f"\n🔥 Warm-up: {args.warmup_requests} requests"
+        if args.warmup_requests
+        else f"\n🔥 Warm-up: {args.warmup_time} s"
+    )
+    warmup_args = replace(
+        args,
+        num_request=args.warmup_requests,
+        duration_time=args.warmup_time,
+        ramp_time=0.0,
+    )
+    samples = Samples()
+    start, end = await run_benchmark(
+        args=warmup_args,
+        balancer=balancer,
+        datasets_cycle=datasets_cycle,
+        samples=samples,
+        schedule=build_schedule(warmup_args),
+        live_metrics=live_metrics,
+    )
+    print()
+    return phase_row("warm-up", samples.timeline, 0.0, end - start)
+
+
+async def run_benchmark(
+    args: Args,
+    balancer: LoadBalancer,
+    datasets_cycle: Iterator[Prompt],
+    samples: Samples,
+    schedule: list[float] | None = None,
+    show_progress: bool = True,
+    on_result: Callable[[RequestResult], None] | None = None,
+    stop: asyncio.Event | None = None,
+    result_log: ResultLog | None = None,
+    live_metrics: LiveMetrics | None = None,
+) -> tuple[float, float]:
+    """
+    Run one load phase with ``args`` and return its start and end
+    ``time.perf_counter()`` values. ``on_result``, ``stop`` and
+    ``result_log`` are only honoured in single-process mode; worker
+    processes write their own result logs.
+    """
+    total_requests = len(schedule) if schedule is not None else args.num_request
+    counted = schedule is not None or args.num_request >= 1
+    start = time.perf_counter()
+
+    def print_progress(progress: int):
+        print(
+            f"\r{text_progress_bar(progress=progress, total=total_requests)} {progress}/{total_requests}",
+            end="",
+            flush=True,
+        )
+
+    def print_elapsed(progress: int):
+        elapsed = min(int(time.perf_counter() - start), args.duration_time)
+        print(
+            f"\rElapsed time: {elapsed}/{args.duration_time} sec",
+            end="",
+            flush=True,
+        )
+
+    if args.workers > 1:
+        start, end = await run_load_multiprocess(
+            args=args,
+            samples=samples,
+            schedule=schedule,
+            on_progress=(print_progress if counted else print_elapsed)
+            if show_progress
+            else None,
+            live_metrics=live_metrics,
+        )
+    else:
+        progress = 0
+
+        def count_progress():
+            nonlocal progress
+            progress += 1
+            print_progress(progress)
+
+        await run_load(
+            args=args,
+            balancer=balancer,
+            datasets_cycle=datasets_cycle,
+            samples=samples,
+            concurrency=args.concurrency,
+            num_request=args.num_request,
+            schedule=schedule,
+            dispatch_start=start,
+            on_request_done=count_progress if counted and show_progress else None,
+            show_timer=show_progress,
+            on_result=on_result,
+            stop=stop,
+            result_log=result_log,
+            metrics=live_metrics.recorder() if live_metrics is not None else None,
+        )
+        end = time.perf_counter()
+    if show_progress:
+        print()
+    return start, end
+
+
+async def run_concurrency_sweep(
+    args: Args,
+    balancer: LoadBalancer,
+    datasets_cycle: Iterator[Prompt],
+    live_metrics: LiveMetrics | None = None,
+) -> None:
+    reports: list[Report] = list()
+    error_record: list[dict] = list()
+
+    for level in args.concurrency_sweep:
+        level_args = replace(args, concurrency=level)
+        samples = Samples()
+        print(f"\n===== 🏃 Concurrency {level} =====")
+        start, end = await run_benchmark(
+            args=level_args,
+            balancer=balancer,
+            datasets_cycle=datasets_cycle,
+            samples=samples,
+            live_metrics=live_metrics,
+        )
+        samples, total_requests, duration, _ = measurement_window(
+            args=level_args,
+            samples=samples,
+            total_requests=samples.num_requests,
+            duration=end - start,
+        )
+        report = build_report(
+            args=level_args,
+            samples=samples,
+            total_requests=total_requests,
+            duration=duration,
+        )
+        reports.append(report)
+        error_record.extend(samples.error_record)
+        print(
+            f"req/s: {report.request_per_sec}, tok/s: {report.throughput_token}, "
+            f"P50 ttft (ms): {report.ttft.p50_ttft}"
+        )
+
+    sweep_report = build_sweep_report(
+        model=args.model,
+        dataset=dataset_label(args) or args.prompt,
+        reports=reports,
+        min_efficiency=args.knee_threshold,
+    )
+    print_sweep_report(sweep_report)
+
+    if error_record:
+        await save_error_as_file(error_data=error_record)
+        print(
+            "\n❗ Some errors received during the benchmark test, recorded in error.jsonl"
+        )
+
+    if args.output_file:
+        await save_sweep_report_as_file(data=sweep_report, save_path=args.output_file)
+        print(f"\n📄 Save report file in {args.output_file}")
+
+
+async def run_goodput_search(
+    args: Args,
+    balancer: LoadBalancer,
+    datasets_cycle: Iterator[Prompt],
+    live_metrics: LiveMetrics | None = None,
+) -> None:
+    steps: list[dict] = list()
+    error_record: list[dict] = list()
+
+    async def run_step(load: float) -> bool:
+        if args.goodput_search == "concurrency":
+            step_args = replace(args, concurrency=int(load))
+        else:
+            step_args = replace(args, request_rate=load)
+        schedule = build_schedule(step_args)
+        total_requests = len(schedule) if schedule is not None else args.num_request
+        tracker = SLOTracker(
+            slos=args.slo,
+            # Early stop needs a known step size; duration runs go to the end
+            total_requests=total_requests if total_requests >= 1 else None,
+        )
+        samples = Samples()
+
+        print(f"\n===== 🏃 {args.goodput_search} {load} =====")
+        start, end = await run_benchmark(
+            args=step_args,
+            balancer=balancer,
+            datasets_cycle=datasets_cycle,
+            samples=samples,
+            schedule=schedule,
+            on_result=tracker.observe,
+            stop=tracker.stop,
+            live_metrics=live_metrics,
+        )
+        duration = end - start
+        stopped_early = tracker.stop.is_set()
+        # An early stop only fires once the step cannot pass; the verdict is
+        # still the percentile of what was measured
+        failures = samples.num_requests - samples.latency.count
+        passed = slos_met(samples, args.slo, failures)
+        error_record.extend(samples.error_record)
+        steps.append(
+            {
+                "Load": load,
+                "Passed": passed,
+                "Stopped early": stopped_early,
+                "Successful requests": samples.latency.count,
+                "Request per second (req/s)": round(samples.latency.count / duration, 2),
+                "Goodput (req/s)": round(tracker.met / duration, 2),
+                "Observed (ms)": evaluate_slos(samples, args.slo, failures),
+            }
+        )
+        print(
+            f"{'✅ SLO met' if passed else '❌ SLO violated'}"
+            f"{' (stopped early)' if stopped_early else ''}: {steps[-1]['Observed (ms)']}"
+        )
+        return passed
+
+    # Bisection over offered load, assuming the SLO holds below some knee
+    is_concurrency = args.goodput_search == "concurrency"
+    lo = int(args.search_min) if is_concurrency else args.search_min
+    hi = int(args.search_max) if is_concurrency else args.search_max
+    tolerance = max(args.search_tolerance, 1) if is_concurrency else args.search_tolerance
+
+    if await run_step(lo) and not await run_step(hi):
+        for _ in range(args.search_max_steps):
+            if hi - lo <= tolerance:
+                break
+            mid = (lo + hi) // 2 if is_concurrency else round((lo + hi) / 2, 3)
+            if await run_step(mid):
+                lo = mid
+            else:
+                hi = mid
+
+    goodput_report = build_goodput_report(
+        model=args.model,
+        dataset=dataset_label(args) or args.prompt,
+        slos=args.slo,
+        search=args.goodput_search,
+        steps=sorted(steps, key=lambda step: step["Load"]),
+    )
+    print_goodput_report(goodput_report)
+
+    if error_record:
+        await save_error_as_file(error_data=error_record)
+        print(
+            "\n❗ Some errors received during the benchmark test, recorded in error.jsonl"
+        )
+
+    if args.output_file:
+        await save_goodput_report_as_file(
+            data=goodput_report, save_path=args.output_file
+        )
+        print(f"\n📄 Save report file in {args.output_file}")
 
 
 async def main(args: Args) -> None:
+    if args.base_url_file:
+        assert os.path.isfile(args.base_url_file), f"base_url_file {args.base_url_file} not found."
+    assert backend_urls(args), "base_url or base_url_file must name at least one server."
     assert args.concurrency >= 1, (
         f"concurrency is {args.concurrency}, must be greater than or equal to 1."
     )
@@ -33,206 +602,269 @@ async def main(args: Args) -> None:
     assert args.temperature >= 0.0, (
         f"temperature is {args.temperature}, must be greater than or equal 0.0."
     )
+    assert args.workers >= 1, (
+        f"workers is {args.workers}, must be greater than or equal to 1."
+    )
+    assert args.request_rate > 0 or args.concurrency >= args.workers, (
+        f"concurrency is {args.concurrency}, must be at least workers ({args.workers}) in closed-loop mode."
+    )
+    assert args.request_rate >= 0.0, (
+        f"request_rate is {args.request_rate}, must be greater than or equal 0.0."
+    )
+    assert args.num_prompts >= 0, (
+        f"num_prompts is {args.num_prompts}, must be greater than or equal 0."
+    )
+    assert not args.max_input_tokens or args.min_input_tokens <= args.max_input_tokens, (
+        f"min_input_tokens ({args.min_input_tokens}) is above max_input_tokens ({args.max_input_tokens})."
+    )
+    assert not args.max_output_tokens or args.min_output_tokens <= args.max_output_tokens, (
+        f"min_output_tokens ({args.min_output_tokens}) is above max_output_tokens ({args.max_output_tokens})."
+    )
+    if args.input_len > 0:
+        assert args.input_len_std >= 0, "input_len_std must be greater than or equal 0."
+        assert 0.0 <= args.shared_prefix_ratio <= 1.0, (
+            f"shared_prefix_ratio is {args.shared_prefix_ratio}, must be within [0, 1]."
+        )
+    assert not args.http2 or H2_AVAILABLE, "http2 needs the h2 package (pip install 'httpx[http2]')."
+    assert args.max_connections >= 0, (
+        f"max_connections is {args.max_connections}, must be greater than or equal 0."
+    )
+    if args.trace:
+        assert os.path.isfile(args.trace), f"trace file {args.trace} not found."
+        assert args.trace_speed > 0, f"trace_speed is {args.trace_speed}, must be greater than 0."
+        assert args.request_rate == 0, "trace sets the arrival schedule, drop request_rate."
+        assert not args.concurrency_sweep and not args.goodput_search and not args.multi_turn, (
+            "trace replays one recorded run, drop concurrency_sweep / goodput_search / multi_turn."
+        )
+    if args.multi_turn:
+        assert os.path.isfile(args.dataset_path), "multi_turn replays conversations from dataset_path."
+        assert args.endpoint == "/v1/chat/completions", "multi_turn needs the chat endpoint."
+        assert args.think_time >= 0, "think_time must be greater than or equal 0."
+    assert args.server_metrics_interval > 0, (
+        f"server_metrics_interval is {args.server_metrics_interval}, must be greater than 0."
+    )
+    assert args.resource_interval > 0, (
+        f"resource_interval is {args.resource_interval}, must be greater than 0."
+    )
+    if args.monitor_pid:
+        assert psutil.pid_exists(args.monitor_pid), f"monitor_pid {args.monitor_pid} is not running."
+    assert 0 <= args.metrics_port <= 65535, f"metrics_port {args.metrics_port} is not a valid port."
+    assert args.warmup_requests >= 0 and args.warmup_time >= 0, "warm-up must not be negative."
+    assert not (args.warmup_requests and args.warmup_time), (
+        "warmup_requests and warmup_time are exclusive."
+    )
+    assert args.ramp_time >= 0 and args.ramp_steps >= 0, "ramp_time / ramp_steps must not be negative."
+    if args.ramp_time:
+        assert args.request_rate == 0 and not args.trace, (
+            "ramp_time ramps closed-loop concurrency, drop request_rate / trace."
+        )
+    if args.warmup_requests or args.warmup_time or args.ramp_time or args.steady_state:
+        assert not args.concurrency_sweep and not args.goodput_search, (
+            "warm-up, ramp and steady_state apply to a single run, drop concurrency_sweep / goodput_search."
+        )
+        assert not args.trace or not (args.warmup_requests or args.warmup_time), (
+            "a trace replay has no warm-up, drop warmup_requests / warmup_time."
+        )
+    assert args.steady_window >= 1, f"steady_window is {args.steady_window}, must be at least 1."
+    assert args.timeseries_interval >= 0, (
+        f"timeseries_interval is {args.timeseries_interval}, must not be negative."
+    )
+    assert 0 < args.steady_tolerance < 1, (
+        f"steady_tolerance is {args.steady_tolerance}, must be within (0, 1)."
+    )
+    assert args.loop_lag_threshold > 0, (
+        f"loop_lag_threshold is {args.loop_lag_threshold}, must be greater than 0."
+    )
+    if args.profile:
+        assert args.workers == 1, "profile covers the load generator in this process, drop workers."
+        assert not args.concurrency_sweep and not args.goodput_search, (
+            "profile records a single run, drop concurrency_sweep / goodput_search."
+        )
+    if args.result_log:
+        assert not args.concurrency_sweep and not args.goodput_search, (
+            "result_log records a single run, drop concurrency_sweep / goodput_search."
+        )
+    if args.goodput_search:
+        assert args.slo, "goodput_search needs at least one --slo."
+        assert args.workers == 1, "goodput_search runs in a single process, drop workers."
+        assert not args.concurrency_sweep, "goodput_search and concurrency_sweep are exclusive."
+        assert 0 < args.search_min < args.search_max, (
+            f"search range ({args.search_min}, {args.search_max}) must satisfy 0 < search_min < search_max."
+        )
+        assert args.goodput_search == "request_rate" or args.request_rate == 0, (
+            "goodput_search concurrency runs closed-loop, drop request_rate."
+        )
+    if args.concurrency_sweep:
+        assert args.request_rate == 0, "concurrency_sweep runs closed-loop, drop request_rate."
+        assert args.concurrency_sweep[0] >= args.workers, (
+            f"every concurrency_sweep level must be at least workers ({args.workers})."
+        )
 
     print("\n🛠️  Building datasets")
-    test_datasets_cycle = await build_dataset(
-        path=args.dataset_path, prompt=args.prompt
-    )
+    test_datasets_cycle = await build_dataset(args)
 
-    url = args.base_url.strip("/") + args.endpoint
-    headers = {"Content-Type": "application/json"}
-    if args.api_key is not None:
-        headers.update({"Authorization": f"Bearer {args.api_key}"})
-    completion_type = "chat" if args.endpoint == "/v1/chat/completions" else "generate"
+    headers, completion_type = build_request_target(args)
 
-    semaphore = asyncio.Semaphore(args.concurrency)
-    ttft_list: list[float] = list()
-    latencies: list[float] = list()
-    tokens: list[int] = list()
-    error_record: list[dict] = list()
-
-    async def worker(
-        aclient: httpx.AsyncClient,
-        url: str,
-        headers: dict,
-        timeout: int,
-        error_record: list[dict],
-    ):
-        prompt = next(test_datasets_cycle)
-        payload = build_payload(
-            completion_type=completion_type, prompt=prompt, args=args
-        )
-        async with semaphore:
-            _ttft, _latency, _token = await request_openai_format(
-                aclient=aclient,
-                url=url,
+    async with build_load_balancer(
+        args, client_concurrency(args)
+    ) as balancer, serve_live_metrics(
+        args.metrics_port, args.workers, {"model": args.model}
+    ) as live_metrics:
+        print("\n✅ Check model-server")
+        warmup_payload = encode_payload(
+            build_payload(
+                completion_type=completion_type, prompt=args.prompt, args=args
+            )
+        )
+        for backend in balancer.backends:
+            warmup_result = await request_openai_format(
+                aclient=backend.aclient,
+                url=backend.url,
                 headers=headers,
-                payload=payload,
-                timeout=timeout,
-                error_record=error_record,
+                payload=warmup_payload,
+                timeout=args.timeout,
             )
+            if not warmup_result.success:
+                raise RuntimeError(f"Check model-server failed: {backend.base_url}")
 
-            if _latency is not None and _token is not None:
-                ttft_list.append(_ttft)
-                latencies.append(_latency)
-                tokens.append(_token)
-
-    progress = 0
-    lock = asyncio.Lock()
+        if args.concurrency_sweep:
+            await run_concurrency_sweep(
+                args=args,
+                balancer=balancer,
+                datasets_cycle=test_datasets_cycle,
+                live_metrics=live_metrics,
+            )
+            return
 
-    async def worker_with_progress():
-        nonlocal progress
-        await worker(
-            aclient=aclient,
-            url=url,
-            headers=headers,
-            timeout=args.timeout,
-            error_record=error_record,
-        )
-        async with lock:
-            progress += 1
-            print(
-                f"\r{text_progress_bar(progress=progress, total=args.num_request)} {progress}/{args.num_request}",
-                end="",
-                flush=True,
+        if args.goodput_search:
+            await run_goodput_search(
+                args=args,
+                balancer=balancer,
+                datasets_cycle=test_datasets_cycle,
+                live_metrics=live_metrics,
             )
+            return
 
-    async with httpx.AsyncClient() as aclient:
-        print("\n✅ Check model-server")
-        warmup_payload = build_payload(
-            completion_type=completion_type, prompt=args.prompt, args=args
+        samples = Samples()
+        schedule = build_schedule(args)
+
+        result_log = None
+        if args.result_log:
+            result_log = ResultLog(args.result_log, log_header(args))
+
+        scraper, correlator = None, None
+        if args.server_metrics_url:
+            scraper = ServerMetricsScraper(args.server_metrics_url, args.server_metrics_interval)
+            await scraper.start()
+            # Per-request correlation needs the results in this process
+            if args.workers == 1:
+                correlator = PhaseCorrelator(scraper)
+
+        warmup = await run_warmup(
+            args=args,
+            balancer=balancer,
+            datasets_cycle=test_datasets_cycle,
+            live_metrics=live_metrics,
         )
-        (
-            test_ttft,
-            test_latency,
-            test_token,
-        ) = await request_openai_format(
-            aclient=aclient,
-            url=url,
-            headers=headers,
-            payload=warmup_payload,
-            timeout=args.timeout,
-        )
-        if test_ttft is None or test_latency is None or test_token is None:
-            print("Check model-server failed")
-            return
 
         print("\n===== 🏃 Start benchmark process =====")
         stress_test_start_time = time.perf_counter()
+        stress_test_end = None
 
         # Start resource monitoring
-        resource_monitor = ResourceMonitor()
+        resource_monitor = ResourceMonitor(
+            interval=args.resource_interval, server_pid=args.monitor_pid or None
+        )
         resource_monitor.start_monitoring()
 
+        profiler = None
+        if args.profile:
+            profiler = ClientProfiler(args.profile, profile_path(args.output_file, args.profile))
+            profiler.start()
+
         try:
-            if args.num_request >= 1:
-                tasks = [
-                    asyncio.create_task(worker_with_progress())
-                    for _ in range(args.num_request)
-                ]
-                await asyncio.gather(*tasks)
-                print()
-            elif args.duration_time >= 1:
-
-                async def print_timer(duration: int):
-                    for i in range(duration):
-                        print(
-                            f"\rElapsed time: {i + 1}/{duration} sec",
-                            end="",
-                            flush=True,
-                        )
-                        asyncio.sleep(1)
-                    print()
-
-                stress_test_end_time = stress_test_start_time + args.duration_time
-
-                async def loop_stress_test():
-                    while time.perf_counter() < stress_test_end_time:
-                        await worker(
-                            aclient=aclient,
-                            url=url,
-                            headers=headers,
-                            timeout=args.timeout,
-                            error_record=error_record,
-                        )
-
-                timer_task = asyncio.create_task(
-                    print_timer(duration=args.duration_time)
-                )
-                loop_stress_test_runners = [
-                    asyncio.create_task(loop_stress_test())
-                    for _ in range(args.concurrency)
-                ]
-                await asyncio.gather(*loop_stress_test_runners, timer_task)
+            stress_test_start_time, stress_test_end = await run_benchmark(
+                args=args,
+                balancer=balancer,
+                datasets_cycle=test_datasets_cycle,
+                samples=samples,
+                schedule=schedule,
+                on_result=correlator.observe if correlator is not None else None,
+                result_log=result_log if args.workers == 1 else None,
+                live_metrics=live_metrics,
+            )
 
         except KeyboardInterrupt:
             print("\n❗ Detected KeyboardInterrupt, generating report...")
 
         finally:
-            stress_test_end = time.perf_counter()
-            
+            if stress_test_end is None:
+                stress_test_end = time.perf_counter()
+
             # Stop resource monitoring and get stats
             resource_monitor.stop_monitoring()
-            resource_stats = resource_monitor.get_stats()
+            # Only samples taken while requests were being dispatched
+            resource_stats = resource_monitor.get_stats(stress_test_start_time, stress_test_end)
+            resources = resource_monitor.get_usage(stress_test_start_time, stress_test_end)
 
-            report = generate_test_report(
-                model=args.model,
-                max_tokens=args.max_tokens,
-                num_concurrency=args.concurrency,
-                requests=args.num_request,
+            if profiler is not None:
+                profiler.stop()
+                print(f"\n🔬 Client profile ({args.profile}) saved in {profiler.path}, hottest frames:")
+                print(profiler.summary())
+
+            server_metrics = None
+            if scraper is not None:
+                await scraper.close()
+                server_metrics = summarize_server_metrics(
+                    scraper, correlator, stress_test_start_time, stress_test_end
+                )
+
+            if result_log is not None:
+                result_log.close(
+                    {
+                        "duration": stress_test_end - stress_test_start_time,
+                        "total_requests": samples.num_requests,
+                        "cut_off": samples.num_cut_off,
+                        "cut_off_tokens": samples.cut_off_tokens,
+                    }
+                )
+                print(f"\n🧾 Per-request results logged in {args.result_log}")
+
+            report_samples, report_requests, report_duration, phases = measurement_window(
+                args=args,
+                samples=samples,
+                total_requests=samples.num_requests,
                 duration=stress_test_end - stress_test_start_time,
-                dataset=os.path.basename(args.dataset_path),
-                prompt=args.prompt,
-                ttft_list=ttft_list,
-                latency_list=latencies,
-                token_list=tokens,
+                warmup=warmup,
+            )
+            report = build_report(
+                args=args,
+                samples=report_samples,
+                total_requests=report_requests,
+                duration=report_duration,
+                server_metrics=server_metrics,
+                resources=resources,
+                phases=phases,
             )
+            print_test_report(report)
 
-            report_content = f"""
-***** 📊 REPORT *****
-Model: {report.model}
-Limit output tokens: {report.max_tokens}
-Num concurrency: {report.num_concurrency}
-Total requests: {report.total_requests}
-Duration time (s): {report.total_duration_time}
-Dataset: {report.dataset if report.dataset else args.prompt}
-Successful requests: {report.successful_requests}
-Request per second (req/s): {report.request_per_sec}
-Throughput token (tok/s): {report.throughput_token}
-***** TIME TO FIRST TOKEN *****
-Avg ttft (ms): {report.ttft.avg_ttft}
-Max ttft (ms): {report.ttft.max_ttft}
-Min ttft (ms): {report.ttft.min_ttft}
-***** LATENCY *****
-Avg latency (ms): {report.latency.avg_latency}
-Max latency (ms): {report.latency.max_latency}
-Min latency (ms): {report.latency.min_latency}
-***** TOKEN *****
-Avg token (tok/req): {report.token.avg_token}
-Max token (tok/req): {report.token.max_token}
-Min token (tok/req): {report.token.min_token}
-                    """
-            print("\n", report_content.strip())
-
-            if error_record:
-                await save_error_as_file(error_data=error_record)
+            if samples.error_record:
+                await save_error_as_file(error_data=samples.error_record)
                 print(
                     "\n❗ Some errors received during the benchmark test, recorded in error.jsonl"
                 )
 
             if args.output_file:
                 if args.cv_style_output:
-                    cv_report = generate_cv_style_report(
-                        model=args.model,
-                        dataset=os.path.basename(args.dataset_path) or args.prompt,
-                        concurrency=args.concurrency,
-                        total_requests=args.num_request,
-                        duration_s=(stress_test_end - stress_test_start_time),
-                        ttft_list=ttft_list,
-                        latency_list=latencies,
-                        token_list=tokens,
-                        provider=None,
+                    cv_report = build_cv_report(
+                        args=args,
+                        samples=report_samples,
+                        total_requests=report_requests,
+                        duration=report_duration,
                         resource_stats=resource_stats,
+                        server_metrics=server_metrics,
+                        resources=resources,
+                        phases=phases,
                     )
                     # 即時於 console 列印 CV 風格報告
                     print_cv_style_report(cv_report)
@@ -246,10 +878,155 @@ Min token (tok/req): {report.token.min_token}
                 print(f"\n📄 Save report file in {args.output_file}")
 
 
+async def rebuild_report(path: str, output_file: str, cv_style_output: bool) -> None:
+    """Regenerate a run's report from its ``--result_log``, e.g. after a crash."""
+    header, footer, columns = load_result_log(path)
+    args = args_from_log(header)
+    samples = samples_from_log(columns, header["backends"])
+    if footer is None:
+        print("\n❗ The run did not finish cleanly, duration taken from the last logged request")
+        duration = logged_duration(columns)
+        total_requests = samples.num_requests
+    else:
+        duration = footer["duration"]
+        # Older duration-run logs recorded a budget of 0 requests
+        total_requests = footer["total_requests"] or samples.num_requests
+        samples.num_cut_off = footer.get("cut_off", 0)
+        samples.cut_off_tokens = footer.get("cut_off_tokens", 0)
+
+    samples, total_requests, duration, phases = measurement_window(
+        args=args, samples=samples, total_requests=total_requests, duration=duration
+    )
+    report = build_report(
+        args=args,
+        samples=samples,
+        total_requests=total_requests,
+        duration=duration,
+        phases=phases,
+    )
+    print_test_report(report)
+
+    if output_file:
+        if cv_style_output:
+            cv_report = build_cv_report(
+                args=args,
+                samples=samples,
+                total_requests=total_requests,
+                duration=duration,
+                resource_stats=None,
+                phases=phases,
+            )
+            print_cv_style_report(cv_report)
+            await save_cv_style_report_as_file(data=cv_report, save_path=output_file)
+        else:
+            await save_report_as_file(data=report, save_path=output_file)
+        print(f"\n📄 Save report file in {output_file}")
+
+
+def load_compare_run(path: str, resamples: int, rng: random.Random) -> dict[str, Estimate]:
+    """Metrics of a saved run: bootstrapped from a --result_log, point values from a report.json."""
+    if not is_result_log(path):
+        with open(path, "rb") as f:
+            report = orjson.loads(f.read())
+        assert "Request per second (req/s)" in report, (
+            f"{path}: neither a result log nor a JSON report (CV-style reports cannot be compared)"
+        )
+        return estimates_from_report(report)
+    header, footer, columns = load_result_log(path)
+    timeline = timeline_from_log(columns)
+    duration = footer["duration"] if footer is not None else logged_duration(columns)
+    start, end, _ = measured_span(args_from_log(header), timeline, duration)
+    return estimates_from_log(columns, timeline.columns["end"], start, end, resamples, rng)
+
+
+async def compare_runs(
+    baseline: str,
+    candidates: list[str],
+    threshold: float,
+    confidence: float,
+    resamples: int,
+    seed: int,
+    output_file: str,
+) -> int:
+    """Compare every candidate run against the baseline; returns the exit status."""
+    rng = random.Random(seed)
+    baseline_estimates = load_compare_run(baseline, resamples, rng)
+    compared = [
+        (
+            path,
+            compare_estimates(
+                baseline_estimates, load_compare_run(path, resamples, rng), threshold, confidence
+            ),
+        )
+        for path in candidates
+    ]
+    report = build_comparison_report(baseline, compared, threshold, confidence, resamples)
+    print_comparison_report(report)
+    if output_file:
+        await save_comparison_report_as_file(data=report, save_path=output_file)
+        print(f"\n📄 Save comparison file in {output_file}")
+    return comparison_status(report)
+
+
+def build_report_parse(argv: list[str]) -> argparse.Namespace:
+    parse = argparse.ArgumentParser(
+        prog="benchmark.py report",
+        description="Rebuild the report of a run from its --result_log",
+    )
+    parse.add_argument("result_log", type=str)
+    parse.add_argument("--output_file", type=str, default="")
+    parse.add_argument("--cv_style_output", action="store_true")
+    return parse.parse_args(argv)
+
+
+def build_compare_parse(argv: list[str]) -> argparse.Namespace:
+    parse = argparse.ArgumentParser(
+        prog="benchmark.py compare",
+        description="Compare saved runs (--result_log files or report.json) against a baseline",
+    )
+    parse.add_argument("baseline", type=str)
+    parse.add_argument("candidates", type=str, nargs="+")
+    parse.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Exit with status 1 when a metric gets significantly worse by more than this (%%)",
+    )
+    parse.add_argument(
+        "--confidence", type=float, default=0.95, help="Confidence level of the bootstrap intervals"
+    )
+    parse.add_argument("--resamples", type=int, default=1000, help="Bootstrap resamples per metric")
+    parse.add_argument("--seed", type=int, default=0, help="Seed of the bootstrap resampling")
+    parse.add_argument("--output_file", type=str, default="")
+    compare_args = parse.parse_args(argv)
+    assert compare_args.threshold >= 0, "threshold must be at least 0"
+    assert 0 < compare_args.confidence < 1, "confidence must be between 0 and 1"
+    assert compare_args.resamples >= 1, "resamples must be at least 1"
+    return compare_args
+
+
 def build_parse() -> Args:
     parse = argparse.ArgumentParser()
 
-    parse.add_argument("--base_url", required=True, type=str)
+    parse.add_argument(
+        "--base_url",
+        type=str,
+        default="",
+        help="Model server base URL; several comma-separated URLs spread the load over them",
+    )
+    parse.add_argument(
+        "--base_url_file",
+        type=str,
+        default="",
+        help="File with one backend base URL per line, added to --base_url",
+    )
+    parse.add_argument(
+        "--load_balance",
+        type=str,
+        choices=["round_robin", "least_outstanding", "power_of_two"],
+        default="round_robin",
+        help="How requests are spread over several backends",
+    )
     parse.add_argument(
         "--endpoint",
         type=str,
@@ -262,11 +1039,297 @@ def build_parse() -> Args:
     parse.add_argument("--timeout", type=int, default=30)
     parse.add_argument("--prompt", type=str, default="how are you?")
     parse.add_argument("--dataset_path", type=str, default="")
+    parse.add_argument(
+        "--num_prompts",
+        type=int,
+        default=0,
+        help="Use only this many dataset prompts (0 = all); requests cycle over them",
+    )
+    parse.add_argument(
+        "--dataset_sample",
+        type=str,
+        choices=["sequential", "random"],
+        default="sequential",
+        help="Take the first num_prompts records, or a random sample seeded by --seed",
+    )
+    parse.add_argument(
+        "--tokenizer",
+        type=str,
+        default=None,
+        help="Local tokenizer name or path for dataset token counts; defaults to --model, chars/4 heuristic if unavailable",
+    )
+    parse.add_argument("--min_input_tokens", type=int, default=0)
+    parse.add_argument("--max_input_tokens", type=int, default=0, help="0 = no upper bound")
+    parse.add_argument("--min_output_tokens", type=int, default=0)
+    parse.add_argument("--max_output_tokens", type=int, default=0, help="0 = no upper bound")
+    parse.add_argument(
+        "--input_buckets",
+        type=parse_bucket_edges,
+        default=None,
+        help="Comma-separated input-token bucket edges, e.g. 128,512,2048; prompts are drawn evenly from every bucket",
+    )
+    parse.add_argument(
+        "--max_tokens_from_dataset",
+        action="store_true",
+        help="Set each request's max_tokens to its reference answer's token count instead of --max_tokens",
+    )
+    parse.add_argument(
+        "--input_len",
+        type=int,
+        default=0,
+        help="Synthetic workload when no dataset_path is given: mean prompt length in tokens (0 = repeat --prompt)",
+    )
+    parse.add_argument(
+        "--input_len_dist",
+        type=str,
+        choices=["fixed", "uniform", "normal", "lognormal"],
+        default="fixed",
+    )
+    parse.add_argument(
+        "--input_len_std",
+        type=float,
+        default=0.0,
+        help="Standard deviation of the synthetic prompt length in tokens",
+    )
+    parse.add_argument(
+        "--shared_prefix_len",
+        type=int,
+        default=0,
+        help="Tokens of a common prefix placed at the start of synthetic prompts",
+    )
+    parse.add_argument(
+        "--shared_prefix_ratio",
+        type=float,
+        default=1.0,
+        help="Fraction of synthetic prompts that start with the shared prefix",
+    )
     parse.add_argument("--num_request", type=int, default=100)
     parse.add_argument("--duration_time", type=int, default=0)
     parse.add_argument("--max_tokens", type=int, default=32)
     parse.add_argument("--temperature", type=float, default=0.7)
     parse.add_argument("--output_file", type=str, default="./report.json")
+    parse.add_argument(
+        "--request_rate",
+        type=float,
+        default=0.0,
+        help="Open-loop mode: dispatch requests at this rate (req/s) regardless of completions; 0 keeps closed-loop concurrency",
+    )
+    parse.add_argument(
+        "--arrival_distribution",
+        type=str,
+        choices=["poisson", "gamma", "constant"],
+        default="poisson",
+    )
+    parse.add_argument(
+        "--burstiness",
+        type=float,
+        default=1.0,
+        help="Gamma shape for --arrival_distribution gamma (<1 burstier, 1 = Poisson)",
+    )
+    parse.add_argument("--seed", type=int, default=None)
+    parse.add_argument(
+        "--concurrency_sweep",
+        type=parse_concurrency_levels,
+        default=None,
+        help="Comma-separated concurrency levels run back to back in one invocation, e.g. 1,2,4,8,16",
+    )
+    parse.add_argument(
+        "--knee_threshold",
+        type=float,
+        default=0.1,
+        help="Sweep knee: scaling efficiency (token-throughput gain / concurrency gain) below which throughput counts as saturated",
+    )
+    parse.add_argument(
+        "--slo",
+        type=parse_slos,
+        default=None,
+        help="Comma-separated SLO percentiles in ms, e.g. ttft_p99=500,tpot_p95=50 (metrics: ttft, tpot, itl, latency)",
+    )
+    parse.add_argument(
+        "--goodput_search",
+        type=str,
+        choices=["concurrency", "request_rate"],
+        default=None,
+        help="Bisect this offered-load knob between search_min and search_max for the highest load that meets --slo",
+    )
+    parse.add_argument("--search_min", type=float, default=1.0)
+    parse.add_argument("--search_max", type=float, default=0.0)
+    parse.add_argument(
+        "--search_tolerance",
+        type=float,
+        default=1.0,
+        help="Stop bisecting once the passing and failing loads are this close",
+    )
+    parse.add_argument("--search_max_steps", type=int, default=8)
+    parse.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of load-generator processes; the request budget or arrival schedule is sharded across them",
+    )
+    parse.add_argument(
+        "--trace",
+        type=str,
+        default="",
+        help="JSONL request trace to replay open-loop: timestamp, prompt or input_tokens, optional max_tokens per line",
+    )
+    parse.add_argument(
+        "--trace_speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier; 2 replays the trace twice as fast",
+    )
+    parse.add_argument("--trace_time_unit", type=str, choices=["s", "ms"], default="s")
+    parse.add_argument(
+        "--multi_turn",
+        action="store_true",
+        help="Replay whole dataset conversations as chat sessions; num_request and concurrency count sessions",
+    )
+    parse.add_argument(
+        "--max_turns",
+        type=int,
+        default=0,
+        help="Replay at most this many user turns per session (0 = all)",
+    )
+    parse.add_argument(
+        "--think_time",
+        type=float,
+        default=0.0,
+        help="Seconds a session waits between receiving a reply and sending its next turn",
+    )
+    parse.add_argument(
+        "--max_connections",
+        type=int,
+        default=0,
+        help="HTTP connection pool size per load-generator process; 0 = one per concurrent request (unbounded in open-loop)",
+    )
+    parse.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 (prior knowledge for http://, ALPN for https://); needs the h2 package",
+    )
+    parse.add_argument(
+        "--no_keepalive",
+        dest="keepalive",
+        action="store_false",
+        help="Open a new connection for every request",
+    )
+    parse.add_argument(
+        "--keepalive_expiry",
+        type=float,
+        default=5.0,
+        help="Seconds an idle pooled connection is kept open",
+    )
+    parse.add_argument(
+        "--server_metrics_url",
+        type=str,
+        default="",
+        help="Model server Prometheus endpoint (e.g. http://localhost:8000/metrics) scraped during the run and correlated with request phases",
+    )
+    parse.add_argument(
+        "--server_metrics_interval",
+        type=float,
+        default=1.0,
+        help="Seconds between server metrics scrapes",
+    )
+    parse.add_argument(
+        "--resource_interval",
+        type=float,
+        default=0.5,
+        help="Seconds between resource monitor samples (system, client process tree, network)",
+    )
+    parse.add_argument(
+        "--monitor_pid",
+        type=int,
+        default=0,
+        help="PID of a local model server whose process tree is sampled alongside the client (0 = off)",
+    )
+    parse.add_argument(
+        "--warmup_requests",
+        type=int,
+        default=0,
+        help="Requests sent before the measured run and left out of the report",
+    )
+    parse.add_argument(
+        "--warmup_time",
+        type=int,
+        default=0,
+        help="Seconds of load before the measured run, left out of the report",
+    )
+    parse.add_argument(
+        "--ramp_time",
+        type=float,
+        default=0.0,
+        help="Seconds over which closed-loop concurrency is opened up; the ramp is left out of the headline figures",
+    )
+    parse.add_argument(
+        "--ramp_steps",
+        type=int,
+        default=0,
+        help="Open concurrency in this many equal steps over ramp_time (0 = linear)",
+    )
+    parse.add_argument(
+        "--steady_state",
+        action="store_true",
+        help="Detect the steady-state window from per-second throughput and report headline figures from it only",
+    )
+    parse.add_argument(
+        "--steady_window",
+        type=int,
+        default=5,
+        help="Seconds of throughput averaged by steady-state detection",
+    )
+    parse.add_argument(
+        "--steady_tolerance",
+        type=float,
+        default=0.1,
+        help="Steady state holds while windowed throughput stays above (1 - tolerance) x its median",
+    )
+    parse.add_argument(
+        "--deadline_policy",
+        type=str,
+        default="drain",
+        choices=["cancel", "drain", "partial"],
+        help="What happens to requests in flight when a duration_time run hits its deadline: cancel them, let them finish outside the measured window, or cancel them and count the tokens they streamed",
+    )
+    parse.add_argument(
+        "--timeseries_interval",
+        type=float,
+        default=1.0,
+        help="Width (s) of the time windows completions are bucketed into for the report's time series; 0 disables it",
+    )
+    parse.add_argument(
+        "--usage_fallback",
+        type=str,
+        default="deltas",
+        choices=["deltas", "tokenizer"],
+        help="How to count tokens when the server sends no usage: number of streamed content deltas, or the local --tokenizer on the reply text (chars/4 if unavailable)",
+    )
+    parse.add_argument(
+        "--loop_lag_threshold",
+        type=float,
+        default=10.0,
+        help="P99 client event-loop lag (ms) above which the report flags results as untrustworthy",
+    )
+    parse.add_argument(
+        "--profile",
+        type=str,
+        default="",
+        choices=["", *PROFILE_MODES],
+        help="Profile the benchmark client during the run and write it next to the report: cprofile (pstats .prof) or sampling (collapsed stacks .stacks.txt)",
+    )
+    parse.add_argument(
+        "--metrics_port",
+        type=int,
+        default=0,
+        help="Serve live Prometheus metrics on http://127.0.0.1:<port>/metrics during the run (0 = off)",
+    )
+    parse.add_argument(
+        "--result_log",
+        type=str,
+        default="",
+        help="Append one record per request to this binary log while running; rebuild the report with `benchmark.py report <file>`",
+    )
     parse.add_argument(
         "--cv_style_output",
         action="store_true",
@@ -280,10 +1343,36 @@ def build_parse() -> Args:
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["report"]:
+        report_args = build_report_parse(sys.argv[2:])
+        asyncio.run(
+            rebuild_report(
+                path=report_args.result_log,
+                output_file=report_args.output_file,
+                cv_style_output=report_args.cv_style_output,
+            )
+        )
+        sys.exit()
+    if sys.argv[1:2] == ["compare"]:
+        compare_args = build_compare_parse(sys.argv[2:])
+        status = asyncio.run(
+            compare_runs(
+                baseline=compare_args.baseline,
+                candidates=compare_args.candidates,
+                threshold=compare_args.threshold,
+                confidence=compare_args.confidence,
+                resamples=compare_args.resamples,
+                seed=compare_args.seed,
+                output_file=compare_args.output_file,
+            )
+        )
+        sys.exit(status)
+
     args = build_parse()
     try:
         asyncio.run(main(args=args))
     except KeyboardInterrupt:
         print("\n❗ User interrupted")
     except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
\ No newline at end of file
+        print(f"\n❌ Unexpected error: {e}")
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,331 @@
+"""
+Local stand-in for an OpenAI-compatible streaming server.
+
+Serves ``/v1/chat/completions`` and ``/v1/completions`` as SSE with a
+configurable TTFT, per-token delay distribution, output length, error / 429
+injection and a trailing ``usage`` chunk, so the benchmark client can be
+measured against known ground truth without a GPU. ``max_running`` caps the
+requests generating at once (the rest queue), and ``GET /metrics`` exposes
+the running / waiting counts with vLLM's Prometheus names. Plain asyncio, no
+dependencies beyond orjson.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import time
+from dataclasses import dataclass, replace
+
+import orjson
+
+
+@dataclass
+class MockConfig:
+    host: str = "127.0.0.1"
+    port: int = 8000
+    ttft_ms: float = 50.0
+    itl_ms: float = 10.0
+    # constant, uniform (±jitter), normal (stddev = jitter) or exponential (mean)
+    delay_dist: str = "constant"
+    jitter: float = 0.0
+    output_tokens: int = 32
+    output_tokens_max: int = 0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    usage: bool = True
+    # Requests generating at once, the rest wait for a slot (0 = no limit)
+    max_running: int = 0
+    processes: int = 1
+    seed: int | None = None
+
+
+def _draw(rng: random.Random, mean_ms: float, config: MockConfig) -> float:
+    if config.delay_dist == "uniform":
+        value = rng.uniform(mean_ms - config.jitter, mean_ms + config.jitter)
+    elif config.delay_dist == "normal":
+        value = rng.gauss(mean_ms, config.jitter)
+    elif config.delay_dist == "exponential":
+        value = rng.expovariate(1.0 / mean_ms) if mean_ms > 0 else 0.0
+    else:
+        value = mean_ms
+    return max(value, 0.0) / 1000.0
+
+
+def _chunk(data: bytes) -> bytes:
+    # HTTP/1.1 chunked transfer framing around one SSE event
+    event = b"data: " + data + b"\n\n"
+    return b"%x\r\n%s\r\n" % (len(event), event)
+
+
+def _response_head(status: str, content_type: bytes, extra: bytes = b"") -> bytes:
+    return (
+        b"HTTP/1.1 " + status.encode() + b"\r\ncontent-type: " + content_type
+        + b"\r\n" + extra
+    )
+
+
+class MockServer:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.slots = asyncio.Semaphore(config.max_running) if config.max_running > 0 else None
+        self.running = 0
+        self.waiting = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers: dict[str, str] = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, value = line.decode().split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await self.route(method, path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    async def route(
+        self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter
+    ) -> None:
+        if method == "POST" and path in ("/v1/chat/completions", "/v1/completions"):
+            await self.completions(path, body, writer)
+        elif method == "GET" and path == "/metrics":
+            await self.send_plain(writer, "200 OK", self.metrics(), b"text/plain; version=0.0.4")
+        else:
+            await self.send_plain(writer, "404 Not Found", b"not found")
+
+    async def send_plain(
+        self,
+        writer: asyncio.StreamWriter,
+        status: str,
+        content: bytes,
+        content_type: bytes = b"text/plain",
+    ) -> None:
+        writer.write(
+            _response_head(status, content_type, b"content-length: %d\r\n\r\n" % len(content))
+            + content
+        )
+        await writer.drain()
+
+    def metrics(self) -> bytes:
+        # Per process: with --processes each scrape sees one process' share
+        kv_cache_usage = self.running / self.config.max_running if self.slots else 0.0
+        return (
+            "# TYPE vllm:num_requests_running gauge\n"
+            f"vllm:num_requests_running{{model_name=\"mock\"}} {self.running}\n"
+            "# TYPE vllm:num_requests_waiting gauge\n"
+            f"vllm:num_requests_waiting{{model_name=\"mock\"}} {self.waiting}\n"
+            "# TYPE vllm:kv_cache_usage_perc gauge\n"
+            f"vllm:kv_cache_usage_perc{{model_name=\"mock\"}} {kv_cache_usage}\n"
+            "# TYPE vllm:num_preemptions_total counter\n"
+            "vllm:num_preemptions_total{model_name=\"mock\"} 0\n"
+        ).encode()
+
+    async def completions(
+        self, path: str, body: bytes, writer: asyncio.StreamWriter
+    ) -> None:
+        config = self.config
+        roll = self.rng.random()
+        if roll < config.rate_limit_rate:
+            await self.send_plain(
+                writer, "429 Too Many Requests", b'{"error": "rate limited"}', b"application/json"
+            )
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            await self.send_plain(
+                writer, "500 Internal Server Error", b'{"error": "injected"}', b"application/json"
+            )
+            return
+
+        request = orjson.loads(body)
+        chat = path == "/v1/chat/completions"
+        limit = request.get("max_completion_tokens") or request.get("max_tokens") or config.output_tokens
+        output_tokens = config.output_tokens
+        if config.output_tokens_max > config.output_tokens:
+            output_tokens = self.rng.randint(config.output_tokens, config.output_tokens_max)
+        output_tokens = max(min(output_tokens, limit), 1)
+        prompt = request["messages"][-1]["content"] if chat else request.get("prompt", "")
+        include_usage = config.usage and (request.get("stream_options") or {}).get("include_usage")
+
+        writer.write(
+            _response_head("200 OK", b"text/event-stream", b"transfer-encoding: chunked\r\n\r\n")
+        )
+        if self.slots is not None:
+            # Queue time adds to TTFT, like a server with a full batch
+            self.waiting += 1
+            try:
+                await self.slots.acquire()
+            finally:
+                self.waiting -= 1
+        self.running += 1
+        try:
+            await self.stream(request, chat, prompt, output_tokens, include_usage, writer)
+        finally:
+            self.running -= 1
+            if self.slots is not None:
+                self.slots.release()
+
+    async def stream(
+        self,
+        request: dict,
+        chat: bool,
+        prompt: str,
+        output_tokens: int,
+        include_usage: bool,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        config = self.config
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        model = request.get("model", "mock").encode()
+        object_type = b"chat.completion.chunk" if chat else b"text_completion"
+        prefix = b'{"id":"mock","object":"' + object_type + b'","model":"' + model + b'","choices":['
+        if chat:
+            writer.write(_chunk(prefix + b'{"index":0,"delta":{"role":"assistant","content":""}}]}'))
+
+        for i in range(output_tokens):
+            # Sleep to absolute deadlines so delays do not drift under load
+            deadline += _draw(self.rng, config.ttft_ms if i == 0 else config.itl_ms, config)
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if chat:
+                choice = b'{"index":0,"delta":{"content":"tok "}}'
+            else:
+                choice = b'{"index":0,"text":"tok "}'
+            writer.write(_chunk(prefix + choice + b"]}"))
+            await writer.drain()
+
+        if include_usage:
+            prompt_tokens = max(len(prompt) // 4, 1)
+            usage = orjson.dumps(
+                {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": prompt_tokens + output_tokens,
+                }
+            )
+            writer.write(_chunk(prefix + b'],"usage":' + usage + b"}"))
+        writer.write(_chunk(b"[DONE]") + b"0\r\n\r\n")
+        await writer.drain()
+
+    async def serve(self, sock: socket.socket | None = None) -> None:
+        if sock is not None:
+            server = await asyncio.start_server(self.handle, sock=sock, backlog=4096)
+        else:
+            server = await asyncio.start_server(
+                self.handle, self.config.host, self.config.port, backlog=4096
+            )
+        async with server:
+            await server.serve_forever()
+
+
+def _bind(config: MockConfig) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if config.processes > 1:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((config.host, config.port))
+    return sock
+
+
+def _serve_process(config: MockConfig, index: int) -> None:
+    if config.seed is not None:
+        config = replace(config, seed=config.seed + index)
+    try:
+        asyncio.run(MockServer(config).serve(sock=_bind(config)))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_mock_server(config: MockConfig) -> None:
+    """Serve forever; ``processes`` > 1 shares the port via SO_REUSEPORT."""
+    if config.processes <= 1:
+        _serve_process(config, 0)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=_serve_process, args=(config, i), daemon=True)
+        for i in range(config.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+
+
+def wait_until_ready(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Mock server on {host}:{port} did not start") from None
+            time.sleep(0.05)
+
+
+def build_parse() -> MockConfig:
+    parse = argparse.ArgumentParser(description="Mock OpenAI-compatible streaming server")
+    parse.add_argument("--host", type=str, default="127.0.0.1")
+    parse.add_argument("--port", type=int, default=8000)
+    parse.add_argument("--ttft_ms", type=float, default=50.0)
+    parse.add_argument("--itl_ms", type=float, default=10.0)
+    parse.add_argument(
+        "--delay_dist",
+        type=str,
+        choices=["constant", "uniform", "normal", "exponential"],
+        default="constant",
+    )
+    parse.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="ms; half-width for uniform, stddev for normal",
+    )
+    parse.add_argument("--output_tokens", type=int, default=32)
+    parse.add_argument(
+        "--output_tokens_max",
+        type=int,
+        default=0,
+        help="Draw output length uniformly from [output_tokens, output_tokens_max]",
+    )
+    parse.add_argument("--error_rate", type=float, default=0.0)
+    parse.add_argument("--rate_limit_rate", type=float, default=0.0)
+    parse.add_argument("--no_usage", dest="usage", action="store_false")
+    parse.add_argument(
+        "--max_running",
+        type=int,
+        default=0,
+        help="Requests generating at once; the rest queue and show up as vllm:num_requests_waiting (0 = no limit)",
+    )
+    parse.add_argument("--processes", type=int, default=1)
+    parse.add_argument("--seed", type=int, default=None)
+
+    args = parse.parse_args()
+    return MockConfig(**vars(args))
+
+
+if __name__ == "__main__":
+    config = build_parse()
+    print(f"🧪 Mock server on http://{config.host}:{config.port} ({config})")
+    run_mock_server(config)
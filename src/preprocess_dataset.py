@@ -0,0 +1,40 @@
+"""
+Offline dataset preprocessing: build the byte-offset index and the token-count
+cache next to the dataset so benchmark runs start without tokenizing.
+"""
+import argparse
+
+from type.histogram import Histogram
+from utils.datasets import load_dataset_index, load_token_counts
+
+
+def summarize(name: str, counts) -> None:
+    hist = Histogram()
+    hist.extend(counts)
+    p = hist.percentiles()
+    print(
+        f"{name}: avg {hist.mean:.1f}, min {hist.min:.0f}, p50 {p[50.0]:.0f}, "
+        f"p90 {p[90.0]:.0f}, p99 {p[99.0]:.0f}, max {hist.max:.0f}"
+    )
+
+
+def main() -> None:
+    parse = argparse.ArgumentParser(description="Index a ShareGPT dataset and cache its token counts")
+    parse.add_argument("--dataset_path", required=True, type=str)
+    parse.add_argument(
+        "--tokenizer",
+        type=str,
+        default=None,
+        help="Local tokenizer name or path; chars/4 heuristic when omitted or unavailable",
+    )
+    args = parse.parse_args()
+
+    index = load_dataset_index(args.dataset_path)
+    print(f"Indexed {len(index)} prompts")
+    input_tokens, output_tokens = load_token_counts(index, args.tokenizer)
+    summarize("Input tokens", input_tokens)
+    summarize("Reference output tokens", output_tokens)
+
+
+if __name__ == "__main__":
+    main()
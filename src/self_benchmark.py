@@ -0,0 +1,173 @@
+"""
+Self-benchmark: run benchmark.py against the bundled mock server and compare
+the measured TTFT / ITL / TPOT / req/s with the injected ground truth.
+
+The difference is the overhead and error the benchmark client itself adds,
+which is what regresses when the client hot path gets slower.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+
+from mock_server import wait_until_ready
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_level(args: argparse.Namespace, concurrency: int, report_path: str) -> dict:
+    num_request = max(concurrency * args.requests_per_worker, args.min_requests)
+    command = [
+        sys.executable,
+        os.path.join(SRC_DIR, "benchmark.py"),
+        "--base_url", f"http://{args.host}:{args.port}",
+        "--model", "mock",
+        "--concurrency", str(concurrency),
+        "--num_request", str(num_request),
+        "--max_tokens", str(args.output_tokens),
+        "--timeout", str(args.timeout),
+        "--workers", str(min(args.workers, concurrency)),
+        "--output_file", report_path,
+    ]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    with open(report_path) as f:
+        return json.load(f)
+
+
+def compare(args: argparse.Namespace, concurrency: int, report: dict) -> dict:
+    latency_ms = args.ttft_ms + (args.output_tokens - 1) * args.itl_ms
+    expected = {
+        "ttft_ms": args.ttft_ms,
+        "itl_ms": args.itl_ms,
+        "tpot_ms": args.itl_ms,
+        "req_per_sec": concurrency / latency_ms * 1000.0,
+    }
+    measured = {
+        "ttft_ms": report["TTFT"]["Avg ttft (ms)"],
+        "itl_ms": report["ITL"]["Avg itl (ms)"],
+        "tpot_ms": report["TPOT"]["Avg tpot (ms)"],
+        "req_per_sec": report["Request per second (req/s)"],
+    }
+    error = {
+        key: (measured[key] - value) / value if value and measured[key] is not None else None
+        for key, value in expected.items()
+    }
+    return {
+        "concurrency": concurrency,
+        "expected": expected,
+        "measured": measured,
+        "relative_error": error,
+        "p99_ttft_ms": report["TTFT"]["P99 ttft (ms)"],
+        "client_cpu_per_chunk_us": report["Client overhead"]["Client CPU per chunk (us)"],
+        "passed": all(
+            e is not None and abs(e) <= args.tolerance for e in error.values()
+        ),
+    }
+
+
+def print_results(results: list[dict], tolerance: float) -> None:
+    print(f"\n***** 🧪 SELF-BENCHMARK (tolerance ±{tolerance:.0%}) *****")
+    print(
+        f"{'conc':>6} {'ttft err':>9} {'itl err':>9} {'tpot err':>9} {'req/s err':>10} "
+        f"{'p99 ttft':>9} {'cpu/chunk':>10} {'pass':>5}"
+    )
+    for result in results:
+        err = result["relative_error"]
+        cells = [
+            f"{err[key]:+.1%}" if err[key] is not None else "-"
+            for key in ("ttft_ms", "itl_ms", "tpot_ms", "req_per_sec")
+        ]
+        print(
+            f"{result['concurrency']:>6} {cells[0]:>9} {cells[1]:>9} {cells[2]:>9} {cells[3]:>10} "
+            f"{result['p99_ttft_ms']:>9} {result['client_cpu_per_chunk_us']:>10} "
+            f"{'yes' if result['passed'] else 'no':>5}"
+        )
+
+
+def build_parse() -> argparse.Namespace:
+    parse = argparse.ArgumentParser(description="Benchmark the benchmark client against the mock server")
+    parse.add_argument("--host", type=str, default="127.0.0.1")
+    parse.add_argument("--port", type=int, default=18000)
+    parse.add_argument("--concurrency_levels", type=str, default="1,64,256,1024")
+    parse.add_argument("--ttft_ms", type=float, default=50.0)
+    parse.add_argument("--itl_ms", type=float, default=10.0)
+    parse.add_argument("--output_tokens", type=int, default=32)
+    parse.add_argument("--requests_per_worker", type=int, default=4)
+    parse.add_argument("--min_requests", type=int, default=100)
+    parse.add_argument("--timeout", type=int, default=60)
+    parse.add_argument("--workers", type=int, default=1)
+    parse.add_argument("--server_processes", type=int, default=1)
+    parse.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Maximum relative error of every measured metric against the injected value",
+    )
+    parse.add_argument("--output_file", type=str, default="./self_benchmark.json")
+    return parse.parse_args()
+
+
+def start_mock_server(args: argparse.Namespace) -> subprocess.Popen:
+    """
+    Spawn the mock server and wait for it to listen. Fails instead of
+    benchmarking whatever else already listens on the port.
+    """
+    try:
+        with socket.create_connection((args.host, args.port), timeout=0.5):
+            pass
+    except OSError:
+        pass
+    else:
+        raise RuntimeError(f"Port {args.host}:{args.port} is already in use")
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(SRC_DIR, "mock_server.py"),
+            "--host", args.host,
+            "--port", str(args.port),
+            "--ttft_ms", str(args.ttft_ms),
+            "--itl_ms", str(args.itl_ms),
+            "--output_tokens", str(args.output_tokens),
+            "--processes", str(args.server_processes),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        if server.poll() is None:
+            wait_until_ready(args.host, args.port)
+        if server.poll() is not None:
+            raise RuntimeError(f"Mock server exited with status {server.returncode}")
+    except BaseException:
+        server.kill()
+        server.wait()
+        raise
+    return server
+
+
+def main(args: argparse.Namespace) -> int:
+    server = start_mock_server(args)
+    results: list[dict] = list()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for level in [int(x) for x in args.concurrency_levels.split(",") if x.strip()]:
+                print(f"\n===== 🏃 Concurrency {level} =====")
+                report = run_level(args, level, os.path.join(tmp, f"report_{level}.json"))
+                results.append(compare(args, level, report))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_results(results, args.tolerance)
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Save report file in {args.output_file}")
+    return 0 if all(result["passed"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_parse()))
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Estimate:
+    value: float
+    # Bootstrap replicates of the value; None when the run's raw samples
+    # are not available (a saved report.json)
+    replicates: list[float] | None = None
+
+
+@dataclass
+class MetricDelta:
+    metric: str
+    baseline: float
+    candidate: float
+    change: float  # candidate vs baseline (%)
+    # Confidence interval of the change (%), None without replicates
+    ci_low: float | None
+    ci_high: float | None
+    # The interval excludes 0
+    significant: bool
+    # In the worse direction by more than the threshold, significant or not
+    beyond_threshold: bool
+    # Significant and beyond the threshold
+    regression: bool
@@ -0,0 +1,109 @@
+import math
+from array import array
+
+
+class Histogram:
+    """
+    Fixed-memory, mergeable quantile sketch with log-spaced buckets.
+
+    Every value between ``min_value`` and ``max_value`` lands in a bucket whose
+    bounds are within ``relative_accuracy`` of each other, so any percentile
+    is reported within that relative error (HDR-histogram / DDSketch style).
+    Smaller values share one underflow bucket, larger values are clamped into
+    the last bucket. Count, sum, min and max are tracked exactly.
+    """
+
+    PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-6,
+        max_value: float = 1e7,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._inv_log_gamma = 1.0 / math.log(self._gamma)
+        self._offset = math.ceil(math.log(min_value) * self._inv_log_gamma) - 1
+        num_buckets = math.ceil(math.log(max_value) * self._inv_log_gamma) - self._offset + 1
+        self._counts = array("Q", bytes(8 * num_buckets))
+
+        self.count = 0
+        self.total = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _index(self, value: float) -> int:
+        if value < self.min_value:
+            return 0
+        index = math.ceil(math.log(value) * self._inv_log_gamma) - self._offset
+        return min(index, len(self._counts) - 1)
+
+    def add(self, value: float) -> None:
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def extend(self, values) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "Histogram") -> None:
+        assert len(self._counts) == len(other._counts), (
+            "Histograms with different accuracy or range cannot be merged."
+        )
+        counts = self._counts
+        for i, c in enumerate(other._counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+
+    @property
+    def min(self) -> float:
+        return self._min if self.count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max if self.count else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Value at percentile ``q`` (0-100), within ``relative_accuracy``."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 100:
+            return self.max
+        rank = q / 100.0 * (self.count - 1)
+        counts = self._counts
+        i = 0
+        seen = counts[0]
+        while seen <= rank:
+            i += 1
+            seen += counts[i]
+        if i == 0:
+            return self.min
+        # Bucket i covers (gamma^(k-1), gamma^k]; report its midpoint in
+        # relative terms, clamped to the observed range.
+        upper = self._gamma ** (i + self._offset)
+        value = 2 * upper / (self._gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def percentiles(self) -> dict[float, float]:
+        return {q: self.percentile(q) for q in self.PERCENTILES}
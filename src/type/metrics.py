@@ -7,6 +7,11 @@ class TTFT:
     avg_ttft: float
     max_ttft: float
     min_ttft: float
+    p50_ttft: float = 0.0
+    p90_ttft: float = 0.0
+    p95_ttft: float = 0.0
+    p99_ttft: float = 0.0
+    p999_ttft: float = 0.0
 
 
 @dataclass
@@ -14,10 +19,258 @@ class Latency:
     avg_latency: float
     max_latency: float
     min_latency: float
+    p50_latency: float = 0.0
+    p90_latency: float = 0.0
+    p95_latency: float = 0.0
+    p99_latency: float = 0.0
+    p999_latency: float = 0.0
 
 
 @dataclass
 class Token:
     avg_token: float
     max_token: int
-    min_token: int
\ No newline at end of file
+    min_token: int
+
+
+@dataclass
+class TokenAccounting:
+    # Per successful request (tok/req)
+    avg_prompt_tokens: float
+    avg_completion_tokens: float
+    total_prompt_tokens: int
+    total_completion_tokens: int
+    # Streamed content deltas; one per token on most servers
+    total_deltas: int
+    # Successful requests counted by the client because the server sent no usage
+    missing_usage: int
+    usage_fallback: str
+    # Prompt and generated tokens per second of run time (tok/s)
+    prefill_throughput: float
+    decode_throughput: float
+
+
+@dataclass
+class SchedulingLag:
+    # Actual send time minus scheduled send time in open-loop mode (ms)
+    avg_lag: float
+    max_lag: float
+    min_lag: float
+    p50_lag: float = 0.0
+    p90_lag: float = 0.0
+    p95_lag: float = 0.0
+    p99_lag: float = 0.0
+    p999_lag: float = 0.0
+
+
+@dataclass
+class ClientLag:
+    # How late the client's event loop ran a timer that was due (ms)
+    avg_loop_lag: float
+    p50_loop_lag: float
+    p99_loop_lag: float
+    max_loop_lag: float
+    # Time spent parsing each received chunk (us)
+    avg_chunk_processing: float
+    p99_chunk_processing: float
+    max_chunk_processing: float
+    # Results are untrustworthy once P99 loop lag exceeds this (ms)
+    threshold: float
+    trustworthy: bool
+
+
+@dataclass
+class ITL:
+    # Inter-token latency between consecutive streamed deltas (ms)
+    avg_itl: float
+    max_itl: float
+    min_itl: float
+    p50_itl: float = 0.0
+    p90_itl: float = 0.0
+    p95_itl: float = 0.0
+    p99_itl: float = 0.0
+    p999_itl: float = 0.0
+
+
+@dataclass
+class TPOT:
+    # Time per output token, excluding the first token (ms)
+    avg_tpot: float
+    max_tpot: float
+    min_tpot: float
+    p50_tpot: float = 0.0
+    p90_tpot: float = 0.0
+    p95_tpot: float = 0.0
+    p99_tpot: float = 0.0
+    p999_tpot: float = 0.0
+
+
+@dataclass
+class DecodeSpeed:
+    # Per-request decode speed (tok/s)
+    avg_decode_speed: float
+    max_decode_speed: float
+    min_decode_speed: float
+
+
+@dataclass
+class ConnectionTiming:
+    # Per-request phases before the first token, from the request start (ms)
+    avg_pool_wait: float
+    p99_pool_wait: float
+    max_pool_wait: float
+    avg_connect: float
+    p99_connect: float
+    max_connect: float
+    avg_response_headers: float
+    p50_response_headers: float
+    p99_response_headers: float
+    new_connections: int
+    # None means unbounded (open-loop)
+    max_connections: int | None
+    http2: bool
+
+
+@dataclass
+class BackendBreakdown:
+    # One row per backend of a multi-backend run, plus the "aggregate" row
+    base_url: str
+    requests: int
+    successful_requests: int
+    request_per_sec: float
+    throughput_token: float
+    avg_ttft: float
+    p50_ttft: float
+    p99_ttft: float
+    avg_latency: float
+    p50_latency: float
+    p99_latency: float
+
+
+@dataclass
+class ServerPhase:
+    # Server state behind the requests whose prefill (TTFT) or decode (TPOT)
+    # fell in one latency range; None when the server does not expose it
+    phase: str
+    latency_range: str
+    requests: int
+    avg_running: float | None
+    avg_waiting: float | None
+    avg_kv_cache_usage: float | None
+
+
+@dataclass
+class ServerMetrics:
+    # Scraped from the model server's Prometheus endpoint over the run;
+    # KV-cache usage in percent, preemptions counted during the run
+    url: str
+    num_samples: int
+    num_errors: int
+    avg_running: float | None
+    max_running: float | None
+    avg_waiting: float | None
+    max_waiting: float | None
+    avg_kv_cache_usage: float | None
+    max_kv_cache_usage: float | None
+    preemptions: float | None
+    phases: list[ServerPhase]
+
+
+@dataclass
+class ProcessUsage:
+    # One process tree sampled every monitor interval; CPU in percent of one
+    # core, so a tree of 4 busy processes reads about 400
+    label: str
+    pid: int
+    max_processes: int
+    avg_cpu: float
+    p50_cpu: float
+    p99_cpu: float
+    max_cpu: float
+    # P90 of the busiest single process, the one to watch for an event loop
+    # that is saturating its core
+    p90_busiest_cpu: float
+    avg_rss_mb: float
+    max_rss_mb: float
+    max_threads: int
+    avg_ctx_switches: float
+    cpu_bound: bool
+
+
+@dataclass
+class ResourceUsage:
+    interval: float
+    num_samples: int
+    client: ProcessUsage | None
+    server: ProcessUsage | None
+    # System-wide network throughput (MB/s)
+    avg_net_sent: float
+    max_net_sent: float
+    avg_net_recv: float
+    max_net_recv: float
+
+
+@dataclass
+class RunPhase:
+    # Requests that finished within [start, end] (s from dispatch start)
+    phase: str
+    start: float
+    end: float
+    requests: int
+    successful_requests: int
+    request_per_sec: float
+    # Generated tokens per second (tok/s)
+    decode_throughput: float
+    avg_ttft: float  # ms
+    p99_ttft: float  # ms
+    avg_latency: float  # s
+
+
+@dataclass
+class Deadline:
+    # How a duration_time run ended. Throughput counts what completed
+    # within the window; "partial" also counts tokens streamed by the
+    # requests cut off at the deadline
+    policy: str
+    window: float  # s
+    # Requests running at the deadline: cancelled (cancel / partial) or
+    # finished after it (drain)
+    in_flight: int
+    partial_tokens: int
+    # Last completion past the deadline (s)
+    overrun: float
+
+
+@dataclass
+class TimeWindow:
+    # Requests that finished within [start, start + interval) (s from the
+    # dispatch start); percentiles are None for a window without successes
+    start: float
+    requests: int
+    errors: int
+    request_per_sec: float
+    decode_throughput: float  # tok/s
+    p50_ttft: float | None  # ms
+    p99_ttft: float | None  # ms
+    p50_latency: float | None  # s
+    p99_latency: float | None  # s
+    # Requests sent but not finished at the end of the window
+    in_flight: int
+
+
+@dataclass
+class TimeSeries:
+    interval: float  # s
+    windows: list[TimeWindow]
+
+
+@dataclass
+class RunnerBreakdown:
+    # One closed-loop concurrency slot over the measured window
+    runner: int
+    requests: int
+    successful_requests: int
+    request_per_sec: float
+    avg_ttft: float  # ms
+    avg_latency: float  # ms
+    avg_token: float
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Prompt:
+    text: str
+    # Prompt length from the token-count cache, when the dataset was preprocessed
+    input_tokens: int | None = None
+    # Per-request max_tokens (e.g. the reference answer length); None uses args.max_tokens
+    max_tokens: int | None = None
+    # Later user turns of a multi-turn session, sent after each reply; None
+    # for single requests
+    follow_up_turns: list[str] | None = None
+    # Dataset record index or trace line number, for the per-request result log
+    prompt_id: int | None = None
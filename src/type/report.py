@@ -1,6 +1,23 @@
 from dataclasses import dataclass
 
-from type.metrics import TTFT, Latency, Token
+from type.metrics import (
+    ITL,
+    TPOT,
+    TTFT,
+    BackendBreakdown,
+    ClientLag,
+    ConnectionTiming,
+    Deadline,
+    DecodeSpeed,
+    Latency,
+    ResourceUsage,
+    RunPhase,
+    SchedulingLag,
+    ServerMetrics,
+    TimeSeries,
+    Token,
+    TokenAccounting,
+)
 
 
 @dataclass
@@ -16,4 +33,37 @@ class Report:
     throughput_token: float
     ttft: TTFT
     latency: Latency
-    token: Token
\ No newline at end of file
+    token: Token
+    tokens: TokenAccounting | None = None
+    itl: ITL | None = None
+    tpot: TPOT | None = None
+    decode_speed: DecodeSpeed | None = None
+    # Event-loop CPU spent by the benchmark client; None when not measured
+    client_cpu_time: float | None = 0.0
+    client_cpu_per_chunk: float | None = 0.0
+    client_lag: ClientLag | None = None
+    # Only set for open-loop (--request_rate) runs
+    request_rate: float | None = None
+    scheduling_lag: SchedulingLag | None = None
+    # Only set for --trace replays: speed multiplier and scheduled span (s)
+    trace_speed: float | None = None
+    trace_span: float | None = None
+    # Only set for multi-turn session runs
+    num_sessions: int | None = None
+    ttft_first_turn: TTFT | None = None
+    ttft_follow_up: TTFT | None = None
+    connection: ConnectionTiming | None = None
+    # Only set when requests are spread over several backends
+    backends: list[BackendBreakdown] | None = None
+    # Only set when --server_metrics_url is scraped
+    server_metrics: ServerMetrics | None = None
+    # Client / server process trees and network, sampled during the run
+    resources: ResourceUsage | None = None
+    # Set when warm-up, ramp, steady-state trimming or a drained deadline
+    # split the run; the headline figures then cover the measured / steady
+    # phase only
+    phases: list[RunPhase] | None = None
+    # Only set for duration_time runs
+    deadline: Deadline | None = None
+    # Completions bucketed into fixed windows over the whole run
+    timeseries: TimeSeries | None = None
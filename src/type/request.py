@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RequestResult:
+    # Time to first token and end-to-end latency (s)
+    ttft: float | None = None
+    latency: float | None = None
+    # Prompt + generated tokens: usage.total_tokens, else the client's count
+    token: int | None = None
+    # Prompt tokens: usage.prompt_tokens, else the prompt's known length
+    prompt_tokens: int | None = None
+    # Generated tokens reported by usage, else counted by the client
+    # (content deltas, or the local tokenizer with --usage_fallback tokenizer)
+    output_tokens: int = 0
+    # Whether the stream carried a usage object
+    has_usage: bool = False
+    # Number of SSE data events received, excluding [DONE]
+    num_chunks: int = 0
+    # Arrival time of every content delta, relative to the request start (s)
+    token_times: list[float] = field(default_factory=list)
+    # Phases before the first token, from the request start (s): waiting for
+    # a pool connection, opening it (TCP + TLS, new connections only) and
+    # receiving the response headers
+    pool_wait: float | None = None
+    connect: float | None = None
+    response_headers: float | None = None
+    new_connection: bool = False
+    # Client time per received chunk that completed SSE events, from its
+    # bytes reaching this coroutine to their events being parsed (s)
+    chunk_processing: list[float] = field(default_factory=list)
+    # Generated text, only collected when the caller needs the reply
+    text: str | None = None
+    # time.perf_counter() when the request was sent, and the HTTP status
+    # (None when no response arrived)
+    start: float = 0.0
+    status: int | None = None
+
+    @property
+    def success(self) -> bool:
+        # Token counts no longer decide success: they fall back to client-side counts.
+        # A stream that ended without a single data event (an error body, or
+        # only [DONE]) has no TTFT and fails.
+        return self.latency is not None and self.ttft is not None
+
+    @property
+    def itl(self) -> list[float]:
+        # Inter-token latency: gaps between consecutive content deltas (s)
+        times = self.token_times
+        return [times[i] - times[i - 1] for i in range(1, len(times))]
+
+    @property
+    def tpot(self) -> float | None:
+        # Time per output token after the first one (s)
+        if self.ttft is None or self.latency is None or self.output_tokens < 2:
+            return None
+        return (self.latency - self.ttft) / (self.output_tokens - 1)
+
+    @property
+    def decode_speed(self) -> float | None:
+        # Per-request decode speed (tok/s)
+        tpot = self.tpot
+        return 1.0 / tpot if tpot else None
@@ -0,0 +1,40 @@
+import math
+from array import array
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of floats backed by ``array("d")``; once full, each
+    new sample overwrites the oldest, so memory does not grow with run length.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._full = False
+
+    def __len__(self) -> int:
+        return self.capacity if self._full else self._next
+
+    def append(self, value: float) -> None:
+        self._data[self._next] = value
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+            self._full = True
+
+    def values(self) -> list[float]:
+        """Samples, oldest first."""
+        if not self._full:
+            return self._data[: self._next].tolist()
+        return self._data[self._next :].tolist() + self._data[: self._next].tolist()
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of ``values``; NaN when empty."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
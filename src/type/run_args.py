@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from typing import Literal
 
+from type.slo import SLO
+
 
 @dataclass
 class Args:
@@ -17,4 +19,61 @@ class Args:
     max_tokens: int
     temperature: float
     output_file: str
-    cv_style_output: bool
\ No newline at end of file
+    cv_style_output: bool
+    request_rate: float = 0.0
+    arrival_distribution: Literal["poisson", "gamma", "constant"] = "poisson"
+    burstiness: float = 1.0
+    seed: int | None = None
+    workers: int = 1
+    concurrency_sweep: list[int] | None = None
+    knee_threshold: float = 0.1
+    slo: list[SLO] | None = None
+    goodput_search: Literal["concurrency", "request_rate"] | None = None
+    search_min: float = 1.0
+    search_max: float = 0.0
+    search_tolerance: float = 1.0
+    search_max_steps: int = 8
+    num_prompts: int = 0
+    dataset_sample: Literal["sequential", "random"] = "sequential"
+    tokenizer: str | None = None
+    min_input_tokens: int = 0
+    max_input_tokens: int = 0
+    min_output_tokens: int = 0
+    max_output_tokens: int = 0
+    input_buckets: list[int] | None = None
+    max_tokens_from_dataset: bool = False
+    input_len: int = 0
+    input_len_dist: Literal["fixed", "uniform", "normal", "lognormal"] = "fixed"
+    input_len_std: float = 0.0
+    shared_prefix_len: int = 0
+    shared_prefix_ratio: float = 1.0
+    multi_turn: bool = False
+    max_turns: int = 0
+    think_time: float = 0.0
+    trace: str = ""
+    trace_speed: float = 1.0
+    trace_time_unit: Literal["s", "ms"] = "s"
+    max_connections: int = 0
+    http2: bool = False
+    keepalive: bool = True
+    keepalive_expiry: float = 5.0
+    base_url_file: str = ""
+    load_balance: Literal["round_robin", "least_outstanding", "power_of_two"] = "round_robin"
+    result_log: str = ""
+    metrics_port: int = 0
+    server_metrics_url: str = ""
+    server_metrics_interval: float = 1.0
+    resource_interval: float = 0.5
+    monitor_pid: int = 0
+    loop_lag_threshold: float = 10.0
+    profile: str = ""
+    usage_fallback: Literal["deltas", "tokenizer"] = "deltas"
+    warmup_requests: int = 0
+    warmup_time: int = 0
+    ramp_time: float = 0.0
+    ramp_steps: int = 0
+    steady_state: bool = False
+    steady_window: int = 5
+    steady_tolerance: float = 0.1
+    deadline_policy: Literal["cancel", "drain", "partial"] = "drain"
+    timeseries_interval: float = 1.0
@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+
+from type.histogram import Histogram
+from type.timeline import Timeline
+
+
+@dataclass
+class Samples:
+    # Per-request measurements collected by one load generator (seconds),
+    # kept as fixed-memory histograms so shards and long runs merge cheaply
+    ttft: Histogram = field(default_factory=Histogram)
+    latency: Histogram = field(default_factory=Histogram)
+    token: Histogram = field(default_factory=Histogram)
+    # Per successful request: usage prompt / completion tokens or their fallbacks
+    prompt_tokens: Histogram = field(default_factory=Histogram)
+    output_tokens: Histogram = field(default_factory=Histogram)
+    schedule_lag: Histogram = field(default_factory=Histogram)
+    itl: Histogram = field(default_factory=Histogram)
+    tpot: Histogram = field(default_factory=Histogram)
+    decode_speed: Histogram = field(default_factory=Histogram)
+    # Multi-turn sessions: TTFT of opening turns vs turns that extend a context
+    ttft_first_turn: Histogram = field(default_factory=Histogram)
+    ttft_follow_up: Histogram = field(default_factory=Histogram)
+    # Connection phases of every request that got a response (seconds)
+    pool_wait: Histogram = field(default_factory=Histogram)
+    connect: Histogram = field(default_factory=Histogram)
+    response_headers: Histogram = field(default_factory=Histogram)
+    # Client-side delays: how late the event loop ran a due timer, and the
+    # time spent parsing each received chunk (seconds)
+    loop_lag: Histogram = field(default_factory=Histogram)
+    chunk_processing: Histogram = field(default_factory=Histogram)
+    error_record: list[dict] = field(default_factory=list)
+    # Streamed SSE data events and event-loop thread CPU time spent on them;
+    # None when not measured (rebuilt from a result log)
+    num_chunks: int = 0
+    client_cpu_time: float | None = 0.0
+    # Requests actually sent and multi-turn sessions completed
+    num_requests: int = 0
+    num_sessions: int = 0
+    num_new_connections: int = 0
+    # Content deltas of successful requests, and successful requests whose
+    # stream carried no usage object
+    num_deltas: int = 0
+    num_missing_usage: int = 0
+    # Requests cancelled in flight at a duration run's hard deadline, and
+    # the content deltas they had streamed before it
+    num_cut_off: int = 0
+    cut_off_tokens: int = 0
+    # Send / finish time of every request, for windowed statistics
+    timeline: Timeline = field(default_factory=Timeline)
+    # Finish-time span (s) the per-request figures cover when they were
+    # restricted to a measurement window; None for the whole run
+    measured_span: tuple[float, float] | None = None
+    # Per base URL when requests are spread over several backends
+    backends: dict[str, "Samples"] = field(default_factory=dict)
+
+    def merge(self, other: "Samples") -> None:
+        self.ttft.merge(other.ttft)
+        self.latency.merge(other.latency)
+        self.token.merge(other.token)
+        self.prompt_tokens.merge(other.prompt_tokens)
+        self.output_tokens.merge(other.output_tokens)
+        self.schedule_lag.merge(other.schedule_lag)
+        self.itl.merge(other.itl)
+        self.tpot.merge(other.tpot)
+        self.decode_speed.merge(other.decode_speed)
+        self.ttft_first_turn.merge(other.ttft_first_turn)
+        self.ttft_follow_up.merge(other.ttft_follow_up)
+        self.pool_wait.merge(other.pool_wait)
+        self.connect.merge(other.connect)
+        self.response_headers.merge(other.response_headers)
+        self.loop_lag.merge(other.loop_lag)
+        self.chunk_processing.merge(other.chunk_processing)
+        self.error_record.extend(other.error_record)
+        self.num_chunks += other.num_chunks
+        self.client_cpu_time += other.client_cpu_time
+        self.num_requests += other.num_requests
+        self.num_sessions += other.num_sessions
+        self.num_new_connections += other.num_new_connections
+        self.num_deltas += other.num_deltas
+        self.num_missing_usage += other.num_missing_usage
+        self.num_cut_off += other.num_cut_off
+        self.cut_off_tokens += other.cut_off_tokens
+        self.timeline.merge(other.timeline)
+        for base_url, backend in other.backends.items():
+            self.backends.setdefault(base_url, Samples()).merge(backend)
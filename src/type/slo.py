@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass
+class SLO:
+    # e.g. "p99 TTFT < 500 ms" is SLO(metric="ttft", percentile=99.0, threshold_ms=500.0)
+    metric: Literal["ttft", "tpot", "itl", "latency"]
+    percentile: float
+    threshold_ms: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.metric}_p{self.percentile:g}"
@@ -0,0 +1,74 @@
+import math
+from array import array
+
+# Column name -> array typecode. Times are seconds from the run's dispatch
+# start; ttft / latency are NaN for failed requests, token counts -1 when
+# unknown.
+TIMELINE_COLUMNS = {
+    "start": "d",
+    "end": "d",
+    "ttft": "d",
+    "latency": "d",
+    "output_tokens": "i",
+    "prompt_tokens": "i",
+    "total_tokens": "i",
+    "backend": "h",  # index into backend_urls(args)
+    "runner": "h",  # closed-loop concurrency slot, -1 in open loop
+    "deltas": "i",  # content deltas received, -1 when unknown
+    "usage": "b",  # 1 if the stream carried usage, 0 if not, -1 when unknown
+}
+
+
+class Timeline:
+    """
+    When every request of a run was sent and finished, as compact array
+    columns (about 53 bytes per request), so statistics can be recomputed
+    for any time window after the run. Shards share the dispatch start, so
+    their timelines merge by concatenation.
+
+    Unlike the histograms it is not bounded: steady-state detection only
+    knows its window once the run is over, so every request is kept. At
+    1000 req/s that is roughly 190 MB per hour of run.
+    """
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in TIMELINE_COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns["start"])
+
+    def append(
+        self,
+        start: float,
+        end: float,
+        ttft: float | None,
+        latency: float | None,
+        output_tokens: int,
+        prompt_tokens: int | None,
+        total_tokens: int | None,
+        backend: int = 0,
+        runner: int = -1,
+        deltas: int = -1,
+        has_usage: bool | None = None,
+    ) -> None:
+        columns = self.columns
+        columns["start"].append(start)
+        columns["end"].append(end)
+        columns["ttft"].append(ttft if ttft is not None else math.nan)
+        columns["latency"].append(latency if latency is not None else math.nan)
+        columns["output_tokens"].append(output_tokens)
+        columns["prompt_tokens"].append(prompt_tokens if prompt_tokens is not None else -1)
+        columns["total_tokens"].append(total_tokens if total_tokens is not None else -1)
+        columns["backend"].append(backend)
+        columns["runner"].append(runner)
+        columns["deltas"].append(deltas)
+        columns["usage"].append(int(has_usage) if has_usage is not None else -1)
+
+    def merge(self, other: "Timeline") -> None:
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+
+    @property
+    def span(self) -> float:
+        # Dispatch start to the last completion
+        return max(self.columns["end"], default=0.0)
@@ -0,0 +1,60 @@
+import random
+from typing import Literal
+
+ArrivalDistribution = Literal["poisson", "gamma", "constant"]
+
+
+def build_arrival_schedule(
+    request_rate: float,
+    distribution: ArrivalDistribution = "poisson",
+    burstiness: float = 1.0,
+    seed: int | None = None,
+    num_request: int = 0,
+    duration: float = 0.0,
+) -> list[float]:
+    """
+    Precompute request send offsets (seconds from start) for open-loop load.
+
+    Inter-arrival gaps have mean ``1 / request_rate``. ``poisson`` draws
+    exponential gaps, ``gamma`` draws gamma gaps with shape ``burstiness``
+    (< 1 is burstier than Poisson, > 1 is smoother, 1 equals Poisson) and
+    ``constant`` uses a fixed interval. The schedule stops after
+    ``num_request`` arrivals, or at ``duration`` seconds when ``num_request``
+    is 0.
+    """
+    assert request_rate > 0, f"request_rate is {request_rate}, must be greater than 0."
+    assert burstiness > 0, f"burstiness is {burstiness}, must be greater than 0."
+    assert num_request >= 1 or duration > 0, (
+        "num_request or duration must be given to bound the arrival schedule."
+    )
+
+    rng = random.Random(seed)
+    mean_gap = 1.0 / request_rate
+
+    if distribution == "poisson":
+        def next_gap() -> float:
+            return rng.expovariate(request_rate)
+    elif distribution == "gamma":
+        # Gamma(k, theta) has mean k * theta, so theta = mean_gap / k.
+        theta = mean_gap / burstiness
+
+        def next_gap() -> float:
+            return rng.gammavariate(burstiness, theta)
+    elif distribution == "constant":
+        def next_gap() -> float:
+            return mean_gap
+    else:
+        raise ValueError(f"Unknown arrival distribution: {distribution}")
+
+    schedule: list[float] = list()
+    # The first request goes out immediately.
+    offset = 0.0
+    while True:
+        if num_request >= 1 and len(schedule) >= num_request:
+            break
+        if num_request < 1 and offset >= duration:
+            break
+        schedule.append(offset)
+        offset += next_gap()
+
+    return schedule
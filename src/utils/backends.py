@@ -0,0 +1,85 @@
+import random
+
+import httpx
+
+from type.run_args import Args
+from utils.http_client import build_http_client
+
+
+def backend_urls(args: Args) -> list[str]:
+    """
+    Base URLs from ``--base_url`` (comma-separated) and ``--base_url_file``
+    (one per line, ``#`` comments), in order and without duplicates.
+    """
+    urls = [url.strip() for url in args.base_url.split(",")]
+    if args.base_url_file:
+        with open(args.base_url_file, encoding="utf-8") as f:
+            urls.extend(line.split("#", 1)[0].strip() for line in f)
+    return list(dict.fromkeys(url.rstrip("/") for url in urls if url))
+
+
+class Backend:
+    def __init__(self, index: int, base_url: str, url: str, aclient: httpx.AsyncClient):
+        self.index = index
+        self.base_url = base_url
+        self.url = url
+        self.aclient = aclient
+        # Requests this process has sent to the backend and not finished yet
+        self.outstanding = 0
+
+
+class LoadBalancer:
+    """
+    Spreads requests over one or more backends, each with its own HTTP client
+    and connection pool. Outstanding counts are per process, so with
+    ``--workers`` every shard balances on its own view of the load.
+    """
+
+    POLICIES = ("round_robin", "least_outstanding", "power_of_two")
+
+    def __init__(self, backends: list[Backend], policy: str, seed: int | None = None):
+        self.backends = backends
+        self.policy = policy
+        self._next = 0
+        self._rng = random.Random(seed)
+
+    @property
+    def multiple(self) -> bool:
+        return len(self.backends) > 1
+
+    def pick(self) -> Backend:
+        backends = self.backends
+        if len(backends) == 1:
+            return backends[0]
+        if self.policy == "power_of_two":
+            first, second = self._rng.sample(backends, 2)
+            return second if second.outstanding < first.outstanding else first
+        start = self._next % len(backends)
+        self._next += 1
+        if self.policy == "least_outstanding":
+            # Scan from a rotating start so ties do not all land on the first backend
+            rotated = backends[start:] + backends[:start]
+            return min(rotated, key=lambda backend: backend.outstanding)
+        return backends[start]
+
+    async def __aenter__(self) -> "LoadBalancer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for backend in self.backends:
+            await backend.aclient.aclose()
+
+
+def build_load_balancer(args: Args, concurrency: int) -> LoadBalancer:
+    # Any backend may end up with every in-flight request, so each pool is
+    # sized for the full concurrency
+    backends = [
+        Backend(
+            index=index,
+            base_url=base_url,
+            url=base_url + args.endpoint,
+            aclient=build_http_client(args, concurrency, base_url),
+        )
+        for index, base_url in enumerate(backend_urls(args))
+    ]
+    return LoadBalancer(backends=backends, policy=args.load_balance, seed=args.seed)
@@ -1,21 +1,32 @@
+import asyncio
 import time
+from collections import OrderedDict
 from typing import Literal
 
 import httpx
 import orjson
 
+from type.prompt import Prompt
+from type.request import RequestResult
 from type.run_args import Args
+from utils.tokenizer import TokenCounter
 
 
 def build_payload(
-    completion_type: Literal["chat", "generate"], prompt: str, args: Args
+    completion_type: Literal["chat", "generate"],
+    prompt: str,
+    args: Args,
+    max_tokens: int | None = None,
+    messages: list[dict] | None = None,
 ) -> dict:
+    if max_tokens is None:
+        max_tokens = args.max_tokens
     if completion_type == "chat":
         return {
             "model": args.model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages or [{"role": "user", "content": prompt}],
             "temperature": args.temperature,
-            "max_completion_tokens": args.max_tokens,
+            "max_completion_tokens": max_tokens,
             "stream": True,
             "stream_options": {"include_usage": True},
         }
@@ -23,64 +34,285 @@ def build_payload(
         return {
             "model": args.model,
             "prompt": prompt,
-            "max_tokens": args.max_tokens,
+            "max_tokens": max_tokens,
             "temperature": args.temperature,
             "stream": True,
             "stream_options": {"include_usage": True},
         }
 
 
+# Encoded request bodies kept by PayloadPool
+PAYLOAD_CACHE_SIZE = 4096
+
+
+def encode_payload(payload: dict) -> bytes:
+    return orjson.dumps(payload)
+
+
+class PayloadPool:
+    """
+    Encode each prompt's request body once and reuse the bytes on repeats.
+    Keeps the ``capacity`` most recently used bodies, keyed by prompt id, so
+    a long run over a large dataset does not hold every body in memory.
+    """
+
+    def __init__(
+        self,
+        completion_type: Literal["chat", "generate"],
+        args: Args,
+        capacity: int = PAYLOAD_CACHE_SIZE,
+    ):
+        self.completion_type = completion_type
+        self.args = args
+        self.capacity = capacity
+        self._bodies: OrderedDict[tuple[int | str, int | None], bytes] = OrderedDict()
+
+    def get(self, prompt: Prompt) -> bytes:
+        # Prompts without an id (the fixed --prompt) fall back to their text
+        key = (prompt.prompt_id if prompt.prompt_id is not None else prompt.text, prompt.max_tokens)
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+        body = encode_payload(
+            build_payload(
+                completion_type=self.completion_type,
+                prompt=prompt.text,
+                args=self.args,
+                max_tokens=prompt.max_tokens,
+            )
+        )
+        self._bodies[key] = body
+        if len(self._bodies) > self.capacity:
+            self._bodies.popitem(last=False)
+        return body
+
+
+def _event_data(event: bytes) -> bytes | None:
+    # Fast path: vLLM / OpenAI send exactly one "data: ..." line per event
+    if event.startswith(b"data: "):
+        return event[6:]
+    data_lines = [
+        line[5:].lstrip(b" ") for line in event.split(b"\n") if line.startswith(b"data:")
+    ]
+    return b"\n".join(data_lines) if data_lines else None
+
+
+# Delta fields that carry generated text; the unquoted prefix also matches
+# "reasoning_content"
+_TEXT_KEYS = (b'content":', b'"text":')
+
+
+def _is_token_event(data: bytes) -> bool:
+    # Only a non-empty string counts: the leading role-only chunk, the
+    # finish chunk with an empty delta, tool-call chunks and the trailing
+    # usage chunk carry no generated text
+    for key in _TEXT_KEYS:
+        idx = data.find(key)
+        while idx != -1:
+            value = data[idx + len(key) : idx + len(key) + 3].lstrip(b" ")
+            if value[:1] == b'"' and value[1:2] not in (b'"', b""):
+                return True
+            idx = data.find(key, idx + len(key))
+    return False
+
+
+def _delta_text(data: bytes) -> str:
+    # Only decoded when the reply text is needed, e.g. to continue a session
+    try:
+        choices = orjson.loads(data).get("choices") or [{}]
+    except orjson.JSONDecodeError:
+        return ""
+    choice = choices[0]
+    delta = choice.get("delta")
+    if delta is not None:
+        return delta.get("content") or ""
+    return choice.get("text") or ""
+
+
+def _parse_usage(data: bytes) -> dict | None:
+    # Only the final chunk carries a usage object; skip the JSON decode for
+    # every other chunk, including the ones that send "usage": null.
+    idx = data.find(b'"usage"')
+    if idx == -1:
+        return None
+    if data[idx + 7 : idx + 16].lstrip(b": \t").startswith(b"null"):
+        return None
+
+    try:
+        parsed = orjson.loads(data)
+    except Exception as e:
+        print(f"Chunk parse error: {e}")
+        return None
+
+    usage = parsed.get("usage")
+    return usage if isinstance(usage, dict) else None
+
+
+def _set_phase_timing(result: RequestResult, phases: dict[str, float], start: float) -> None:
+    # httpcore trace events: a new connection emits connect_tcp (and
+    # start_tls), a reused one goes straight to send_request_headers; what
+    # comes before either is time spent waiting for a pool slot.
+    connect_start = phases.get("connect_tcp.started")
+    send_start = phases.get("send_request_headers.started")
+    first = connect_start if connect_start is not None else send_start
+    if first is not None:
+        result.pool_wait = first - start
+    if connect_start is not None:
+        result.new_connection = True
+        connect_end = phases.get("start_tls.complete") or phases.get("connect_tcp.complete")
+        if connect_end is not None:
+            result.connect = connect_end - connect_start
+    headers = phases.get("receive_response_headers.complete")
+    if headers is not None:
+        result.response_headers = headers - start
+
+
+def fill_missing_usage(
+    result: RequestResult,
+    prompt_tokens: int | None,
+    counter: TokenCounter | None = None,
+    prompt_text: str | None = None,
+) -> None:
+    """
+    Complete the token counts of a successful stream that carried no usage
+    object. Generated tokens stay the number of content deltas unless a
+    ``counter`` re-tokenizes the collected reply; prompt tokens come from the
+    prompt's known length, else from ``counter`` on ``prompt_text``.
+    """
+    if result.has_usage or not result.success:
+        return
+    if counter is not None:
+        if result.text is not None:
+            result.output_tokens = counter.count([result.text])[0]
+        if prompt_tokens is None and prompt_text is not None:
+            prompt_tokens = counter.count([prompt_text])[0]
+    result.prompt_tokens = prompt_tokens
+    result.token = (prompt_tokens or 0) + result.output_tokens
+
+
 async def request_openai_format(
     aclient: httpx.AsyncClient,
     url: str,
     headers: dict,
-    payload: dict,
+    payload: bytes,
     timeout: int,
     error_record: list[dict] | None = None,
-) -> tuple[float | None, float | None, int | None]:
+    collect_text: bool = False,
+    cut_off: list[RequestResult] | None = None,
+) -> RequestResult:
+    """
+    Stream one completion and time it. A request cancelled mid-stream (e.g.
+    at a hard deadline) leaves its partial result in ``cut_off``.
+    """
+    phases: dict[str, float] = dict()
+
+    async def trace(event: str, info: dict) -> None:
+        # "connection.connect_tcp.started" -> "connect_tcp.started"
+        phases[event.partition(".")[2]] = time.perf_counter()
+
     start = time.perf_counter()
+    result = RequestResult(start=start)
     try:
         async with aclient.stream(
-            "POST", url=url, headers=headers, json=payload, timeout=timeout
+            "POST",
+            url=url,
+            headers=headers,
+            content=payload,
+            timeout=timeout,
+            extensions={"trace": trace},
         ) as response:
+            _set_phase_timing(result, phases, start)
+            result.status = response.status_code
             if response.status_code == 200:
-                first_chunk_received = False
-                async for chunk in response.aiter_lines():
-                    if chunk.startswith("data: "):
-                        data = chunk[6:]
-                        if data.strip() == "[DONE]":
-                            break
+                # Frame SSE events on raw bytes; only decode what we need
+                if "content-encoding" in response.headers:
+                    byte_stream = response.aiter_bytes()
+                else:
+                    byte_stream = response.aiter_raw()
+
+                buffer = b""
+                done = False
+                first_chunk = None
+                text_parts: list[str] = list()
+                async for raw in byte_stream:
+                    received = time.perf_counter()
+                    buffer = buffer + raw if buffer else raw
+                    if b"\r" in buffer:
+                        buffer = buffer.replace(b"\r\n", b"\n")
+                    if b"\n\n" not in buffer:
+                        continue
 
-                        try:
-                            parsed = orjson.loads(data)
-                        except Exception as e:
-                            print(f"Chunk parse error: {e}")
+                    *events, buffer = buffer.split(b"\n\n")
+                    for event in events:
+                        data = _event_data(event)
+                        if data is None:
                             continue
+                        if data.strip() == b"[DONE]":
+                            done = True
+                            break
 
-                        if not first_chunk_received:
-                            first_chunk_received = True
-                            ttft = time.perf_counter() - start
+                        # Events arrived together with their chunk; parsing earlier
+                        # events of the same chunk does not delay them
+                        now = received - start
+                        if first_chunk is None:
+                            first_chunk = now
+                        result.num_chunks += 1
+                        if _is_token_event(data):
+                            result.token_times.append(now)
+                            if collect_text:
+                                text_parts.append(_delta_text(data))
 
-                        usage = parsed.get("usage")
-                        if isinstance(usage, dict):
-                            token = usage.get("total_tokens", 0)
-                        else:
-                            token = None
+                        usage = _parse_usage(data)
+                        if usage is not None:
+                            result.has_usage = True
+                            result.token = usage.get("total_tokens", 0)
+                            result.prompt_tokens = usage.get("prompt_tokens")
+                            result.output_tokens = usage.get("completion_tokens", 0)
+                    result.chunk_processing.append(time.perf_counter() - received)
+                    if done:
+                        break
 
-                latency = time.perf_counter() - start
-                return ttft, latency, token
+                result.latency = time.perf_counter() - start
+                if done:
+                    # Read the end of the chunked body (normally already
+                    # buffered) so the connection goes back to the pool
+                    # instead of being closed unread.
+                    async for _ in byte_stream:
+                        pass
+                # TTFT is the first generated delta; fall back to the first
+                # chunk when the stream carried no content at all.
+                result.ttft = result.token_times[0] if result.token_times else first_chunk
+                if not result.output_tokens:
+                    result.output_tokens = len(result.token_times)
+                if collect_text:
+                    result.text = "".join(text_parts)
+                if first_chunk is None and error_record is not None:
+                    # No data event at all: the request failed, keep what the body held
+                    error_record.append(
+                        {
+                            "request": orjson.loads(payload),
+                            "status": response.status_code,
+                            "response": buffer.decode(errors="replace"),
+                        }
+                    )
             else:
                 if error_record is not None:
                     error_text = await response.aread()
                     error_record.append(
                         {
-                            "request": payload,
+                            "request": orjson.loads(payload),
                             "status": response.status_code,
                             "response": error_text.decode(),
                         }
                     )
-                return None, None, None
 
+    except asyncio.CancelledError:
+        if cut_off is not None:
+            cut_off.append(result)
+        raise
     except Exception as e:
         print(f"Request failed: {repr(e)}")
-        return None, None, None
\ No newline at end of file
+        return RequestResult(start=start)
+
+    return result
@@ -1,36 +1,510 @@
+import bisect
+import functools
+import hashlib
 import itertools
+import mmap
 import os
-from typing import Iterator
+import random
+import re
+import struct
+from array import array
+from collections.abc import Callable
+from typing import Iterator, Literal
 
 import orjson
-from anyio import open_file
+from anyio import to_thread
 
+from type.prompt import Prompt
+from type.run_args import Args
+from utils.synthetic import (
+    build_synthetic_prompts,
+    synthetic_label,
+    synthetic_pool_size,
+)
+from utils.tokenizer import HEURISTIC, TokenCounter
+from utils.trace import load_trace
 
-async def read_dataset_file(path: str) -> dict[str, str]:
-    prompts: dict[str, str] = dict()
+# Index file: header, then offsets (u64), record lengths (u32) and first-turn
+# prompt lengths in characters (u32), one entry per usable record.
+INDEX_SUFFIX = ".idx"
+_INDEX_MAGIC = b"LBDI"
+_INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sI16sQ")
 
-    async with await open_file(path) as f:
-        contents = await f.read()
+# Token-count cache: header, then prompt and reference-answer token counts
+# (u32 columns) aligned with the index entries, one file per tokenizer.
+_TOKENS_MAGIC = b"LBTC"
+_TOKENS_VERSION = 1
+_TOKENS_HEADER = struct.Struct("<4sI16s16sQ")
+_TOKENIZE_BATCH = 1024
 
+# Sampled prompts are decoded before the run when their first turns add up
+# to at most this many characters; larger samples are decoded one record at
+# a time as the run goes
+PRELOAD_CHARS = 256 << 20
+
+# ShareGPT speaker tags of the user side of a conversation
+USER_ROLES = ("human", "user")
+
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_STRING_END = re.compile(rb'["\\]')
+_FINGERPRINT_SPAN = 1 << 20
+
+
+def _scan_records(buf) -> Iterator[tuple[int, int]]:
+    """
+    Yield ``(offset, length)`` of every top-level record object, either the
+    elements of a JSON array (ShareGPT) or one object per line (JSONL),
+    without decoding the file.
+    """
+    structural = _STRUCTURAL.search
+    string_end = _STRING_END.search
+    depth = 0
+    record_depth = None
+    start = 0
+    pos = 0
+    while True:
+        m = structural(buf, pos)
+        if m is None:
+            break
+        c = buf[m.start()]
+        pos = m.end()
+        if c == 0x22:  # '"': skip to the closing quote, honouring escapes
+            while True:
+                s = string_end(buf, pos)
+                if s is None:
+                    raise RuntimeError("JSON decode error")
+                pos = s.end()
+                if buf[s.start()] == 0x5C:
+                    pos += 1
+                else:
+                    break
+        elif c == 0x7B or c == 0x5B:  # '{' or '['
+            if record_depth is None:
+                record_depth = 1 if c == 0x5B else 0
+            if depth == record_depth and c == 0x7B:
+                start = m.start()
+            depth += 1
+        else:
+            depth -= 1
+            if depth == record_depth and c == 0x7D:
+                yield start, pos - start
+
+    if depth != 0:
+        raise RuntimeError("JSON decode error")
+
+
+def _fingerprint(path: str) -> bytes:
+    # Size + mtime catch rewrites, head/tail digest catches copies that keep
+    # the mtime; hashing the whole multi-GB file would defeat the cache.
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(struct.pack("<QQ", stat.st_size, stat.st_mtime_ns))
+    with open(path, "rb") as f:
+        digest.update(f.read(_FINGERPRINT_SPAN))
+        if stat.st_size > _FINGERPRINT_SPAN:
+            f.seek(max(stat.st_size - _FINGERPRINT_SPAN, _FINGERPRINT_SPAN))
+            digest.update(f.read(_FINGERPRINT_SPAN))
+    return digest.digest()
+
+
+class DatasetIndex:
+    """
+    Memory-mapped view of a ShareGPT-style dataset: prompts are decoded one
+    record at a time from their byte offsets, never the whole corpus.
+    """
+
+    def __init__(
+        self, path: str, fingerprint: bytes, offsets, lengths, prompt_lengths, index_map=None
+    ):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.offsets = offsets
+        self.lengths = lengths
+        self.prompt_lengths = prompt_lengths
+        self._index_map = index_map
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def record(self, i: int) -> dict:
+        offset = self.offsets[i]
+        return orjson.loads(self._data[offset : offset + self.lengths[i]])
+
+    def prompt(self, i: int) -> str:
+        return self.record(i)["conversations"][0]["value"]
+
+    def user_turns(self, i: int) -> list[str]:
+        return [
+            turn["value"]
+            for turn in self.record(i)["conversations"]
+            if turn.get("from") in USER_ROLES
+        ]
+
+
+def build_dataset_index(path: str) -> tuple[array, array, array]:
+    offsets, lengths, prompt_lengths = array("Q"), array("I"), array("I")
+    if os.path.getsize(path) == 0:
+        return offsets, lengths, prompt_lengths
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for offset, length in _scan_records(buf):
+            try:
+                record = orjson.loads(buf[offset : offset + length])
+            except orjson.JSONDecodeError:
+                raise RuntimeError("JSON decode error") from None
+            # Keep every record, including repeated ids
+            conversations = record.get("conversations")
+            if not conversations:
+                continue
+            offsets.append(offset)
+            lengths.append(length)
+            prompt_lengths.append(len(conversations[0]["value"]))
+
+    return offsets, lengths, prompt_lengths
+
+
+def _write_columns(path: str, header: bytes, columns: list[array]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for column in columns:
+            column.tofile(f)
+    # Atomic, so concurrent workers never see a half-written file
+    os.replace(tmp_path, path)
+
+
+def _map_columns(path: str, header: struct.Struct, formats: str):
+    """
+    Map a cache file written by ``_write_columns``; returns the header fields,
+    one zero-copy memoryview per column and the mmap, or None if unusable.
+    The header's last field must be the row count.
+    """
     try:
-        dec_contents = orjson.loads(contents)
-    except orjson.JSONDecodeError:
-        raise RuntimeError("JSON decode error") from None
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size < header.size:
+            return None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    fields = header.unpack_from(data)
+    count = fields[-1]
+    widths = [array(fmt).itemsize for fmt in formats]
+    if len(data) != header.size + count * sum(widths):
+        data.close()
+        return None
+
+    view = memoryview(data)
+    columns = list()
+    pos = header.size
+    for fmt, width in zip(formats, widths):
+        columns.append(view[pos : pos + count * width].cast(fmt))
+        pos += count * width
+    return fields, columns, data
+
+
+def load_dataset_index(path: str) -> DatasetIndex:
+    """Open the cached index next to the dataset, (re)building it when stale."""
+    if os.path.getsize(path) == 0:
+        raise RuntimeError(f"Dataset {path} is empty")
+    index_path = path + INDEX_SUFFIX
+    fingerprint = _fingerprint(path)
+    cached = _map_columns(index_path, _INDEX_HEADER, "QII")
+    if cached is not None:
+        (magic, version, stored, _), columns, index_map = cached
+        if magic == _INDEX_MAGIC and version == _INDEX_VERSION and stored == fingerprint:
+            return DatasetIndex(path, fingerprint, *columns, index_map)
+
+    print(f"Indexing dataset {path} (cached in {index_path})")
+    columns = build_dataset_index(path)
+    try:
+        _write_columns(
+            index_path,
+            _INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, fingerprint, len(columns[0])),
+            list(columns),
+        )
+    except OSError as e:
+        print(f"Dataset index not cached: {e}")
+    return DatasetIndex(path, fingerprint, *columns)
+
+
+def token_counts_path(path: str, tokenizer: str) -> str:
+    slug = hashlib.blake2b(tokenizer.encode(), digest_size=4).hexdigest()
+    return f"{path}.tokens-{slug}.bin"
+
+
+def build_token_counts(index: DatasetIndex, counter: TokenCounter) -> tuple[array, array]:
+    input_tokens, output_tokens = array("I"), array("I")
+    for start in range(0, len(index), _TOKENIZE_BATCH):
+        prompts, answers = list(), list()
+        for i in range(start, min(start + _TOKENIZE_BATCH, len(index))):
+            conversations = index.record(i)["conversations"]
+            prompts.append(conversations[0]["value"])
+            # The reference answer is the turn that follows the prompt
+            answers.append(conversations[1]["value"] if len(conversations) > 1 else "")
+        input_tokens.extend(counter.count(prompts))
+        output_tokens.extend(counter.count(answers))
+    return input_tokens, output_tokens
+
+
+def _read_token_counts(index: DatasetIndex, tokenizer: str):
+    cached = _map_columns(token_counts_path(index.path, tokenizer), _TOKENS_HEADER, "II")
+    if cached is None:
+        return None
+    (magic, version, fingerprint, tokenizer_digest, count), columns, _ = cached
+    if (
+        magic != _TOKENS_MAGIC
+        or version != _TOKENS_VERSION
+        or fingerprint != index.fingerprint
+        or tokenizer_digest != hashlib.blake2b(tokenizer.encode(), digest_size=16).digest()
+        or count != len(index)
+    ):
+        return None
+    return columns
+
+
+def load_token_counts(index: DatasetIndex, tokenizer: str | None) -> tuple:
+    """
+    Prompt and reference-answer token counts per index entry, tokenized once
+    and cached next to the dataset. Falls back to the chars/4 heuristic when
+    ``tokenizer`` cannot be loaded locally.
+    """
+    requested = tokenizer or HEURISTIC
+    cached = _read_token_counts(index, requested)
+    if cached is not None:
+        return tuple(cached)
+
+    counter = TokenCounter(tokenizer)
+    if counter.name != requested:
+        cached = _read_token_counts(index, counter.name)
+        if cached is not None:
+            return tuple(cached)
+
+    counts_path = token_counts_path(index.path, counter.name)
+    print(f"Counting dataset tokens with {counter.name} (cached in {counts_path})")
+    input_tokens, output_tokens = build_token_counts(index, counter)
+    try:
+        _write_columns(
+            counts_path,
+            _TOKENS_HEADER.pack(
+                _TOKENS_MAGIC,
+                _TOKENS_VERSION,
+                index.fingerprint,
+                hashlib.blake2b(counter.name.encode(), digest_size=16).digest(),
+                len(index),
+            ),
+            [input_tokens, output_tokens],
+        )
+    except OSError as e:
+        print(f"Token counts not cached: {e}")
+    return input_tokens, output_tokens
+
+
+def filter_by_length(
+    size: int,
+    input_tokens,
+    output_tokens,
+    min_input: int = 0,
+    max_input: int = 0,
+    min_output: int = 0,
+    max_output: int = 0,
+):
+    """Indices whose token counts fall within the bounds (0 = unbounded)."""
+    if not (min_input or max_input or min_output or max_output):
+        return range(size)
+    max_input = max_input or float("inf")
+    max_output = max_output or float("inf")
+    return array(
+        "I",
+        (
+            i
+            for i in range(size)
+            if min_input <= input_tokens[i] <= max_input
+            and min_output <= output_tokens[i] <= max_output
+        ),
+    )
+
+
+def sample_indices(
+    candidates,
+    num_prompts: int = 0,
+    sample: Literal["sequential", "random"] = "sequential",
+    seed: int | None = None,
+):
+    """Pick ``num_prompts`` of the candidate indices (0 = all) without touching the records."""
+    count = min(num_prompts, len(candidates)) if num_prompts > 0 else len(candidates)
+    if sample == "random":
+        if count < len(candidates):
+            return random.Random(seed).sample(candidates, count)
+        order = array("I", candidates)
+        random.Random(seed).shuffle(order)
+        return order
+    return candidates[:count]
+
+
+def parse_bucket_edges(text: str) -> list[int]:
+    edges = sorted({int(edge) for edge in text.split(",") if edge.strip()})
+    if not edges or edges[0] < 1:
+        raise ValueError(f"Invalid bucket edges: {text!r}")
+    return edges
+
+
+def bucket_indices(
+    candidates,
+    input_tokens,
+    edges: list[int],
+    num_prompts: int = 0,
+    sample: Literal["sequential", "random"] = "sequential",
+    seed: int | None = None,
+) -> tuple[list[int], dict[str, int]]:
+    """
+    Split candidates into input-length buckets at ``edges`` and draw the same
+    number from each non-empty bucket (``num_prompts`` split evenly, or the
+    smallest bucket's size), interleaved so every stretch of the run mixes
+    all lengths.
+    """
+    buckets = [array("I") for _ in range(len(edges) + 1)]
+    for i in candidates:
+        buckets[bisect.bisect_right(edges, input_tokens[i])].append(i)
+
+    bounds = [0, *edges, None]
+    labels = [f"[{lo}, {hi if hi is not None else 'inf'})" for lo, hi in zip(bounds, bounds[1:])]
+    non_empty = [(label, bucket) for label, bucket in zip(labels, buckets) if bucket]
+    if not non_empty:
+        return list(), dict()
+
+    if num_prompts > 0:
+        per_bucket = max(num_prompts // len(non_empty), 1)
+    else:
+        per_bucket = min(len(bucket) for _, bucket in non_empty)
+    picked = [sample_indices(bucket, per_bucket, sample, seed) for _, bucket in non_empty]
+    interleaved = [i for group in itertools.zip_longest(*picked) for i in group if i is not None]
+    return interleaved, {label: len(p) for (label, _), p in zip(non_empty, picked)}
+
+
+def _decode_prompt(
+    index: DatasetIndex,
+    i: int,
+    input_tokens=None,
+    output_tokens=None,
+    multi_turn: bool = False,
+    max_turns: int = 0,
+) -> Prompt:
+    follow_up_turns = None
+    if multi_turn:
+        turns = index.user_turns(i) or [index.prompt(i)]
+        if max_turns > 0:
+            turns = turns[:max_turns]
+        text, follow_up_turns = turns[0], turns[1:]
+    else:
+        text = index.prompt(i)
+    return Prompt(
+        text=text,
+        input_tokens=input_tokens[i] if input_tokens is not None else None,
+        # An empty reference answer keeps args.max_tokens
+        max_tokens=(output_tokens[i] or None) if output_tokens is not None else None,
+        follow_up_turns=follow_up_turns,
+        prompt_id=i,
+    )
+
+
+def iter_prompts(decode: Callable[[int], Prompt], indices) -> Iterator[Prompt]:
+    # For samples too large to keep decoded: cycle over indices rather than
+    # itertools.cycle(prompts), which would keep every decoded prompt alive.
+    while True:
+        for i in indices:
+            yield decode(i)
+
+
+def needs_token_counts(args: Args) -> bool:
+    return bool(
+        args.tokenizer
+        or args.min_input_tokens
+        or args.max_input_tokens
+        or args.min_output_tokens
+        or args.max_output_tokens
+        or args.input_buckets
+        or args.max_tokens_from_dataset
+    )
+
+
+def dataset_label(args: Args) -> str:
+    if args.trace:
+        return f"trace {os.path.basename(args.trace)} x{args.trace_speed:g}"
+    if os.path.isfile(args.dataset_path):
+        return os.path.basename(args.dataset_path)
+    if args.input_len > 0:
+        return synthetic_label(args)
+    return ""
 
-    for data in dec_contents:
-        if len(data["conversations"]) == 0:
-            continue
-        prompts.update({data["id"]: data["conversations"][0]["value"]})
 
-    return prompts
+async def build_dataset(args: Args) -> Iterator[Prompt]:
+    if args.trace:
+        # Prompts in trace order, aligned with the schedule from build_schedule
+        _, prompts = load_trace(args.trace, args.trace_speed, args.trace_time_unit, args.seed)
+        print(f"Dataset: {len(prompts)} trace records")
+        return itertools.cycle(prompts)
+    if not os.path.isfile(args.dataset_path):
+        if args.input_len > 0:
+            prompts = build_synthetic_prompts(args, synthetic_pool_size(args))
+            print(f"Dataset: {len(prompts)} {synthetic_label(args)} prompts")
+            return itertools.cycle(prompts)
+        return itertools.cycle([Prompt(text=args.prompt)])
 
+    index = await to_thread.run_sync(load_dataset_index, args.dataset_path)
+    input_tokens = output_tokens = None
+    if needs_token_counts(args):
+        input_tokens, output_tokens = await to_thread.run_sync(
+            load_token_counts, index, args.tokenizer or args.model
+        )
 
-async def build_dataset(path: str, prompt: str) -> Iterator[str]:
-    if os.path.isfile(path):
-        datasets = await read_dataset_file(path=path)
-        datasets_cycle = itertools.cycle(datasets.values())
+    candidates = filter_by_length(
+        len(index),
+        input_tokens,
+        output_tokens,
+        min_input=args.min_input_tokens,
+        max_input=args.max_input_tokens,
+        min_output=args.min_output_tokens,
+        max_output=args.max_output_tokens,
+    )
+    if len(candidates) == 0:
+        raise RuntimeError(f"No prompts in dataset {args.dataset_path} match the length filters")
 
+    if args.input_buckets:
+        indices, bucket_counts = bucket_indices(
+            candidates,
+            input_tokens,
+            args.input_buckets,
+            num_prompts=args.num_prompts,
+            sample=args.dataset_sample,
+            seed=args.seed,
+        )
+        for label, count in bucket_counts.items():
+            print(f"Input tokens {label}: {count} prompts")
     else:
-        datasets_cycle = itertools.cycle([prompt])
+        indices = sample_indices(candidates, args.num_prompts, args.dataset_sample, args.seed)
+    print(
+        f"Dataset: {len(indices)} of {len(index)} prompts "
+        f"({len(candidates)} within length filters, {args.dataset_sample})"
+    )
 
-    return datasets_cycle
\ No newline at end of file
+    decode = functools.partial(
+        _decode_prompt,
+        index,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens if args.max_tokens_from_dataset else None,
+        multi_turn=args.multi_turn,
+        max_turns=args.max_turns,
+    )
+    # First-turn length from the index, without decoding anything
+    sampled_chars = sum(index.prompt_lengths[i] for i in indices)
+    if sampled_chars > PRELOAD_CHARS:
+        print(f"Dataset: {sampled_chars} prompt characters, decoding prompts as the run goes")
+        return iter_prompts(decode, indices)
+    # Decoded once, off the event loop, so sending a request does no JSON work
+    prompts = await to_thread.run_sync(lambda: [decode(i) for i in indices])
+    return itertools.cycle(prompts)
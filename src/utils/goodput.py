@@ -0,0 +1,188 @@
+import asyncio
+import json
+import math
+
+from anyio import open_file
+
+from type.histogram import Histogram
+from type.request import RequestResult
+from type.samples import Samples
+from type.slo import SLO
+from utils.reporting import VERSION
+
+
+def parse_slos(text: str) -> list[SLO]:
+    """Parse ``"ttft_p99=500,tpot_p95=50"`` (thresholds in ms) into SLOs."""
+    slos: list[SLO] = list()
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        try:
+            key, threshold = item.split("=")
+            metric, percentile = key.strip().split("_p")
+        except ValueError:
+            raise ValueError(f"Invalid SLO {item!r}, expected e.g. ttft_p99=500") from None
+        if metric not in ("ttft", "tpot", "itl", "latency"):
+            raise ValueError(f"Unknown SLO metric {metric!r}")
+        slos.append(
+            SLO(metric=metric, percentile=float(percentile), threshold_ms=float(threshold))
+        )
+    if not slos:
+        raise ValueError("At least one SLO is required")
+    return slos
+
+
+def _slo_histogram(samples: Samples, slo: SLO) -> Histogram:
+    return getattr(samples, slo.metric)
+
+
+def _request_value(result: RequestResult, slo: SLO) -> float | None:
+    # Per-request value in seconds; ITL is a per-token metric and only
+    # checked on the aggregated distribution.
+    if slo.metric == "ttft":
+        return result.ttft
+    if slo.metric == "tpot":
+        return result.tpot
+    if slo.metric == "latency":
+        return result.latency
+    return None
+
+
+def _observed(histogram: Histogram, percentile: float, failures: int) -> float | None:
+    # Failed requests rank above every measured value; None when the
+    # percentile falls on one of them
+    total = histogram.count + failures
+    if not total:
+        return None
+    index = math.floor(percentile / 100 * (total - 1))
+    if index >= histogram.count:
+        return None
+    if histogram.count == 1:
+        return histogram.min
+    # Same rank rule as Histogram.percentile, aimed between two ranks
+    return histogram.percentile((index + 0.5) / (histogram.count - 1) * 100)
+
+
+def evaluate_slos(samples: Samples, slos: list[SLO], failures: int = 0) -> dict[str, float | None]:
+    """
+    Observed value (ms) of every SLO percentile, counting ``failures`` failed
+    requests as violations; None when the percentile is a failed request.
+    """
+    observed = dict()
+    for slo in slos:
+        value = _observed(_slo_histogram(samples, slo), slo.percentile, failures)
+        observed[slo.name] = round(value * 1000, 2) if value is not None else None
+    return observed
+
+
+def slos_met(samples: Samples, slos: list[SLO], failures: int = 0) -> bool:
+    if not samples.latency:
+        return False
+    observed = evaluate_slos(samples, slos, failures)
+    return all(
+        observed[slo.name] is not None and observed[slo.name] <= slo.threshold_ms
+        for slo in slos
+    )
+
+
+def allowed_violations(percentile: float, total_requests: int) -> int:
+    """
+    Most requests out of ``total_requests`` that may exceed a threshold while
+    the ``percentile`` stays within it. Same rank rule as
+    ``Histogram.percentile``: the value at sorted index
+    ``floor(percentile / 100 * (n - 1))``.
+    """
+    if total_requests < 1:
+        return 0
+    return total_requests - 1 - math.floor(percentile / 100 * (total_requests - 1))
+
+
+class SLOTracker:
+    """
+    Count requests that individually meet every SLO threshold (goodput) and
+    flag a step as lost once more requests have violated an SLO than its
+    percentile allows over the planned requests of the step: the step can
+    no longer pass, whatever the remaining requests do.
+    """
+
+    def __init__(self, slos: list[SLO], total_requests: int | None = None):
+        self.slos = slos
+        self.total_requests = total_requests
+        self.met = 0
+        self.violations = {slo.name: 0 for slo in slos}
+        self.allowed = {
+            slo.name: allowed_violations(slo.percentile, total_requests)
+            for slo in slos
+            if total_requests
+        }
+        self.stop = asyncio.Event()
+
+    def observe(self, result: RequestResult) -> None:
+        within = True
+        for slo in self.slos:
+            # A failed request violates every SLO
+            if result.success:
+                value = _request_value(result, slo)
+                if value is None or value * 1000 <= slo.threshold_ms:
+                    continue
+            within = False
+            self.violations[slo.name] += 1
+            if slo.name in self.allowed and self.violations[slo.name] > self.allowed[slo.name]:
+                self.stop.set()
+        if within:
+            self.met += 1
+
+
+def build_goodput_report(
+    model: str,
+    dataset: str,
+    slos: list[SLO],
+    search: str,
+    steps: list[dict],
+) -> dict:
+    passed = [step for step in steps if step["Passed"]]
+    best = max(passed, key=lambda step: step["Goodput (req/s)"]) if passed else None
+    return {
+        "Version": VERSION,
+        "Model": model,
+        "Dataset": dataset,
+        "Search": search,
+        "SLO": {slo.name: slo.threshold_ms for slo in slos},
+        "Result": {
+            "Load": best["Load"],
+            "Max goodput (req/s)": best["Goodput (req/s)"],
+            "Request per second (req/s)": best["Request per second (req/s)"],
+            "Observed (ms)": best["Observed (ms)"],
+        }
+        if best is not None
+        else None,
+        "Steps": steps,
+    }
+
+
+def print_goodput_report(report: dict) -> None:
+    print("\n***** 🎯 SLO GOODPUT SEARCH *****")
+    print("SLO: " + ", ".join(f"{name} <= {ms} ms" for name, ms in report["SLO"].items()))
+    print(f"{report['Search']:>12} {'pass':>5} {'early':>6} {'req/s':>9} {'goodput':>9}  observed (ms)")
+    for step in report["Steps"]:
+        observed = ", ".join(f"{k}={v}" for k, v in step["Observed (ms)"].items())
+        print(
+            f"{step['Load']:>12} {'yes' if step['Passed'] else 'no':>5} "
+            f"{'yes' if step['Stopped early'] else 'no':>6} "
+            f"{step['Request per second (req/s)']:>9} {step['Goodput (req/s)']:>9}  {observed}"
+        )
+
+    result = report["Result"]
+    if result is None:
+        print("Result: no tested load met the SLO")
+    else:
+        print(
+            f"Result: max goodput {result['Max goodput (req/s)']} req/s "
+            f"at {report['Search']} {result['Load']}"
+        )
+
+
+async def save_goodput_report_as_file(data: dict, save_path: str) -> None:
+    async with await open_file(save_path, "w") as f:
+        encode_data = json.dumps(data, indent=2, ensure_ascii=True)
+        await f.write(encode_data)
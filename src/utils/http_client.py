@@ -0,0 +1,39 @@
+import httpx
+
+from type.run_args import Args
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+
+def is_open_loop(args: Args) -> bool:
+    return args.request_rate > 0 or bool(args.trace) or args.goodput_search == "request_rate"
+
+
+def pool_size(args: Args, concurrency: int) -> int | None:
+    """
+    Connections the client may open: ``max_connections`` if given, else one
+    per closed-loop worker, or unbounded in open-loop mode where in-flight
+    requests are not capped, so requests never queue inside the client.
+    """
+    if args.max_connections > 0:
+        return args.max_connections
+    if is_open_loop(args):
+        return None
+    return max(concurrency, 1)
+
+
+def build_http_client(args: Args, concurrency: int, base_url: str) -> httpx.AsyncClient:
+    max_connections = pool_size(args, concurrency)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections if args.keepalive else 0,
+        keepalive_expiry=args.keepalive_expiry if args.keepalive else 0,
+    )
+    # Plain-http servers only speak HTTP/2 with prior knowledge; over TLS
+    # it is negotiated via ALPN and HTTP/1.1 stays available as a fallback
+    http1 = not (args.http2 and base_url.startswith("http://"))
+    return httpx.AsyncClient(limits=limits, http1=http1, http2=args.http2)
@@ -0,0 +1,234 @@
+import asyncio
+import multiprocessing
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from type.request import RequestResult
+
+# Prometheus histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+ITL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Name -> (help, buckets)
+HISTOGRAMS = {
+    "ttft_seconds": ("Time to first token", LATENCY_BUCKETS),
+    "itl_seconds": ("Inter-token latency", ITL_BUCKETS),
+    "request_latency_seconds": ("End-to-end request latency", LATENCY_BUCKETS),
+}
+
+# Layout of the flat counter array: four scalars, then per histogram one
+# count per bucket, one for +Inf and the sum of observed values
+IN_FLIGHT, COMPLETED, FAILED, OUTPUT_TOKENS = range(4)
+_OFFSETS: dict[str, int] = dict()
+_size = 4
+for _name, (_, _buckets) in HISTOGRAMS.items():
+    _OFFSETS[_name] = _size
+    _size += len(_buckets) + 2
+SIZE = _size
+
+# Window of the tokens/s and req/s gauges (seconds)
+RATE_WINDOW = 10
+
+
+class MetricsRecorder:
+    """
+    Hot-path side of the live metrics: plain float increments on one slice
+    of the counter array, so recording costs a few additions per request
+    and one bucket lookup per token.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def request_started(self) -> None:
+        self.values[IN_FLIGHT] += 1
+
+    def request_ended(self) -> None:
+        self.values[IN_FLIGHT] -= 1
+
+    def _observe(self, name: str, buckets: tuple, value: float) -> None:
+        offset = _OFFSETS[name]
+        self.values[offset + bisect_left(buckets, value)] += 1
+        self.values[offset + len(buckets) + 1] += value
+
+    def observe(self, result: RequestResult) -> None:
+        values = self.values
+        if not result.success:
+            values[FAILED] += 1
+            return
+        values[COMPLETED] += 1
+        values[OUTPUT_TOKENS] += result.output_tokens
+        self._observe("ttft_seconds", LATENCY_BUCKETS, result.ttft)
+        self._observe("request_latency_seconds", LATENCY_BUCKETS, result.latency)
+        times = result.token_times
+        if len(times) > 1:
+            offset = _OFFSETS["itl_seconds"]
+            total = 0.0
+            previous = times[0]
+            for now in times[1:]:
+                gap = now - previous
+                values[offset + bisect_left(ITL_BUCKETS, gap)] += 1
+                total += gap
+                previous = now
+            values[offset + len(ITL_BUCKETS) + 1] += total
+
+
+class LiveMetrics:
+    """
+    Counter storage for ``num_shards`` load generators. With several worker
+    processes it lives in shared memory: each process writes only its own
+    slice, the parent sums the slices when scraped.
+    """
+
+    def __init__(self, num_shards: int = 1):
+        self.num_shards = num_shards
+        if num_shards == 1:
+            self.shared = None
+            # A memoryview, so recorder slices share the storage instead of copying it
+            self._view = memoryview(array("d", bytes(8 * SIZE)))
+        else:
+            self.shared = multiprocessing.get_context("spawn").RawArray("d", SIZE * num_shards)
+            self._view = shard_view(self.shared)
+
+    def recorder(self, shard_index: int = 0) -> MetricsRecorder:
+        return MetricsRecorder(shard_slice(self._view, shard_index))
+
+    def totals(self) -> list[float]:
+        view = self._view
+        return [
+            sum(view[shard * SIZE + i] for shard in range(self.num_shards))
+            for i in range(SIZE)
+        ]
+
+
+def shard_view(shared) -> memoryview:
+    return memoryview(shared).cast("B").cast("d")
+
+
+def shard_slice(view, shard_index: int):
+    return view[shard_index * SIZE : (shard_index + 1) * SIZE]
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsServer:
+    """Serves the live counters in Prometheus text format on ``/metrics``."""
+
+    def __init__(self, metrics: LiveMetrics, port: int, labels: dict[str, str]):
+        self.metrics = metrics
+        self.port = port
+        self.labels = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        self._server = None
+        self._sampler = None
+        # (time, completed + failed, output tokens) once per second for the rate gauges
+        self._history: deque = deque(maxlen=RATE_WINDOW + 1)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self.handle, "127.0.0.1", self.port)
+        self._sampler = asyncio.create_task(self._sample())
+
+    async def close(self) -> None:
+        if self._sampler is not None:
+            self._sampler.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _sample(self) -> None:
+        while True:
+            totals = self.metrics.totals()
+            self._history.append(
+                (time.perf_counter(), totals[COMPLETED] + totals[FAILED], totals[OUTPUT_TOKENS])
+            )
+            await asyncio.sleep(1)
+
+    def _rates(self) -> tuple[float, float]:
+        if len(self._history) < 2:
+            return 0.0, 0.0
+        (t0, requests0, tokens0), (t1, requests1, tokens1) = self._history[0], self._history[-1]
+        return (requests1 - requests0) / (t1 - t0), (tokens1 - tokens0) / (t1 - t0)
+
+    def render(self) -> bytes:
+        totals = self.metrics.totals()
+        requests_per_sec, tokens_per_sec = self._rates()
+        labels = self.labels
+        lines = list()
+
+        def scalar(name: str, kind: str, help_text: str, value: float) -> None:
+            lines.append(f"# HELP llm_benchmark_{name} {help_text}")
+            lines.append(f"# TYPE llm_benchmark_{name} {kind}")
+            lines.append(f"llm_benchmark_{name}{{{labels}}} {_format(value)}")
+
+        scalar("requests_in_flight", "gauge", "Requests sent and not finished", totals[IN_FLIGHT])
+        scalar("requests_completed_total", "counter", "Successful requests", totals[COMPLETED])
+        scalar("requests_failed_total", "counter", "Failed requests", totals[FAILED])
+        scalar("output_tokens_total", "counter", "Generated tokens", totals[OUTPUT_TOKENS])
+        scalar(
+            "requests_per_second", "gauge",
+            f"Finished requests per second over the last {RATE_WINDOW}s", requests_per_sec,
+        )
+        scalar(
+            "output_tokens_per_second", "gauge",
+            f"Generated tokens per second over the last {RATE_WINDOW}s", tokens_per_sec,
+        )
+
+        prefix = f"{labels}," if labels else ""
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            offset = _OFFSETS[name]
+            lines.append(f"# HELP llm_benchmark_{name} {help_text}")
+            lines.append(f"# TYPE llm_benchmark_{name} histogram")
+            cumulative = 0.0
+            for i, bound in enumerate((*buckets, "+Inf")):
+                cumulative += totals[offset + i]
+                lines.append(
+                    f'llm_benchmark_{name}_bucket{{{prefix}le="{bound}"}} {_format(cumulative)}'
+                )
+            lines.append(f"llm_benchmark_{name}_sum{{{labels}}} {_format(totals[offset + len(buckets) + 1])}")
+            lines.append(f"llm_benchmark_{name}_count{{{labels}}} {_format(cumulative)}")
+        return ("\n".join(lines) + "\n").encode()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode().split(" ")
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = b"200 OK", self.render()
+            else:
+                status, body = b"404 Not Found", b"not found\n"
+            writer.write(
+                b"HTTP/1.1 " + status
+                + b"\r\ncontent-type: text/plain; version=0.0.4\r\nconnection: close\r\n"
+                + b"content-length: %d\r\n\r\n" % len(body)
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+@asynccontextmanager
+async def serve_live_metrics(
+    port: int, num_shards: int, labels: dict[str, str]
+) -> AsyncIterator[LiveMetrics | None]:
+    """Serve ``/metrics`` on ``port`` for the duration of the block; port 0 disables it."""
+    if not port:
+        yield None
+        return
+    live_metrics = LiveMetrics(num_shards)
+    server = MetricsServer(live_metrics, port, labels)
+    await server.start()
+    print(f"\n📈 Live metrics on http://127.0.0.1:{port}/metrics")
+    try:
+        yield live_metrics
+    finally:
+        await server.close()
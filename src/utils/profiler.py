@@ -0,0 +1,96 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+# Stack samples per second taken by the sampling profiler
+SAMPLING_RATE = 100
+
+
+def profile_path(output_file: str, mode: str) -> str:
+    """Profile written next to the report: ``report.json`` -> ``report.prof`` / ``report.stacks.txt``."""
+    base = os.path.splitext(output_file)[0] if output_file else "./client_profile"
+    return base + (".prof" if mode == "cprofile" else ".stacks.txt")
+
+
+class ClientProfiler:
+    """
+    Profiles the benchmark client's event-loop thread while the load runs.
+
+    ``cprofile`` traces every call (exact counts, noticeable overhead) and
+    dumps pstats, readable with ``python -m pstats`` or snakeviz.
+    ``sampling`` reads the thread's stack ``SAMPLING_RATE`` times per
+    second from a helper thread and writes collapsed stacks
+    (``frame;frame;frame count``) for flamegraph.pl / speedscope. It is far
+    cheaper, but the sampler only runs when the GIL is free, so frames that
+    release it (socket calls, select) are over-represented.
+    """
+
+    def __init__(self, mode: str, path: str):
+        assert mode in PROFILE_MODES, f"unknown profile mode {mode}"
+        self.mode = mode
+        self.path = path
+        self._profile: cProfile.Profile | None = None
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = threading.Thread(
+                target=self._sample, args=(threading.get_ident(),), daemon=True
+            )
+            self._sampler.start()
+
+    def _sample(self, thread_id: int) -> None:
+        interval = 1.0 / SAMPLING_RATE
+        labels: dict = dict()
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = list()
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = (
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        if self.mode == "cprofile":
+            self._profile.disable()
+            self._profile.dump_stats(self.path)
+            return
+        self._stop.set()
+        self._sampler.join()
+        with open(self.path, "w") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, limit: int = 10) -> str:
+        """Top functions by own time (cprofile) or by samples on top of the stack (sampling)."""
+        if self.mode == "cprofile":
+            stats = pstats.Stats(self._profile)
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+            return "\n".join(
+                f"{tottime * 1000:10.1f} ms  {name} ({os.path.basename(filename)}:{line})"
+                for (filename, line, name), (_, _, tottime, _, _) in rows[:limit]
+            )
+        total = sum(self._stacks.values())
+        leaves: Counter = Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return "\n".join(
+            f"{count / total * 100:9.1f} %  {frame}" for frame, count in leaves.most_common(limit)
+        )
@@ -1,14 +1,111 @@
 import json
+import statistics
 
 from anyio import open_file
 
-from type.metrics import TTFT, Latency, Token
+from type.histogram import Histogram
+from type.metrics import (
+    ITL,
+    TPOT,
+    TTFT,
+    BackendBreakdown,
+    ClientLag,
+    ConnectionTiming,
+    Deadline,
+    DecodeSpeed,
+    Latency,
+    ProcessUsage,
+    ResourceUsage,
+    RunnerBreakdown,
+    RunPhase,
+    SchedulingLag,
+    ServerMetrics,
+    TimeSeries,
+    Token,
+    TokenAccounting,
+)
 from type.report import Report
+from type.samples import Samples
 
 # Version constant
 VERSION = "v1.0"
 
 
+# Tail percentiles reported for every latency-like metric: JSON label -> field suffix
+PERCENTILE_LABELS = {"50": "50", "90": "90", "95": "95", "99": "99", "99.9": "999"}
+
+
+def _percentile_fields(hist: Histogram, name: str, scale: float = 1.0) -> dict:
+    # p50_ttft, p90_ttft, ..., p999_ttft for the metric dataclasses
+    return {
+        f"p{suffix}_{name}": round(hist.percentile(float(label)) * scale, 2)
+        for label, suffix in PERCENTILE_LABELS.items()
+    }
+
+
+def _ttft(hist: Histogram) -> TTFT:
+    return TTFT(
+        avg_ttft=round(hist.mean * 1000, 2),
+        max_ttft=round(hist.max * 1000, 2),
+        min_ttft=round(hist.min * 1000, 2),
+        **_percentile_fields(hist, "ttft", 1000),
+    )
+
+
+def _backend_breakdown(
+    base_url: str,
+    requests: int,
+    duration: float,
+    ttft_hist: Histogram,
+    latency_hist: Histogram,
+    token_hist: Histogram,
+) -> BackendBreakdown:
+    return BackendBreakdown(
+        base_url=base_url,
+        requests=requests,
+        successful_requests=latency_hist.count,
+        request_per_sec=round(requests / duration, 2) if duration > 0 else 0.0,
+        throughput_token=round(token_hist.total / duration, 2) if duration > 0 else 0.0,
+        avg_ttft=round(ttft_hist.mean * 1000, 2),
+        p50_ttft=round(ttft_hist.percentile(50) * 1000, 2),
+        p99_ttft=round(ttft_hist.percentile(99) * 1000, 2),
+        avg_latency=round(latency_hist.mean, 2),
+        p50_latency=round(latency_hist.percentile(50), 2),
+        p99_latency=round(latency_hist.percentile(99), 2),
+    )
+
+
+def _backend_rows(
+    backends: dict[str, Samples] | None,
+    requests: int,
+    duration: float,
+    ttft_hist: Histogram,
+    latency_hist: Histogram,
+    token_hist: Histogram,
+) -> list[BackendBreakdown] | None:
+    if not backends:
+        return None
+    rows = [
+        _backend_breakdown(
+            base_url, samples.num_requests, duration,
+            samples.ttft, samples.latency, samples.token,
+        )
+        for base_url, samples in sorted(backends.items())
+    ]
+    rows.append(
+        _backend_breakdown(
+            "aggregate", requests, duration, ttft_hist, latency_hist, token_hist
+        )
+    )
+    return rows
+
+
+def _cpu_per_chunk(client_cpu_time: float | None, num_chunks: int) -> float | None:
+    if client_cpu_time is None:
+        return None
+    return round(client_cpu_time / num_chunks * 1e6, 2) if num_chunks else 0.0
+
+
 def generate_test_report(
     model: str,
     max_tokens: int,
@@ -17,28 +114,123 @@ def generate_test_report(
     duration: float,
     dataset: str,
     prompt: str,
-    ttft_list: list[float],
-    latency_list: list[float],
-    token_list: list[int],
+    ttft_hist: Histogram,
+    latency_hist: Histogram,
+    token_hist: Histogram,
+    request_rate: float | None = None,
+    schedule_lag_hist: Histogram | None = None,
+    client_cpu_time: float | None = 0.0,
+    num_chunks: int = 0,
+    itl_hist: Histogram | None = None,
+    tpot_hist: Histogram | None = None,
+    decode_speed_hist: Histogram | None = None,
+    num_sessions: int | None = None,
+    ttft_first_turn_hist: Histogram | None = None,
+    ttft_follow_up_hist: Histogram | None = None,
+    trace_speed: float | None = None,
+    trace_span: float | None = None,
+    pool_wait_hist: Histogram | None = None,
+    connect_hist: Histogram | None = None,
+    response_headers_hist: Histogram | None = None,
+    new_connections: int = 0,
+    max_connections: int | None = None,
+    http2: bool = False,
+    backends: dict[str, Samples] | None = None,
+    server_metrics: ServerMetrics | None = None,
+    resources: ResourceUsage | None = None,
+    loop_lag_hist: Histogram | None = None,
+    chunk_processing_hist: Histogram | None = None,
+    loop_lag_threshold: float = 10.0,
+    prompt_tokens_hist: Histogram | None = None,
+    output_tokens_hist: Histogram | None = None,
+    num_deltas: int = 0,
+    num_missing_usage: int = 0,
+    usage_fallback: str = "deltas",
+    phases: list[RunPhase] | None = None,
+    deadline: Deadline | None = None,
+    timeseries: TimeSeries | None = None,
 ) -> Report:
-    ttft = TTFT(
-        avg_ttft=round(sum(ttft_list) / len(ttft_list) * 1000, 2),
-        max_ttft=round(max(ttft_list) * 1000, 2),
-        min_ttft=round(min(ttft_list) * 1000, 2),
-    )
+    ttft = _ttft(ttft_hist)
 
     latency = Latency(
-        avg_latency=round(sum(latency_list) / len(latency_list), 2),
-        max_latency=round(max(latency_list), 2),
-        min_latency=round(min(latency_list), 2),
+        avg_latency=round(latency_hist.mean, 2),
+        max_latency=round(latency_hist.max, 2),
+        min_latency=round(latency_hist.min, 2),
+        **_percentile_fields(latency_hist, "latency"),
     )
 
     token = Token(
-        avg_token=round(sum(token_list) / len(token_list), 2),
-        max_token=max(token_list),
-        min_token=min(token_list),
+        avg_token=round(token_hist.mean, 2),
+        max_token=token_hist.max,
+        min_token=token_hist.min,
     )
 
+    # Tokens streamed by requests cut off at the deadline ("partial")
+    partial_tokens = deadline.partial_tokens if deadline is not None else 0
+    tokens = _token_accounting(
+        prompt_tokens_hist,
+        output_tokens_hist,
+        num_deltas,
+        num_missing_usage,
+        usage_fallback,
+        duration,
+        partial_tokens,
+    )
+
+    itl = None
+    if itl_hist:
+        itl = ITL(
+            avg_itl=round(itl_hist.mean * 1000, 2),
+            max_itl=round(itl_hist.max * 1000, 2),
+            min_itl=round(itl_hist.min * 1000, 2),
+            **_percentile_fields(itl_hist, "itl", 1000),
+        )
+
+    tpot = None
+    if tpot_hist:
+        tpot = TPOT(
+            avg_tpot=round(tpot_hist.mean * 1000, 2),
+            max_tpot=round(tpot_hist.max * 1000, 2),
+            min_tpot=round(tpot_hist.min * 1000, 2),
+            **_percentile_fields(tpot_hist, "tpot", 1000),
+        )
+
+    decode_speed = None
+    if decode_speed_hist:
+        decode_speed = DecodeSpeed(
+            avg_decode_speed=round(decode_speed_hist.mean, 2),
+            max_decode_speed=round(decode_speed_hist.max, 2),
+            min_decode_speed=round(decode_speed_hist.min, 2),
+        )
+
+    scheduling_lag = None
+    if schedule_lag_hist:
+        scheduling_lag = SchedulingLag(
+            avg_lag=round(schedule_lag_hist.mean * 1000, 2),
+            max_lag=round(schedule_lag_hist.max * 1000, 2),
+            min_lag=round(schedule_lag_hist.min * 1000, 2),
+            **_percentile_fields(schedule_lag_hist, "lag", 1000),
+        )
+
+    client_lag = _client_lag(loop_lag_hist, chunk_processing_hist, loop_lag_threshold)
+
+    connection = None
+    if pool_wait_hist:
+        connection = ConnectionTiming(
+            avg_pool_wait=round(pool_wait_hist.mean * 1000, 2),
+            p99_pool_wait=round(pool_wait_hist.percentile(99) * 1000, 2),
+            max_pool_wait=round(pool_wait_hist.max * 1000, 2),
+            avg_connect=round(connect_hist.mean * 1000, 2) if connect_hist else 0.0,
+            p99_connect=round(connect_hist.percentile(99) * 1000, 2) if connect_hist else 0.0,
+            max_connect=round(connect_hist.max * 1000, 2) if connect_hist else 0.0,
+            avg_response_headers=round(response_headers_hist.mean * 1000, 2),
+            p50_response_headers=round(response_headers_hist.percentile(50) * 1000, 2),
+            p99_response_headers=round(response_headers_hist.percentile(99) * 1000, 2),
+            new_connections=new_connections,
+            max_connections=max_connections,
+            http2=http2,
+        )
+
     return Report(
         model=model,
         max_tokens=max_tokens,
@@ -46,15 +238,117 @@ def generate_test_report(
         total_requests=requests,
         total_duration_time=round(duration, 2),
         dataset=dataset if dataset else prompt,
-        successful_requests=len(latency_list),
-        request_per_sec=round(requests / duration, 2),
-        throughput_token=round(sum(token_list) / duration, 2),
+        successful_requests=latency_hist.count,
+        request_per_sec=round(requests / duration, 2) if duration > 0 else 0.0,
+        throughput_token=round((token_hist.total + partial_tokens) / duration, 2)
+        if duration > 0
+        else 0.0,
         ttft=ttft,
         latency=latency,
         token=token,
+        tokens=tokens,
+        itl=itl,
+        tpot=tpot,
+        decode_speed=decode_speed,
+        client_cpu_time=round(client_cpu_time, 2) if client_cpu_time is not None else None,
+        client_cpu_per_chunk=_cpu_per_chunk(client_cpu_time, num_chunks),
+        request_rate=request_rate,
+        scheduling_lag=scheduling_lag,
+        num_sessions=num_sessions,
+        ttft_first_turn=_ttft(ttft_first_turn_hist) if ttft_first_turn_hist else None,
+        ttft_follow_up=_ttft(ttft_follow_up_hist) if ttft_follow_up_hist else None,
+        trace_speed=trace_speed,
+        trace_span=round(trace_span, 2) if trace_span is not None else None,
+        client_lag=client_lag,
+        phases=phases,
+        deadline=deadline,
+        timeseries=timeseries,
+        connection=connection,
+        backends=_backend_rows(
+            backends, requests, duration, ttft_hist, latency_hist, token_hist
+        ),
+        server_metrics=server_metrics,
+        resources=resources,
+    )
+
+
+def _token_accounting(
+    prompt_tokens_hist: Histogram | None,
+    output_tokens_hist: Histogram | None,
+    num_deltas: int,
+    num_missing_usage: int,
+    usage_fallback: str,
+    duration: float,
+    partial_tokens: int = 0,
+) -> TokenAccounting | None:
+    if not output_tokens_hist:
+        return None
+    prompt_total = int(prompt_tokens_hist.total) if prompt_tokens_hist else 0
+    output_total = int(output_tokens_hist.total)
+    # Partial streams count towards throughput, not the per-request figures
+    decoded = output_total + partial_tokens
+    return TokenAccounting(
+        avg_prompt_tokens=round(prompt_tokens_hist.mean, 2) if prompt_tokens_hist else 0.0,
+        avg_completion_tokens=round(output_tokens_hist.mean, 2),
+        total_prompt_tokens=prompt_total,
+        total_completion_tokens=output_total,
+        total_deltas=num_deltas,
+        missing_usage=num_missing_usage,
+        usage_fallback=usage_fallback,
+        prefill_throughput=round(prompt_total / duration, 2) if duration > 0 else 0.0,
+        decode_throughput=round(decoded / duration, 2) if duration > 0 else 0.0,
+    )
+
+
+def _client_lag(
+    loop_lag_hist: Histogram | None,
+    chunk_processing_hist: Histogram | None,
+    threshold: float,
+) -> ClientLag | None:
+    if not loop_lag_hist:
+        return None
+    p99_loop_lag = round(loop_lag_hist.percentile(99) * 1000, 2)
+    chunk = chunk_processing_hist if chunk_processing_hist else None
+    return ClientLag(
+        avg_loop_lag=round(loop_lag_hist.mean * 1000, 2),
+        p50_loop_lag=round(loop_lag_hist.percentile(50) * 1000, 2),
+        p99_loop_lag=p99_loop_lag,
+        max_loop_lag=round(loop_lag_hist.max * 1000, 2),
+        avg_chunk_processing=round(chunk.mean * 1e6, 2) if chunk else 0.0,
+        p99_chunk_processing=round(chunk.percentile(99) * 1e6, 2) if chunk else 0.0,
+        max_chunk_processing=round(chunk.max * 1e6, 2) if chunk else 0.0,
+        threshold=threshold,
+        trustworthy=p99_loop_lag <= threshold,
+    )
+
+
+def _spread(values: list[float | None]) -> str:
+    # "min / median / max" of per-window values, skipping empty windows
+    known = [value for value in values if value is not None]
+    if not known:
+        return "None"
+    return f"{min(known)} / {round(statistics.median(known), 2)} / {max(known)}"
+
+
+def _lag_warning(client_lag: ClientLag | None) -> str | None:
+    if client_lag is None or client_lag.trustworthy:
+        return None
+    return (
+        f"results untrustworthy: client event-loop lag P99 {client_lag.p99_loop_lag} ms exceeds "
+        f"{client_lag.threshold} ms, so TTFT / ITL include client-side delay; add --workers or lower the load"
     )
 
 
+def _percentile_entries(metric, name: str, unit: str) -> dict:
+    # {"P50 ttft (ms)": ..., "P99.9 ttft (ms)": ...} for the JSON report
+    if metric is None:
+        return {}
+    return {
+        f"P{label} {name} ({unit})": getattr(metric, f"p{suffix}_{name}")
+        for label, suffix in PERCENTILE_LABELS.items()
+    }
+
+
 async def save_report_as_file(data: Report, save_path: str) -> None:
     report_content = {
         "Version": VERSION,
@@ -71,23 +365,426 @@ async def save_report_as_file(data: Report, save_path: str) -> None:
             "Avg ttft (ms)": data.ttft.avg_ttft,
             "Max ttft (ms)": data.ttft.max_ttft,
             "Min ttft (ms)": data.ttft.min_ttft,
+            **_percentile_entries(data.ttft, "ttft", "ms"),
         },
         "Latency": {
             "Avg latency (s)": data.latency.avg_latency,
             "Max latency (s)": data.latency.max_latency,
             "Min latency (s)": data.latency.min_latency,
+            **_percentile_entries(data.latency, "latency", "s"),
         },
         "Token": {
             "Avg token (tok/req)": data.token.avg_token,
             "Max token (tok/req)": data.token.max_token,
             "Min token (tok/req)": data.token.min_token,
         },
+        "ITL": {
+            "Avg itl (ms)": data.itl.avg_itl if data.itl else None,
+            "Max itl (ms)": data.itl.max_itl if data.itl else None,
+            "Min itl (ms)": data.itl.min_itl if data.itl else None,
+            **_percentile_entries(data.itl, "itl", "ms"),
+        },
+        "TPOT": {
+            "Avg tpot (ms)": data.tpot.avg_tpot if data.tpot else None,
+            "Max tpot (ms)": data.tpot.max_tpot if data.tpot else None,
+            "Min tpot (ms)": data.tpot.min_tpot if data.tpot else None,
+            **_percentile_entries(data.tpot, "tpot", "ms"),
+        },
+        "Decode speed": {
+            "Avg decode speed (tok/s)": data.decode_speed.avg_decode_speed
+            if data.decode_speed
+            else None,
+            "Max decode speed (tok/s)": data.decode_speed.max_decode_speed
+            if data.decode_speed
+            else None,
+            "Min decode speed (tok/s)": data.decode_speed.min_decode_speed
+            if data.decode_speed
+            else None,
+        },
+        "Client overhead": {
+            "Client CPU time (s)": data.client_cpu_time,
+            "Client CPU per chunk (us)": data.client_cpu_per_chunk,
+        }
+        if data.client_cpu_time is not None
+        else {},
     }
+    if data.request_rate is not None:
+        report_content["Request rate (req/s)"] = data.request_rate
+    if data.scheduling_lag is not None:
+        report_content["Scheduling lag"] = {
+            "Avg lag (ms)": data.scheduling_lag.avg_lag,
+            "Max lag (ms)": data.scheduling_lag.max_lag,
+            "Min lag (ms)": data.scheduling_lag.min_lag,
+            **_percentile_entries(data.scheduling_lag, "lag", "ms"),
+        }
+    if data.connection is not None:
+        conn = data.connection
+        report_content["Connection"] = {
+            "HTTP/2": conn.http2,
+            "Max connections": conn.max_connections,
+            "New connections": conn.new_connections,
+            "Avg pool wait (ms)": conn.avg_pool_wait,
+            "P99 pool wait (ms)": conn.p99_pool_wait,
+            "Max pool wait (ms)": conn.max_pool_wait,
+            "Avg connect (ms)": conn.avg_connect,
+            "P99 connect (ms)": conn.p99_connect,
+            "Max connect (ms)": conn.max_connect,
+            "Avg response headers (ms)": conn.avg_response_headers,
+            "P50 response headers (ms)": conn.p50_response_headers,
+            "P99 response headers (ms)": conn.p99_response_headers,
+        }
+    if data.trace_speed is not None:
+        report_content["Trace replay"] = {
+            "Speed": data.trace_speed,
+            "Scheduled span (s)": data.trace_span,
+        }
+    if data.num_sessions is not None:
+        report_content["Sessions"] = {
+            "Completed sessions": data.num_sessions,
+            **{
+                title: {
+                    "Avg ttft (ms)": metric.avg_ttft,
+                    "Max ttft (ms)": metric.max_ttft,
+                    "Min ttft (ms)": metric.min_ttft,
+                    **_percentile_entries(metric, "ttft", "ms"),
+                }
+                if metric is not None
+                else None
+                for title, metric in (
+                    ("TTFT first turn", data.ttft_first_turn),
+                    ("TTFT follow-up turns", data.ttft_follow_up),
+                )
+            },
+        }
+    if data.phases is not None:
+        report_content["Phases"] = [
+            {
+                "Phase": row.phase,
+                "Start (s)": row.start,
+                "End (s)": row.end,
+                "Total requests": row.requests,
+                "Successful requests": row.successful_requests,
+                "Request per second (req/s)": row.request_per_sec,
+                "Decode throughput (tok/s)": row.decode_throughput,
+                "Avg ttft (ms)": row.avg_ttft,
+                "P99 ttft (ms)": row.p99_ttft,
+                "Avg latency (s)": row.avg_latency,
+            }
+            for row in data.phases
+        ]
+    if data.deadline is not None:
+        deadline = data.deadline
+        report_content["Deadline"] = {
+            "Policy": deadline.policy,
+            "Window (s)": deadline.window,
+            "In flight at deadline": deadline.in_flight,
+            "Partial tokens": deadline.partial_tokens,
+            "Overrun (s)": deadline.overrun,
+        }
+    if data.timeseries is not None:
+        report_content["Time series"] = {
+            "Interval (s)": data.timeseries.interval,
+            "Windows": [
+                {
+                    "Start (s)": window.start,
+                    "Total requests": window.requests,
+                    "Errors": window.errors,
+                    "Request per second (req/s)": window.request_per_sec,
+                    "Decode throughput (tok/s)": window.decode_throughput,
+                    "P50 ttft (ms)": window.p50_ttft,
+                    "P99 ttft (ms)": window.p99_ttft,
+                    "P50 latency (s)": window.p50_latency,
+                    "P99 latency (s)": window.p99_latency,
+                    "In flight": window.in_flight,
+                }
+                for window in data.timeseries.windows
+            ],
+        }
+    if data.tokens is not None:
+        tokens = data.tokens
+        report_content["Tokens"] = {
+            "Avg prompt tokens (tok/req)": tokens.avg_prompt_tokens,
+            "Avg completion tokens (tok/req)": tokens.avg_completion_tokens,
+            "Total prompt tokens": tokens.total_prompt_tokens,
+            "Total completion tokens": tokens.total_completion_tokens,
+            "Total content deltas": tokens.total_deltas,
+            "Requests without usage": tokens.missing_usage,
+            "Usage fallback": tokens.usage_fallback,
+            "Prefill throughput (tok/s)": tokens.prefill_throughput,
+            "Decode throughput (tok/s)": tokens.decode_throughput,
+        }
+    if data.client_lag is not None:
+        lag = data.client_lag
+        report_content["Client lag"] = {
+            "Avg loop lag (ms)": lag.avg_loop_lag,
+            "P50 loop lag (ms)": lag.p50_loop_lag,
+            "P99 loop lag (ms)": lag.p99_loop_lag,
+            "Max loop lag (ms)": lag.max_loop_lag,
+            "Avg chunk processing (us)": lag.avg_chunk_processing,
+            "P99 chunk processing (us)": lag.p99_chunk_processing,
+            "Max chunk processing (us)": lag.max_chunk_processing,
+            "Threshold (ms)": lag.threshold,
+            "Trustworthy": lag.trustworthy,
+        }
+    if data.backends is not None:
+        report_content["Backends"] = [
+            {
+                "Base URL": row.base_url,
+                "Total requests": row.requests,
+                "Successful requests": row.successful_requests,
+                "Request per second (req/s)": row.request_per_sec,
+                "Throughput token (tok/s)": row.throughput_token,
+                "Avg ttft (ms)": row.avg_ttft,
+                "P50 ttft (ms)": row.p50_ttft,
+                "P99 ttft (ms)": row.p99_ttft,
+                "Avg latency (s)": row.avg_latency,
+                "P50 latency (s)": row.p50_latency,
+                "P99 latency (s)": row.p99_latency,
+            }
+            for row in data.backends
+        ]
+    if data.server_metrics is not None:
+        server = data.server_metrics
+        report_content["Server metrics"] = {
+            "URL": server.url,
+            "Samples": server.num_samples,
+            "Scrape errors": server.num_errors,
+            "Avg running requests": server.avg_running,
+            "Max running requests": server.max_running,
+            "Avg waiting requests": server.avg_waiting,
+            "Max waiting requests": server.max_waiting,
+            "Avg KV cache usage (%)": server.avg_kv_cache_usage,
+            "Max KV cache usage (%)": server.max_kv_cache_usage,
+            "Preemptions": server.preemptions,
+            "By latency phase": [
+                {
+                    "Phase": row.phase,
+                    "Latency range": row.latency_range,
+                    "Requests": row.requests,
+                    "Avg running requests": row.avg_running,
+                    "Avg waiting requests": row.avg_waiting,
+                    "Avg KV cache usage (%)": row.avg_kv_cache_usage,
+                }
+                for row in server.phases
+            ],
+        }
+    if data.resources is not None:
+        resources = data.resources
+        report_content["Resources"] = {
+            "Sample interval (s)": resources.interval,
+            "Samples": resources.num_samples,
+            "Avg / Max network sent (MB/s)": [resources.avg_net_sent, resources.max_net_sent],
+            "Avg / Max network received (MB/s)": [resources.avg_net_recv, resources.max_net_recv],
+            **{
+                f"{usage.label.capitalize()} process": _process_entries(usage)
+                for usage in (resources.client, resources.server)
+                if usage is not None
+            },
+        }
     async with await open_file(save_path, "w") as f:
         encode_data = json.dumps(report_content, indent=2, ensure_ascii=True)
         await f.write(encode_data)
 
 
+def _process_entries(usage: ProcessUsage) -> dict:
+    return {
+        "PID": usage.pid,
+        "Max processes": usage.max_processes,
+        "Avg CPU (%)": usage.avg_cpu,
+        "P50 CPU (%)": usage.p50_cpu,
+        "P99 CPU (%)": usage.p99_cpu,
+        "Max CPU (%)": usage.max_cpu,
+        "P90 busiest process CPU (%)": usage.p90_busiest_cpu,
+        "Avg RSS (MB)": usage.avg_rss_mb,
+        "Max RSS (MB)": usage.max_rss_mb,
+        "Max threads": usage.max_threads,
+        "Avg context switches (/s)": usage.avg_ctx_switches,
+        "CPU bound": usage.cpu_bound,
+    }
+
+
+def _cpu_bound_warning(usage: ProcessUsage | None) -> str | None:
+    if usage is None or usage.label != "client" or not usage.cpu_bound:
+        return None
+    return (
+        f"client process is CPU-bound (busiest process P90 {usage.p90_busiest_cpu}% of a core): "
+        "latencies include client-side queueing, add --workers or lower the load"
+    )
+
+
+def print_test_report(report: Report) -> None:
+    report_content = f"""
+***** 📊 REPORT *****
+Model: {report.model}
+Limit output tokens: {report.max_tokens}
+Num concurrency: {report.num_concurrency}
+Total requests: {report.total_requests}
+Duration time (s): {report.total_duration_time}
+Dataset: {report.dataset}
+Successful requests: {report.successful_requests}
+Request per second (req/s): {report.request_per_sec}
+Throughput token (tok/s, prompt + completion): {report.throughput_token}
+***** TIME TO FIRST TOKEN *****
+Avg ttft (ms): {report.ttft.avg_ttft}
+Max ttft (ms): {report.ttft.max_ttft}
+Min ttft (ms): {report.ttft.min_ttft}
+P50/P90/P95/P99/P99.9 ttft (ms): {report.ttft.p50_ttft} / {report.ttft.p90_ttft} / {report.ttft.p95_ttft} / {report.ttft.p99_ttft} / {report.ttft.p999_ttft}
+***** LATENCY *****
+Avg latency (ms): {report.latency.avg_latency}
+Max latency (ms): {report.latency.max_latency}
+Min latency (ms): {report.latency.min_latency}
+P50/P90/P95/P99/P99.9 latency (ms): {report.latency.p50_latency} / {report.latency.p90_latency} / {report.latency.p95_latency} / {report.latency.p99_latency} / {report.latency.p999_latency}
+***** TOKEN *****
+Avg token (tok/req): {report.token.avg_token}
+Max token (tok/req): {report.token.max_token}
+Min token (tok/req): {report.token.min_token}
+Avg prompt / completion tokens (tok/req): {f'{report.tokens.avg_prompt_tokens} / {report.tokens.avg_completion_tokens}' if report.tokens else None}
+Prefill / decode throughput (tok/s): {f'{report.tokens.prefill_throughput} / {report.tokens.decode_throughput}' if report.tokens else None}
+Content deltas: {report.tokens.total_deltas if report.tokens else None}, requests without usage: {f'{report.tokens.missing_usage} (counted by {report.tokens.usage_fallback})' if report.tokens else None}
+***** INTER-TOKEN LATENCY *****
+Avg itl (ms): {report.itl.avg_itl if report.itl else None}
+Max itl (ms): {report.itl.max_itl if report.itl else None}
+Min itl (ms): {report.itl.min_itl if report.itl else None}
+P50/P90/P95/P99/P99.9 itl (ms): {f'{report.itl.p50_itl} / {report.itl.p90_itl} / {report.itl.p95_itl} / {report.itl.p99_itl} / {report.itl.p999_itl}' if report.itl else None}
+***** TIME PER OUTPUT TOKEN *****
+Avg tpot (ms): {report.tpot.avg_tpot if report.tpot else None}
+Max tpot (ms): {report.tpot.max_tpot if report.tpot else None}
+Min tpot (ms): {report.tpot.min_tpot if report.tpot else None}
+P50/P90/P95/P99/P99.9 tpot (ms): {f'{report.tpot.p50_tpot} / {report.tpot.p90_tpot} / {report.tpot.p95_tpot} / {report.tpot.p99_tpot} / {report.tpot.p999_tpot}' if report.tpot else None}
+***** DECODE SPEED *****
+Avg decode speed (tok/s): {report.decode_speed.avg_decode_speed if report.decode_speed else None}
+Max decode speed (tok/s): {report.decode_speed.max_decode_speed if report.decode_speed else None}
+Min decode speed (tok/s): {report.decode_speed.min_decode_speed if report.decode_speed else None}
+            """
+    if report.client_cpu_time is not None or report.client_lag is not None:
+        report_content = report_content.rstrip() + "\n***** CLIENT OVERHEAD *****\n"
+    if report.client_cpu_time is not None:
+        report_content = report_content.rstrip() + f"""
+Client CPU time (s): {report.client_cpu_time}
+Client CPU per chunk (us): {report.client_cpu_per_chunk}
+            """
+    if report.client_lag is not None:
+        lag = report.client_lag
+        report_content = report_content.rstrip() + f"""
+Avg / P50 / P99 / Max event-loop lag (ms): {lag.avg_loop_lag} / {lag.p50_loop_lag} / {lag.p99_loop_lag} / {lag.max_loop_lag}
+Avg / P99 / Max chunk processing (us): {lag.avg_chunk_processing} / {lag.p99_chunk_processing} / {lag.max_chunk_processing}
+            """
+        warning = _lag_warning(lag)
+        if warning is not None:
+            report_content = report_content.rstrip() + f"\n⚠️  {warning}\n"
+    if report.phases is not None:
+        rows = "\n".join(
+            f"{row.phase} {row.start}-{row.end} s: {row.successful_requests}/{row.requests} ok, "
+            f"{row.request_per_sec} req/s, {row.decode_throughput} decode tok/s, "
+            f"ttft avg/P99 (ms) {row.avg_ttft} / {row.p99_ttft}, avg latency (s) {row.avg_latency}"
+            for row in report.phases
+        )
+        report_content = report_content.rstrip() + f"""
+***** PHASES (headline figures cover the steady / measured phase) *****
+{rows}
+            """
+    if report.deadline is not None:
+        deadline = report.deadline
+        report_content = report_content.rstrip() + f"""
+***** DEADLINE (throughput counts completions within the window) *****
+Policy: {deadline.policy}, window (s): {deadline.window}, overrun (s): {deadline.overrun}
+In flight at deadline: {deadline.in_flight}, partial tokens: {deadline.partial_tokens}
+            """
+    if report.timeseries is not None and report.timeseries.windows:
+        windows = report.timeseries.windows
+        report_content = report_content.rstrip() + f"""
+***** TIME SERIES ({report.timeseries.interval} s windows, every window in the JSON report) *****
+Windows: {len(windows)}, with errors: {sum(1 for window in windows if window.errors)}
+Req/s min / median / max: {_spread([window.request_per_sec for window in windows])}
+Decode tok/s min / median / max: {_spread([window.decode_throughput for window in windows])}
+P99 ttft (ms) min / median / max: {_spread([window.p99_ttft for window in windows])}
+            """
+    if report.connection is not None:
+        conn = report.connection
+        report_content = report_content.rstrip() + f"""
+***** CONNECTION *****
+HTTP/2: {conn.http2}, max connections: {conn.max_connections if conn.max_connections is not None else 'unbounded'}, new connections: {conn.new_connections}
+Avg / P99 / Max pool wait (ms): {conn.avg_pool_wait} / {conn.p99_pool_wait} / {conn.max_pool_wait}
+Avg / P99 / Max connect (ms): {conn.avg_connect} / {conn.p99_connect} / {conn.max_connect}
+Avg / P50 / P99 response headers (ms): {conn.avg_response_headers} / {conn.p50_response_headers} / {conn.p99_response_headers}
+            """
+        if conn.p99_pool_wait > 0.1 * report.ttft.p50_ttft:
+            report_content = report_content.rstrip() + """
+⚠️  P99 pool wait is over 10% of P50 TTFT: requests wait inside the client (connection pool or busy event loop), raise --max_connections or --workers
+            """
+    if report.scheduling_lag is not None:
+        report_content = report_content.rstrip() + f"""
+***** SCHEDULING (open-loop) *****
+Request rate (req/s): {report.request_rate}
+Avg scheduling lag (ms): {report.scheduling_lag.avg_lag}
+Max scheduling lag (ms): {report.scheduling_lag.max_lag}
+Min scheduling lag (ms): {report.scheduling_lag.min_lag}
+P50/P90/P95/P99/P99.9 scheduling lag (ms): {report.scheduling_lag.p50_lag} / {report.scheduling_lag.p90_lag} / {report.scheduling_lag.p95_lag} / {report.scheduling_lag.p99_lag} / {report.scheduling_lag.p999_lag}
+            """
+    if report.trace_speed is not None:
+        report_content = report_content.rstrip() + f"""
+Trace speed: x{report.trace_speed}
+Trace scheduled span (s): {report.trace_span}
+            """
+    if report.num_sessions is not None:
+        first, follow = report.ttft_first_turn, report.ttft_follow_up
+        report_content = report_content.rstrip() + f"""
+***** MULTI-TURN SESSIONS *****
+Completed sessions: {report.num_sessions}
+Avg / P50 / P99 ttft first turn (ms): {f'{first.avg_ttft} / {first.p50_ttft} / {first.p99_ttft}' if first else None}
+Avg / P50 / P99 ttft follow-up turns (ms): {f'{follow.avg_ttft} / {follow.p50_ttft} / {follow.p99_ttft}' if follow else None}
+            """
+    if report.backends is not None:
+        rows = "\n".join(
+            f"{row.base_url}: {row.successful_requests}/{row.requests} ok, "
+            f"{row.request_per_sec} req/s, {row.throughput_token} tok/s, "
+            f"ttft avg/P50/P99 (ms) {row.avg_ttft} / {row.p50_ttft} / {row.p99_ttft}, "
+            f"latency avg/P50/P99 (s) {row.avg_latency} / {row.p50_latency} / {row.p99_latency}"
+            for row in report.backends
+        )
+        report_content = report_content.rstrip() + f"""
+***** BACKENDS *****
+{rows}
+            """
+    if report.server_metrics is not None:
+        server = report.server_metrics
+        rows = "\n".join(
+            f"{row.phase} {row.latency_range}: {row.requests} requests, "
+            f"running {row.avg_running}, waiting {row.avg_waiting}, KV cache {row.avg_kv_cache_usage}%"
+            for row in server.phases
+        )
+        report_content = report_content.rstrip() + f"""
+***** SERVER METRICS *****
+URL: {server.url} ({server.num_samples} samples, {server.num_errors} errors)
+Avg / Max running requests: {server.avg_running} / {server.max_running}
+Avg / Max waiting requests: {server.avg_waiting} / {server.max_waiting}
+Avg / Max KV cache usage (%): {server.avg_kv_cache_usage} / {server.max_kv_cache_usage}
+Preemptions: {server.preemptions}
+{rows}
+            """
+    if report.resources is not None:
+        resources = report.resources
+        rows = "\n".join(
+            f"{usage.label} (pid {usage.pid}, up to {usage.max_processes} processes): "
+            f"CPU avg/P50/P99/max (%) {usage.avg_cpu} / {usage.p50_cpu} / {usage.p99_cpu} / {usage.max_cpu}, "
+            f"busiest process P90 {usage.p90_busiest_cpu}%, RSS avg/max (MB) {usage.avg_rss_mb} / {usage.max_rss_mb}, "
+            f"threads {usage.max_threads}, {usage.avg_ctx_switches} ctx switches/s"
+            for usage in (resources.client, resources.server)
+            if usage is not None
+        )
+        warning = _cpu_bound_warning(resources.client)
+        report_content = report_content.rstrip() + f"""
+***** RESOURCES *****
+{resources.num_samples} samples every {resources.interval} s
+Network sent avg/max (MB/s): {resources.avg_net_sent} / {resources.max_net_sent}
+Network received avg/max (MB/s): {resources.avg_net_recv} / {resources.max_net_recv}
+{rows}
+            """
+        if warning is not None:
+            report_content = report_content.rstrip() + f"\n⚠️  {warning}\n"
+    print("\n", report_content.strip())
+
+
 # ===== CV-style reporting (align with cv-benchmark/enhanced_benchmark.py) =====
 def generate_cv_style_report(
     *,
@@ -96,23 +793,66 @@ def generate_cv_style_report(
     concurrency: int,
     total_requests: int,
     duration_s: float,
-    ttft_list: list[float],
-    latency_list: list[float],  # seconds per request
-    token_list: list[int],
+    ttft_hist: Histogram,
+    latency_hist: Histogram,  # seconds per request
+    token_hist: Histogram,
     provider: str | None = None,
     resource_stats: dict | None = None,
+    request_rate: float | None = None,
+    schedule_lag_hist: Histogram | None = None,
+    client_cpu_time: float | None = 0.0,
+    num_chunks: int = 0,
+    itl_hist: Histogram | None = None,
+    tpot_hist: Histogram | None = None,
+    decode_speed_hist: Histogram | None = None,
+    num_sessions: int | None = None,
+    ttft_first_turn_hist: Histogram | None = None,
+    ttft_follow_up_hist: Histogram | None = None,
+    trace_speed: float | None = None,
+    trace_span: float | None = None,
+    pool_wait_hist: Histogram | None = None,
+    connect_hist: Histogram | None = None,
+    response_headers_hist: Histogram | None = None,
+    new_connections: int = 0,
+    max_connections: int | None = None,
+    http2: bool = False,
+    backends: dict[str, Samples] | None = None,
+    server_metrics: ServerMetrics | None = None,
+    resources: ResourceUsage | None = None,
+    loop_lag_hist: Histogram | None = None,
+    chunk_processing_hist: Histogram | None = None,
+    loop_lag_threshold: float = 10.0,
+    prompt_tokens_hist: Histogram | None = None,
+    output_tokens_hist: Histogram | None = None,
+    num_deltas: int = 0,
+    num_missing_usage: int = 0,
+    usage_fallback: str = "deltas",
+    phases: list[RunPhase] | None = None,
+    deadline: Deadline | None = None,
+    timeseries: TimeSeries | None = None,
+    runners: list[RunnerBreakdown] | None = None,
 ) -> dict:
-    def avg(values: list[float]) -> float:
-        return sum(values) / len(values) if values else 0.0
+    def distribution(hist: Histogram | None, scale: float = 1.0) -> dict:
+        if not hist:
+            return {"average": 0.0, "min": 0.0, "max": 0.0}
+        return {
+            "average": hist.mean * scale,
+            "min": hist.min * scale,
+            "max": hist.max * scale,
+            **{
+                f"p{label.replace('.', '_')}": hist.percentile(float(label)) * scale
+                for label in PERCENTILE_LABELS
+            },
+        }
 
     # Derive aggregates
-    avg_latency_s = avg(latency_list)
+    avg_latency_s = latency_hist.mean
     avg_latency_ms = avg_latency_s * 1000.0
     rps_total = (total_requests / duration_s) if duration_s > 0 else 0.0
     rps_per_channel = rps_total / max(concurrency, 1)
     
     # Token throughput calculation
-    total_tokens = sum(token_list) if token_list else 0
+    total_tokens = token_hist.total
     token_throughput = total_tokens / duration_s if duration_s > 0 else 0.0
 
     # Use actual resource stats if available, otherwise use zeros for compatibility
@@ -126,12 +866,22 @@ def generate_cv_style_report(
         gpu_avg = 0.0
 
     # Tokens
-    avg_tok_per_req = avg([float(x) for x in token_list]) if token_list else 0.0
+    avg_tok_per_req = token_hist.mean
     
     # TTFT (Time To First Token) - 轉換為毫秒
-    avg_ttft_ms = avg(ttft_list) * 1000.0 if ttft_list else 0.0
-    min_ttft_ms = min(ttft_list) * 1000.0 if ttft_list else 0.0
-    max_ttft_ms = max(ttft_list) * 1000.0 if ttft_list else 0.0
+    avg_ttft_ms = ttft_hist.mean * 1000.0
+
+    # 每個併發通道的實測值；無通道資訊時 (open-loop) 沿用平均值
+    if runners:
+        rps_per_runner = [row.request_per_sec for row in runners]
+        latency_per_runner = [row.avg_latency for row in runners]
+        ttft_per_runner = [row.avg_ttft for row in runners]
+        tokens_per_runner = [row.avg_token for row in runners]
+    else:
+        rps_per_runner = [rps_per_channel] * max(concurrency, 1)
+        latency_per_runner = [avg_latency_ms] * max(concurrency, 1)
+        ttft_per_runner = [avg_ttft_ms] * max(concurrency, 1)
+        tokens_per_runner = [avg_tok_per_req] * max(concurrency, 1)
 
     report: dict = {
         "timestamp": __import__("datetime").datetime.now().isoformat(),
@@ -152,20 +902,18 @@ def generate_cv_style_report(
             # In CV report, "fps" 表示每通道處理速率；於 LLM 對齊為 req/sec/chan
             "fps": {
                 "average": rps_per_channel,
-                "min": rps_per_channel,
-                "max": rps_per_channel,
-                "per_concurrency": [rps_per_channel] * max(concurrency, 1),
+                "min": min(rps_per_runner),
+                "max": max(rps_per_runner),
+                "per_concurrency": rps_per_runner,
             },
             "latency_ms": {
-                "average": avg_latency_ms,
-                "min": (min(latency_list) * 1000.0) if latency_list else 0.0,
-                "max": (max(latency_list) * 1000.0) if latency_list else 0.0,
-                "per_concurrency": [avg_latency_ms] * max(concurrency, 1),
+                **distribution(latency_hist, 1000.0),
+                "per_concurrency": latency_per_runner,
             },
             "throughput": {
                 "average": rps_per_channel,
                 "total": rps_total,
-                "per_concurrency": [rps_per_channel] * max(concurrency, 1),
+                "per_concurrency": rps_per_runner,
             },
         },
         "resource_usage": resource_stats if resource_stats else {
@@ -177,14 +925,23 @@ def generate_cv_style_report(
             # 對齊欄位名，於 LLM 報告中放輸出統計
             "avg_tokens_per_response": {
                 "average": avg_tok_per_req,
-                "per_channel": [avg_tok_per_req] * max(concurrency, 1),
+                "per_channel": tokens_per_runner,
             }
         },
         "ttft_ms": {
-            "average": avg_ttft_ms,
-            "min": min_ttft_ms,
-            "max": max_ttft_ms,
-            "per_concurrency": [avg_ttft_ms] * max(concurrency, 1),
+            **distribution(ttft_hist, 1000.0),
+            "per_concurrency": ttft_per_runner,
+        },
+        "itl_ms": distribution(itl_hist, 1000.0),
+        "tpot_ms": distribution(tpot_hist, 1000.0),
+        "decode_tok_per_s": distribution(decode_speed_hist),
+        "client_overhead": {
+            "cpu_time_s": client_cpu_time,
+            "num_chunks": num_chunks,
+            # None when the client CPU time was not measured
+            "cpu_us_per_chunk": (client_cpu_time / num_chunks * 1e6 if num_chunks else 0.0)
+            if client_cpu_time is not None
+            else None,
         },
         "efficiency_analysis": {
             "fps_per_cpu_percent": (rps_per_channel / max(cpu_avg, 1.0)),
@@ -193,6 +950,178 @@ def generate_cv_style_report(
             "resource_efficiency": (rps_per_channel / max(cpu_avg + mem_avg, 1.0)),
         },
     }
+    if phases is not None:
+        report["phases"] = [
+            {
+                "phase": row.phase,
+                "start_s": row.start,
+                "end_s": row.end,
+                "total_requests": row.requests,
+                "successful_requests": row.successful_requests,
+                "rps": row.request_per_sec,
+                "decode_tok_per_s": row.decode_throughput,
+                "avg_ttft_ms": row.avg_ttft,
+                "p99_ttft_ms": row.p99_ttft,
+                "avg_latency_s": row.avg_latency,
+            }
+            for row in phases
+        ]
+    if deadline is not None:
+        report["deadline"] = {
+            "policy": deadline.policy,
+            "window_s": deadline.window,
+            "in_flight": deadline.in_flight,
+            "partial_tokens": deadline.partial_tokens,
+            "overrun_s": deadline.overrun,
+        }
+    if timeseries is not None:
+        report["timeseries"] = {
+            "interval_s": timeseries.interval,
+            "windows": [
+                {
+                    "start_s": window.start,
+                    "total_requests": window.requests,
+                    "errors": window.errors,
+                    "rps": window.request_per_sec,
+                    "decode_tok_per_s": window.decode_throughput,
+                    "p50_ttft_ms": window.p50_ttft,
+                    "p99_ttft_ms": window.p99_ttft,
+                    "p50_latency_s": window.p50_latency,
+                    "p99_latency_s": window.p99_latency,
+                    "in_flight": window.in_flight,
+                }
+                for window in timeseries.windows
+            ],
+        }
+    tokens = _token_accounting(
+        prompt_tokens_hist,
+        output_tokens_hist,
+        num_deltas,
+        num_missing_usage,
+        usage_fallback,
+        duration_s,
+        deadline.partial_tokens if deadline is not None else 0,
+    )
+    if tokens is not None:
+        report["token_accounting"] = {
+            "avg_prompt_tokens": tokens.avg_prompt_tokens,
+            "avg_completion_tokens": tokens.avg_completion_tokens,
+            "total_prompt_tokens": tokens.total_prompt_tokens,
+            "total_completion_tokens": tokens.total_completion_tokens,
+            "total_deltas": tokens.total_deltas,
+            "requests_without_usage": tokens.missing_usage,
+            "usage_fallback": tokens.usage_fallback,
+            "prefill_tok_per_s": tokens.prefill_throughput,
+            "decode_tok_per_s": tokens.decode_throughput,
+        }
+    client_lag = _client_lag(loop_lag_hist, chunk_processing_hist, loop_lag_threshold)
+    if client_lag is not None:
+        report["client_overhead"].update(
+            {
+                "loop_lag_ms": distribution(loop_lag_hist, 1000.0),
+                "chunk_processing_us": distribution(chunk_processing_hist, 1e6),
+                "loop_lag_threshold_ms": loop_lag_threshold,
+                "trustworthy": client_lag.trustworthy,
+            }
+        )
+        warning = _lag_warning(client_lag)
+        if warning is not None:
+            report.setdefault("warnings", []).append(warning)
+    if request_rate is not None:
+        report["configuration"]["request_rate"] = request_rate
+    if schedule_lag_hist:
+        report["scheduling_lag_ms"] = distribution(schedule_lag_hist, 1000.0)
+    if pool_wait_hist:
+        report["connection_ms"] = {
+            "http2": http2,
+            "max_connections": max_connections,
+            "new_connections": new_connections,
+            "pool_wait": distribution(pool_wait_hist, 1000.0),
+            "connect": distribution(connect_hist, 1000.0),
+            "response_headers": distribution(response_headers_hist, 1000.0),
+        }
+    if trace_speed is not None:
+        report["configuration"]["trace_speed"] = trace_speed
+        report["configuration"]["trace_span_s"] = trace_span
+    if num_sessions is not None:
+        report["sessions"] = {
+            "completed": num_sessions,
+            "ttft_first_turn_ms": distribution(ttft_first_turn_hist, 1000.0),
+            "ttft_follow_up_ms": distribution(ttft_follow_up_hist, 1000.0),
+        }
+    if backends:
+        rows = [
+            (base_url, samples.num_requests, samples.ttft, samples.latency, samples.token)
+            for base_url, samples in sorted(backends.items())
+        ]
+        rows.append(("aggregate", total_requests, ttft_hist, latency_hist, token_hist))
+        report["backends"] = [
+            {
+                "base_url": base_url,
+                "total_requests": requests,
+                "successful_requests": latency.count,
+                "rps": requests / duration_s if duration_s > 0 else 0.0,
+                "tok_per_s": token.total / duration_s if duration_s > 0 else 0.0,
+                "ttft_ms": distribution(ttft, 1000.0),
+                "latency_ms": distribution(latency, 1000.0),
+            }
+            for base_url, requests, ttft, latency, token in rows
+        ]
+    if server_metrics is not None:
+        report["server_metrics"] = {
+            "url": server_metrics.url,
+            "samples": server_metrics.num_samples,
+            "errors": server_metrics.num_errors,
+            "running": {"average": server_metrics.avg_running, "max": server_metrics.max_running},
+            "waiting": {"average": server_metrics.avg_waiting, "max": server_metrics.max_waiting},
+            "kv_cache_usage_percent": {
+                "average": server_metrics.avg_kv_cache_usage,
+                "max": server_metrics.max_kv_cache_usage,
+            },
+            "preemptions": server_metrics.preemptions,
+            "by_phase": [
+                {
+                    "phase": row.phase,
+                    "latency_range": row.latency_range,
+                    "requests": row.requests,
+                    "avg_running": row.avg_running,
+                    "avg_waiting": row.avg_waiting,
+                    "avg_kv_cache_usage_percent": row.avg_kv_cache_usage,
+                }
+                for row in server_metrics.phases
+            ],
+        }
+    if resources is not None:
+        report["process_usage"] = {
+            "interval_s": resources.interval,
+            "samples": resources.num_samples,
+            "network_mb_per_s": {
+                "sent": {"average": resources.avg_net_sent, "max": resources.max_net_sent},
+                "received": {"average": resources.avg_net_recv, "max": resources.max_net_recv},
+            },
+            **{
+                usage.label: {
+                    "pid": usage.pid,
+                    "max_processes": usage.max_processes,
+                    "cpu_percent": {
+                        "average": usage.avg_cpu,
+                        "p50": usage.p50_cpu,
+                        "p99": usage.p99_cpu,
+                        "max": usage.max_cpu,
+                        "busiest_process_p90": usage.p90_busiest_cpu,
+                    },
+                    "rss_mb": {"average": usage.avg_rss_mb, "max": usage.max_rss_mb},
+                    "max_threads": usage.max_threads,
+                    "ctx_switches_per_s": usage.avg_ctx_switches,
+                    "cpu_bound": usage.cpu_bound,
+                }
+                for usage in (resources.client, resources.server)
+                if usage is not None
+            },
+        }
+        warning = _cpu_bound_warning(resources.client)
+        if warning is not None:
+            report.setdefault("warnings", []).append(warning)
     return report
 
 
@@ -243,14 +1172,114 @@ def print_cv_style_report(report: dict) -> None:
     # 計算並顯示token吞吐量
     avg_tokens_per_response = det.get("avg_tokens_per_response", {}).get("average", 0)
     token_throughput = avg_tokens_per_response * rps_total if rps_total > 0 else 0
-    print(f"  • Token吞吐量: {token_throughput:.2f} tok/s (tokens per second)")
+    print(f"  • Token吞吐量: {token_throughput:.2f} tok/s (prompt + completion tokens per second)")
     print(f"  • 平均回應tokens: {avg_tokens_per_response:.2f} (tokens per request)")
+    accounting = report.get("token_accounting", {})
+    if accounting:
+        print(f"  • Prefill吞吐量: {accounting.get('prefill_tok_per_s', 0):.2f} tok/s (prompt tokens per second)")
+        print(f"  • Decode吞吐量: {accounting.get('decode_tok_per_s', 0):.2f} tok/s (completion tokens per second)")
+        print(f"  • 平均 prompt / completion tokens: {accounting.get('avg_prompt_tokens', 0):.2f} / {accounting.get('avg_completion_tokens', 0):.2f}")
+        missing = accounting.get("requests_without_usage", 0)
+        if missing:
+            print(f"  • 無 usage 的請求: {missing} (以 {accounting.get('usage_fallback')} 計數)")
     
     # 添加 TTFT 指標（如果存在）
     ttft = report.get("ttft_ms", {})
     if ttft:
         print(f"  • 平均TTFT: {ttft.get('average', 0):.2f} ms")
         print(f"  • TTFT範圍: {ttft.get('min', 0):.2f} - {ttft.get('max', 0):.2f} ms")
+        print(f"  • TTFT P50/P99: {ttft.get('p50', 0):.2f} / {ttft.get('p99', 0):.2f} ms")
+
+    itl = report.get("itl_ms", {})
+    if itl:
+        print(f"  • 平均ITL: {itl.get('average', 0):.2f} ms (最高: {itl.get('max', 0):.2f} ms)")
+        print(f"  • ITL P50/P99: {itl.get('p50', 0):.2f} / {itl.get('p99', 0):.2f} ms")
+    tpot = report.get("tpot_ms", {})
+    if tpot:
+        print(f"  • 平均TPOT: {tpot.get('average', 0):.2f} ms")
+    decode = report.get("decode_tok_per_s", {})
+    if decode:
+        print(f"  • 平均解碼速度: {decode.get('average', 0):.2f} tok/s (每請求)")
+
+    loop_lag = report.get("client_overhead", {}).get("loop_lag_ms", {})
+    if loop_lag:
+        threshold = report["client_overhead"].get("loop_lag_threshold_ms", 0)
+        print(f"  • 事件迴圈延遲 P50/P99: {loop_lag.get('p50', 0):.2f} / {loop_lag.get('p99', 0):.2f} ms (門檻: {threshold} ms)")
+
+    lag = report.get("scheduling_lag_ms", {})
+    if lag:
+        print(f"  • 目標請求速率: {cfg.get('request_rate', 0):.2f} req/s")
+        print(f"  • 平均排程延遲: {lag.get('average', 0):.2f} ms (最高: {lag.get('max', 0):.2f} ms)")
+        if "trace_speed" in cfg:
+            print(f"  • Trace 回放倍速: x{cfg['trace_speed']} (排程長度 {cfg.get('trace_span_s', 0):.2f} 秒)")
+        print(f"  • 排程延遲 P50/P99: {lag.get('p50', 0):.2f} / {lag.get('p99', 0):.2f} ms")
+
+    conn = report.get("connection_ms", {})
+    if conn:
+        pool_wait = conn.get("pool_wait", {})
+        headers = conn.get("response_headers", {})
+        print(f"  • 連線池等待 平均/P99: {pool_wait.get('average', 0):.2f} / {pool_wait.get('p99', 0):.2f} ms (新建連線: {conn.get('new_connections', 0)})")
+        print(f"  • 回應標頭時間 P50/P99: {headers.get('p50', 0):.2f} / {headers.get('p99', 0):.2f} ms")
+
+    sessions = report.get("sessions", {})
+    if sessions:
+        first = sessions.get("ttft_first_turn_ms", {})
+        follow = sessions.get("ttft_follow_up_ms", {})
+        print(f"  • 完成對話數: {sessions.get('completed', 0)}")
+        print(f"  • 首輪TTFT P50/P99: {first.get('p50', 0):.2f} / {first.get('p99', 0):.2f} ms")
+        print(f"  • 後續輪TTFT P50/P99: {follow.get('p50', 0):.2f} / {follow.get('p99', 0):.2f} ms")
+
+    phases = report.get("phases", [])
+    if phases:
+        print("\n⏱️  執行階段 (主要指標僅計穩定/量測階段):")
+        for row in phases:
+            print(
+                f"  • {row['phase']} {row['start_s']:.2f}-{row['end_s']:.2f} 秒: {row['successful_requests']}/{row['total_requests']} 成功, "
+                f"{row['rps']:.2f} req/s, {row['decode_tok_per_s']:.2f} decode tok/s, TTFT 平均/P99: {row['avg_ttft_ms']:.2f} / {row['p99_ttft_ms']:.2f} ms"
+            )
+
+    deadline = report.get("deadline", {})
+    if deadline:
+        print(f"\n⏰ 時間上限 ({deadline['policy']}):")
+        print(f"  • 量測時間窗: {deadline['window_s']:.2f} 秒 (超時: {deadline['overrun_s']:.2f} 秒)")
+        print(f"  • 截止時仍在處理的請求: {deadline['in_flight']} (部分 tokens: {deadline['partial_tokens']})")
+
+    series = report.get("timeseries", {})
+    if series.get("windows"):
+        windows = series["windows"]
+        rps = [window["rps"] for window in windows]
+        decode = [window["decode_tok_per_s"] for window in windows]
+        print(f"\n📈 時間序列 (每 {series['interval_s']} 秒一個視窗, 共 {len(windows)} 個):")
+        print(f"  • req/s 最小/中位/最大: {min(rps):.2f} / {statistics.median(rps):.2f} / {max(rps):.2f}")
+        print(f"  • decode tok/s 最小/中位/最大: {min(decode):.2f} / {statistics.median(decode):.2f} / {max(decode):.2f}")
+        print(f"  • 有錯誤的視窗: {sum(1 for window in windows if window['errors'])}")
+
+    backends = report.get("backends", [])
+    if backends:
+        print("\n🌐 後端分佈:")
+        for row in backends:
+            ttft_row = row.get("ttft_ms", {})
+            print(
+                f"  • {row.get('base_url')}: {row.get('successful_requests', 0)}/{row.get('total_requests', 0)} 成功, "
+                f"{row.get('rps', 0):.2f} req/s, {row.get('tok_per_s', 0):.2f} tok/s, "
+                f"TTFT P50/P99: {ttft_row.get('p50', 0):.2f} / {ttft_row.get('p99', 0):.2f} ms"
+            )
+
+    server = report.get("server_metrics", {})
+    if server:
+        running = server.get("running", {})
+        waiting = server.get("waiting", {})
+        kv_cache = server.get("kv_cache_usage_percent", {})
+        print("\n🖥️  伺服器端指標:")
+        print(f"  • 執行中請求 平均/最高: {running.get('average')} / {running.get('max')}")
+        print(f"  • 等待中請求 平均/最高: {waiting.get('average')} / {waiting.get('max')}")
+        print(f"  • KV cache 使用率 平均/最高: {kv_cache.get('average')} / {kv_cache.get('max')} %")
+        print(f"  • Preemptions: {server.get('preemptions')}")
+        for row in server.get("by_phase", []):
+            print(
+                f"  • {row['phase']} {row['latency_range']}: {row['requests']} 請求, "
+                f"執行中 {row['avg_running']}, 等待中 {row['avg_waiting']}, KV cache {row['avg_kv_cache_usage_percent']}%"
+            )
 
     cpu = resu.get("cpu_percent", {})
     mem = resu.get("memory_percent", {})
@@ -261,10 +1290,35 @@ def print_cv_style_report(report: dict) -> None:
     print(f"  • 記憶體使用率: {mem.get('average', 0):.1f}% (最高: {mem.get('max', 0):.1f}%)")
     print(f"  • GPU使用率: {gpu.get('average', 0):.1f}% (最高: {gpu.get('max', 0):.1f}%)")
 
+    process_usage = report.get("process_usage", {})
+    for label, title in (("client", "測試端程序"), ("server", "伺服器程序")):
+        usage = process_usage.get(label)
+        if not usage:
+            continue
+        cpu_usage = usage.get("cpu_percent", {})
+        rss = usage.get("rss_mb", {})
+        print(
+            f"  • {title} (pid {usage.get('pid')}): CPU 平均/P99 {cpu_usage.get('average', 0):.1f} / {cpu_usage.get('p99', 0):.1f}%, "
+            f"最忙程序 P90 {cpu_usage.get('busiest_process_p90', 0):.1f}%, RSS 最高 {rss.get('max', 0):.1f} MB, "
+            f"執行緒 {usage.get('max_threads', 0)}, 內容切換 {usage.get('ctx_switches_per_s', 0):.0f}/s"
+        )
+    if process_usage:
+        network = process_usage.get("network_mb_per_s", {})
+        print(
+            f"  • 網路 送出/接收 平均: {network.get('sent', {}).get('average', 0):.3f} / "
+            f"{network.get('received', {}).get('average', 0):.3f} MB/s"
+        )
+
     avg_tok = det.get("avg_tokens_per_response", {}).get("average", 0)
     print("\n🎯 輸出統計:")
     print(f"  • 平均回應tokens: {avg_tok:.2f}")
     print(f"  • 總請求數: {total_requests}")
     print(f"  • 成功請求數: {total_requests}")  # 假設都成功，實際可從報告中取得
 
+    warnings = report.get("warnings", [])
+    if warnings:
+        print("\n⚠️  注意事項:")
+        for warning in warnings:
+            print(f"  • {warning}")
+
     print("\n" + "=" * 80)
\ No newline at end of file
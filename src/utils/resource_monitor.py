@@ -1,29 +1,107 @@
 """
 Resource monitoring utilities for LLM benchmark
 """
+import os
 import time
 import threading
-from typing import List, Optional
+from typing import Optional
 import psutil
 
+from type.metrics import ProcessUsage, ResourceUsage
+from type.ring_buffer import RingBuffer, percentile
+
 try:
     import pynvml
     PYNVML_AVAILABLE = True
 except ImportError:
     PYNVML_AVAILABLE = False
 
+# Samples kept per series; older ones are overwritten (~2.3 h at 0.5 s)
+DEFAULT_CAPACITY = 16384
+# The busiest client process is called CPU-bound when its P90 CPU is above
+# this share of one core: its event loop is then delaying requests
+CPU_BOUND_PERCENT = 90.0
+
+PROCESS_SERIES = ("cpu", "busiest_cpu", "rss_mb", "threads", "ctx_switches", "processes")
+
+
+class ProcessTree:
+    """A process and its descendants, re-listed on every sample so spawned workers are included."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.root = psutil.Process(pid)
+        # Keep Process objects between samples: cpu_percent() measures since the previous call
+        self._processes: dict[int, psutil.Process] = {}
+        self._last_ctx_switches: Optional[int] = None
+
+    def sample(self, elapsed: float) -> Optional[tuple]:
+        try:
+            current = [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return None
+
+        processes = {}
+        cpu_total = busiest = rss = 0.0
+        threads = ctx_switches = 0
+        for process in current:
+            process = self._processes.get(process.pid, process)
+            try:
+                with process.oneshot():
+                    cpu = process.cpu_percent(None)
+                    rss += process.memory_info().rss
+                    threads += process.num_threads()
+                    switches = process.num_ctx_switches()
+            except psutil.Error:
+                continue
+            processes[process.pid] = process
+            cpu_total += cpu
+            busiest = max(busiest, cpu)
+            ctx_switches += switches.voluntary + switches.involuntary
+        self._processes = processes
+
+        # Exited processes take their counts with them; never report a negative rate
+        ctx_rate = 0.0
+        if self._last_ctx_switches is not None and elapsed > 0:
+            ctx_rate = max(ctx_switches - self._last_ctx_switches, 0) / elapsed
+        self._last_ctx_switches = ctx_switches
+        return cpu_total, busiest, rss / 2**20, threads, ctx_rate, len(processes)
+
 
 class ResourceMonitor:
-    """Monitor system resources during benchmark execution"""
-    
-    def __init__(self):
-        self.cpu_usage: List[float] = []
-        self.memory_usage: List[float] = []
-        self.gpu_usage: List[float] = []
+    """
+    Monitor system resources during benchmark execution
+
+    Samples system CPU / memory / GPU, system network throughput and the
+    process trees of the benchmark client and, optionally, a local inference
+    server every ``interval`` seconds into fixed-size ring buffers. Sample
+    times use ``time.perf_counter()`` like request results, so statistics can
+    be limited to the measured run.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        server_pid: Optional[int] = None,
+        capacity: int = DEFAULT_CAPACITY,
+    ):
+        self.interval = interval
+        self.capacity = capacity
+        self.times = RingBuffer(capacity)
+        self.cpu_usage = RingBuffer(capacity)
+        self.memory_usage = RingBuffer(capacity)
+        self.gpu_usage = RingBuffer(capacity)
+        self.net_sent = RingBuffer(capacity)
+        self.net_recv = RingBuffer(capacity)
+        self.client_tree = ProcessTree(os.getpid())
+        self.server_tree = ProcessTree(server_pid) if server_pid else None
+        self.client = {name: RingBuffer(capacity) for name in PROCESS_SERIES}
+        self.server = {name: RingBuffer(capacity) for name in PROCESS_SERIES}
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
         self.lock = threading.Lock()
-        
+        self._stop = threading.Event()
+
         # Initialize GPU monitoring if available
         if PYNVML_AVAILABLE:
             try:
@@ -33,98 +111,167 @@ class ResourceMonitor:
                 self.gpu_count = 0
         else:
             self.gpu_count = 0
-    
+
     def start_monitoring(self):
         """Start resource monitoring in background thread"""
         if self.monitoring:
             return
-            
+
         self.monitoring = True
+        self._stop.clear()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
-    
+
     def stop_monitoring(self):
         """Stop resource monitoring"""
         self.monitoring = False
+        self._stop.set()
         if self.monitor_thread:
-            self.monitor_thread.join(timeout=1.0)
-    
+            self.monitor_thread.join(timeout=max(self.interval, 1.0) + 1.0)
+
+    def _gpu_percent(self) -> float:
+        if self.gpu_count == 0 or not PYNVML_AVAILABLE:
+            return 0.0
+        try:
+            # Average GPU usage across all GPUs
+            total_gpu_util = 0
+            for i in range(self.gpu_count):
+                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+                total_gpu_util += pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+            return total_gpu_util / self.gpu_count
+        except Exception:
+            return 0.0
+
     def _monitor_loop(self):
         """Main monitoring loop"""
-        while self.monitoring:
+        # Prime the since-last-call counters
+        psutil.cpu_percent(None)
+        last_net = psutil.net_io_counters()
+        last_time = time.perf_counter()
+        self.client_tree.sample(0.0)
+        if self.server_tree is not None:
+            self.server_tree.sample(0.0)
+
+        while not self._stop.wait(self.interval):
             try:
-                # CPU usage
-                cpu_percent = psutil.cpu_percent(interval=0.1)
-                
-                # Memory usage
-                memory = psutil.virtual_memory()
-                memory_percent = memory.percent
-                
-                # GPU usage
-                gpu_percent = 0.0
-                if self.gpu_count > 0 and PYNVML_AVAILABLE:
-                    try:
-                        # Get average GPU usage across all GPUs
-                        total_gpu_util = 0
-                        for i in range(self.gpu_count):
-                            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-                            util = pynvml.nvmlDeviceGetUtilizationRates(handle)
-                            total_gpu_util += util.gpu
-                        gpu_percent = total_gpu_util / self.gpu_count
-                    except Exception:
-                        gpu_percent = 0.0
-                
+                now = time.perf_counter()
+                elapsed = now - last_time
+                cpu_percent = psutil.cpu_percent(None)
+                memory_percent = psutil.virtual_memory().percent
+                gpu_percent = self._gpu_percent()
+                net = psutil.net_io_counters()
+                client = self.client_tree.sample(elapsed)
+                server = self.server_tree.sample(elapsed) if self.server_tree is not None else None
+
                 with self.lock:
+                    self.times.append(now)
                     self.cpu_usage.append(cpu_percent)
                     self.memory_usage.append(memory_percent)
                     self.gpu_usage.append(gpu_percent)
-                
-                time.sleep(0.5)  # Monitor every 500ms
-                
+                    self.net_sent.append((net.bytes_sent - last_net.bytes_sent) / elapsed / 2**20)
+                    self.net_recv.append((net.bytes_recv - last_net.bytes_recv) / elapsed / 2**20)
+                    for buffers, values in ((self.client, client), (self.server, server)):
+                        for name, value in zip(PROCESS_SERIES, values or [float("nan")] * len(PROCESS_SERIES)):
+                            buffers[name].append(value)
+                last_net, last_time = net, now
+
             except Exception:
                 # Continue monitoring even if one sample fails
-                time.sleep(0.5)
-    
-    def get_stats(self) -> dict:
+                continue
+
+    def _window(self, start: Optional[float], end: Optional[float]) -> list[int]:
+        # Indices (oldest first) of samples taken within [start, end]
+        return [
+            i
+            for i, t in enumerate(self.times.values())
+            if (start is None or t >= start) and (end is None or t <= end)
+        ]
+
+    @staticmethod
+    def _select(buffer: RingBuffer, indices: list[int]) -> list[float]:
+        values = buffer.values()
+        return [values[i] for i in indices if values[i] == values[i]]  # drop NaN
+
+    def _process_usage(
+        self, label: str, tree: Optional[ProcessTree], buffers: dict, indices: list[int]
+    ) -> Optional[ProcessUsage]:
+        if tree is None:
+            return None
+        series = {name: self._select(buffer, indices) for name, buffer in buffers.items()}
+        cpu = series["cpu"]
+        if not cpu:
+            return None
+        p90_busiest = percentile(series["busiest_cpu"], 90)
+        return ProcessUsage(
+            label=label,
+            pid=tree.pid,
+            max_processes=int(max(series["processes"])),
+            avg_cpu=round(sum(cpu) / len(cpu), 2),
+            p50_cpu=round(percentile(cpu, 50), 2),
+            p99_cpu=round(percentile(cpu, 99), 2),
+            max_cpu=round(max(cpu), 2),
+            p90_busiest_cpu=round(p90_busiest, 2),
+            avg_rss_mb=round(sum(series["rss_mb"]) / len(cpu), 2),
+            max_rss_mb=round(max(series["rss_mb"]), 2),
+            max_threads=int(max(series["threads"])),
+            avg_ctx_switches=round(sum(series["ctx_switches"]) / len(cpu), 2),
+            cpu_bound=p90_busiest >= CPU_BOUND_PERCENT,
+        )
+
+    def get_usage(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Optional[ResourceUsage]:
+        """Per-process and network usage between two ``time.perf_counter()`` values"""
+        with self.lock:
+            indices = self._window(start, end)
+            if not indices:
+                return None
+            sent = self._select(self.net_sent, indices)
+            recv = self._select(self.net_recv, indices)
+            return ResourceUsage(
+                interval=self.interval,
+                num_samples=len(indices),
+                client=self._process_usage("client", self.client_tree, self.client, indices),
+                server=self._process_usage("server", self.server_tree, self.server, indices),
+                avg_net_sent=round(sum(sent) / len(sent), 3),
+                max_net_sent=round(max(sent), 3),
+                avg_net_recv=round(sum(recv) / len(recv), 3),
+                max_net_recv=round(max(recv), 3),
+            )
+
+    def get_stats(self, start: Optional[float] = None, end: Optional[float] = None) -> dict:
         """Get resource usage statistics"""
         with self.lock:
-            if not self.cpu_usage:
+            indices = self._window(start, end)
+            if not indices:
                 return {
                     "cpu_percent": {"average": 0.0, "max": 0.0, "per_channel": []},
                     "memory_percent": {"average": 0.0, "max": 0.0, "per_channel": []},
                     "gpu_percent": {"average": 0.0, "max": 0.0, "per_channel": []},
                 }
-            
-            cpu_avg = sum(self.cpu_usage) / len(self.cpu_usage)
-            cpu_max = max(self.cpu_usage)
-            
-            memory_avg = sum(self.memory_usage) / len(self.memory_usage)
-            memory_max = max(self.memory_usage)
-            
-            gpu_avg = sum(self.gpu_usage) / len(self.gpu_usage)
-            gpu_max = max(self.gpu_usage)
-            
-            return {
-                "cpu_percent": {
-                    "average": cpu_avg,
-                    "max": cpu_max,
-                    "per_channel": [cpu_avg]  # Single value for all channels
-                },
-                "memory_percent": {
-                    "average": memory_avg,
-                    "max": memory_max,
-                    "per_channel": [memory_avg]
-                },
-                "gpu_percent": {
-                    "average": gpu_avg,
-                    "max": gpu_max,
-                    "per_channel": [gpu_avg]
-                },
-            }
-    
+
+            stats = dict()
+            for name, buffer in (
+                ("cpu_percent", self.cpu_usage),
+                ("memory_percent", self.memory_usage),
+                ("gpu_percent", self.gpu_usage),
+            ):
+                values = self._select(buffer, indices)
+                average = sum(values) / len(values)
+                stats[name] = {
+                    "average": average,
+                    "max": max(values),
+                    "p50": percentile(values, 50),
+                    "p99": percentile(values, 99),
+                    "per_channel": [average],  # Single value for all channels
+                }
+            stats["interval_s"] = self.interval
+            stats["samples"] = len(indices)
+            return stats
+
     def __enter__(self):
         self.start_monitoring()
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.stop_monitoring()
\ No newline at end of file
+        self.stop_monitoring()
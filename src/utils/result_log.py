@@ -0,0 +1,342 @@
+import glob
+import math
+import operator
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from dataclasses import asdict, fields
+from datetime import datetime
+
+import orjson
+
+from type.prompt import Prompt
+from type.request import RequestResult
+from type.run_args import Args
+from type.samples import Samples
+from type.slo import SLO
+from type.timeline import Timeline
+from utils.backends import backend_urls
+
+# A result log is a sequence of self-delimiting blocks: a JSON header
+# (run configuration), column batches of per-request records, and a JSON
+# footer written on a clean finish. Each batch is flushed to the OS as soon as
+# it is full, so a crash loses at most the batch being filled; a block cut
+# short by the crash is ignored when the log is read back.
+_LOG_MAGIC = b"LBRL"
+_LOG_VERSION = 1
+_BLOCK = struct.Struct("<4sI")
+_HEADER_TAG, _ROWS_TAG, _FOOTER_TAG = b"HEAD", b"ROWS", b"DONE"
+
+# Column name -> array typecode. Times are seconds, NaN when absent; counts
+# and ids are -1 when unknown; status 0 means no HTTP response arrived.
+COLUMNS = {
+    "start": "d",  # send time, from the run's dispatch start
+    "end": "d",  # finish time (or when the request failed), same clock
+    "ttft": "d",
+    "latency": "d",  # NaN for a failed request
+    "output_tokens": "i",
+    "total_tokens": "i",
+    "input_tokens": "i",  # usage prompt tokens, else the prompt's known length
+    "num_chunks": "i",
+    "status": "h",
+    "backend": "h",  # index into the header's backends
+    "prompt_id": "q",
+    "turn": "h",  # 0 for single requests and opening session turns
+    "runner": "h",  # closed-loop concurrency slot, -1 in open loop
+    "deltas": "i",  # content deltas received
+    # Mean and longest gap between content deltas (ITL), NaN under two deltas
+    "itl_mean": "d",
+    "itl_max": "d",
+}
+
+BATCH_ROWS = 1024
+FLUSH_INTERVAL = 1.0
+
+
+def _new_columns() -> dict[str, array]:
+    return {name: array(code) for name, code in COLUMNS.items()}
+
+
+class ResultLog:
+    """
+    Append-only per-request log. ``append`` only pushes numbers onto arrays
+    on the event-loop thread; full batches are handed to a writer thread,
+    which serializes and writes them.
+    """
+
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(_LOG_MAGIC + struct.pack("<I", _LOG_VERSION))
+        self._write_block(
+            _HEADER_TAG,
+            orjson.dumps({**header, "columns": COLUMNS, "byteorder": sys.byteorder}),
+        )
+        self._columns = _new_columns()
+        self._last_flush = time.perf_counter()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_batches, daemon=True)
+        self._writer.start()
+
+    def _write_block(self, tag: bytes, payload: bytes) -> None:
+        self._file.write(_BLOCK.pack(tag, len(payload)))
+        self._file.write(payload)
+        # Hand the block to the OS so it outlives a crash of this process
+        self._file.flush()
+
+    def _write_batches(self) -> None:
+        while True:
+            columns = self._queue.get()
+            if columns is None:
+                return
+            count = len(columns["start"])
+            payload = struct.pack("<I", count) + b"".join(
+                column.tobytes() for column in columns.values()
+            )
+            self._write_block(_ROWS_TAG, payload)
+
+    def append(
+        self,
+        result: RequestResult,
+        start: float,
+        end: float,
+        backend: int,
+        prompt: Prompt,
+        turn: int = 0,
+        runner: int = -1,
+    ) -> None:
+        columns = self._columns
+        columns["start"].append(start)
+        columns["end"].append(end)
+        columns["ttft"].append(result.ttft if result.ttft is not None else math.nan)
+        columns["latency"].append(result.latency if result.success else math.nan)
+        columns["output_tokens"].append(result.output_tokens)
+        columns["total_tokens"].append(result.token if result.token is not None else -1)
+        columns["input_tokens"].append(
+            result.prompt_tokens if result.prompt_tokens is not None else -1
+        )
+        columns["num_chunks"].append(result.num_chunks)
+        columns["status"].append(result.status or 0)
+        columns["backend"].append(backend)
+        columns["prompt_id"].append(prompt.prompt_id if prompt.prompt_id is not None else -1)
+        columns["turn"].append(turn)
+        columns["runner"].append(runner)
+        times = result.token_times
+        columns["deltas"].append(len(times))
+        if len(times) >= 2:
+            columns["itl_mean"].append((times[-1] - times[0]) / (len(times) - 1))
+            columns["itl_max"].append(max(map(operator.sub, times[1:], times[:-1])))
+        else:
+            columns["itl_mean"].append(math.nan)
+            columns["itl_max"].append(math.nan)
+
+        now = time.perf_counter()
+        if len(columns["start"]) >= BATCH_ROWS or now - self._last_flush >= FLUSH_INTERVAL:
+            self.flush(now)
+
+    def flush(self, now: float | None = None) -> None:
+        self._last_flush = now if now is not None else time.perf_counter()
+        if len(self._columns["start"]):
+            self._queue.put(self._columns)
+            self._columns = _new_columns()
+
+    def close(self, footer: dict | None = None) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        if footer is not None:
+            self._write_block(_FOOTER_TAG, orjson.dumps(footer))
+        self._file.close()
+
+
+def log_header(args: Args, **extra) -> dict:
+    # Everything the report subcommand needs besides the records themselves
+    return {
+        "args": asdict(args),
+        "backends": backend_urls(args),
+        "started": datetime.now().isoformat(),
+        **extra,
+    }
+
+
+def args_from_log(header: dict) -> Args:
+    # Drop options this version does not know, so older logs stay readable
+    known = {f.name for f in fields(Args)}
+    values = {key: value for key, value in header["args"].items() if key in known}
+    if values.get("slo"):
+        values["slo"] = [SLO(**slo) for slo in values["slo"]]
+    return Args(**values)
+
+
+def shard_log_path(path: str, shard_index: int) -> str:
+    return f"{path}.{shard_index}"
+
+
+def _read_log_file(path: str) -> tuple[dict, dict | None, dict[str, array]]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != _LOG_MAGIC:
+        raise RuntimeError(f"{path} is not a result log")
+    (version,) = struct.unpack_from("<I", data, 4)
+    if version != _LOG_VERSION:
+        raise RuntimeError(f"{path}: unsupported result log version {version}")
+
+    header, footer = None, None
+    columns = _new_columns()
+    pos = 8
+    while pos + _BLOCK.size <= len(data):
+        tag, size = _BLOCK.unpack_from(data, pos)
+        pos += _BLOCK.size
+        if pos + size > len(data):
+            # Cut short by a crash mid-write
+            break
+        payload = data[pos : pos + size]
+        pos += size
+        if tag == _HEADER_TAG:
+            header = orjson.loads(payload)
+            # Batches hold the columns the writer knew, in its order
+            columns = {name: array(code) for name, code in header["columns"].items()}
+        elif tag == _FOOTER_TAG:
+            footer = orjson.loads(payload)
+        elif tag == _ROWS_TAG:
+            (count,) = struct.unpack_from("<I", payload)
+            offset = 4
+            for column in columns.values():
+                width = column.itemsize * count
+                column.frombytes(payload[offset : offset + width])
+                offset += width
+    if header is None:
+        raise RuntimeError(f"{path}: result log header missing")
+    if header["byteorder"] != sys.byteorder:
+        for column in columns.values():
+            column.byteswap()
+    # Columns added since the log was written read as unknown
+    rows = len(columns["start"])
+    columns = {
+        name: columns[name]
+        if name in columns
+        else array(code, [math.nan if code == "d" else -1]) * rows
+        for name, code in COLUMNS.items()
+    }
+    return header, footer, columns
+
+
+def load_result_log(path: str) -> tuple[dict, dict | None, dict[str, array]]:
+    """
+    Read a result log and the per-process logs next to it
+    (``<path>.<shard>``, written with ``--workers``) into one set of columns.
+    Returns the header, the footer (None if the run never finished) and the
+    columns.
+    """
+    header, footer, columns = _read_log_file(path)
+    shard_paths = sorted(
+        (p for p in glob.glob(glob.escape(path) + ".*") if p.rsplit(".", 1)[1].isdigit()),
+        key=lambda p: int(p.rsplit(".", 1)[1]),
+    )
+    for shard_path in shard_paths:
+        _, _, shard_columns = _read_log_file(shard_path)
+        for name, column in columns.items():
+            column.extend(shard_columns[name])
+    return header, footer, columns
+
+
+def finish_times(columns: dict[str, array]) -> array:
+    ends = columns["end"]
+    if not any(map(math.isnan, ends)):
+        return array("d", ends)
+    # Logs written before finish times were logged: send time plus latency,
+    # and the send time for a failed request
+    return array(
+        "d",
+        [
+            end if not math.isnan(end) else start if math.isnan(latency) else start + latency
+            for start, end, latency in zip(columns["start"], ends, columns["latency"])
+        ],
+    )
+
+
+def is_result_log(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(_LOG_MAGIC)) == _LOG_MAGIC
+
+
+def timeline_from_log(columns: dict[str, array]) -> Timeline:
+    """Timeline of logged records, built column by column rather than per row."""
+    timeline = Timeline()
+    timeline_columns = timeline.columns
+    for name in ("start", "ttft", "latency", "output_tokens", "total_tokens", "backend", "runner"):
+        timeline_columns[name] = array(columns[name].typecode, columns[name])
+    # Both are -1 when unknown
+    timeline_columns["prompt_tokens"] = array("i", columns["input_tokens"])
+    timeline_columns["end"] = finish_times(columns)
+    timeline_columns["deltas"] = array("i", columns["deltas"])
+    # Whether usage was sent is not logged
+    timeline_columns["usage"] = array("b", [-1]) * len(columns["start"])
+    return timeline
+
+
+def samples_from_log(columns: dict[str, array], backends: list[str]) -> Samples:
+    """
+    Rebuild the histograms a report needs from logged records. Per-token
+    metrics (ITL; only its per-request mean and max are logged), client CPU
+    time, connection phases and whether the server sent usage are not
+    logged.
+    """
+    samples = Samples()
+    samples.timeline = timeline_from_log(columns)
+    samples.client_cpu_time = None
+    multiple = len(backends) > 1
+    for ttft, latency, output_tokens, total_tokens, input_tokens, num_chunks, backend, turn, deltas in zip(
+        columns["ttft"],
+        columns["latency"],
+        columns["output_tokens"],
+        columns["total_tokens"],
+        columns["input_tokens"],
+        columns["num_chunks"],
+        columns["backend"],
+        columns["turn"],
+        columns["deltas"],
+    ):
+        samples.num_requests += 1
+        samples.num_chunks += num_chunks
+        if not turn:
+            samples.num_sessions += 1
+        per_backend = (
+            samples.backends.setdefault(backends[backend], Samples()) if multiple else None
+        )
+        if per_backend is not None:
+            per_backend.num_requests += 1
+        # Same rule as RequestResult.success
+        if math.isnan(latency):
+            continue
+        samples.ttft.add(ttft)
+        samples.latency.add(latency)
+        samples.token.add(max(total_tokens, 0))
+        samples.output_tokens.add(output_tokens)
+        # Unknown (-1) in logs written before deltas were logged
+        if deltas >= 0:
+            samples.num_deltas += deltas
+        if input_tokens >= 0:
+            samples.prompt_tokens.add(input_tokens)
+        if output_tokens >= 2:
+            tpot = (latency - ttft) / (output_tokens - 1)
+            samples.tpot.add(tpot)
+            if tpot > 0:
+                samples.decode_speed.add(1.0 / tpot)
+        if turn:
+            samples.ttft_follow_up.add(ttft)
+        else:
+            samples.ttft_first_turn.add(ttft)
+        if per_backend is not None:
+            per_backend.ttft.add(ttft)
+            per_backend.latency.add(latency)
+            per_backend.token.add(max(total_tokens, 0))
+    return samples
+
+
+def logged_duration(columns: dict[str, array]) -> float:
+    # Fallback for runs that died before writing the footer: last completion
+    return max(finish_times(columns), default=0.0)
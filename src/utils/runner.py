@@ -0,0 +1,584 @@
+import asyncio
+import itertools
+import math
+import multiprocessing
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+from type.histogram import Histogram
+from type.prompt import Prompt
+from type.request import RequestResult
+from type.run_args import Args
+from type.samples import Samples
+from utils.backends import Backend, LoadBalancer, build_load_balancer
+from utils.client_openai import (
+    PayloadPool,
+    build_payload,
+    encode_payload,
+    fill_missing_usage,
+    request_openai_format,
+)
+from utils.datasets import build_dataset
+from utils.live_metrics import LiveMetrics, MetricsRecorder, shard_slice, shard_view
+from utils.result_log import ResultLog, log_header, shard_log_path
+from utils.tokenizer import TokenCounter
+
+
+def build_request_target(args: Args) -> tuple[dict, str]:
+    headers = {"Content-Type": "application/json"}
+    if args.api_key is not None:
+        headers.update({"Authorization": f"Bearer {args.api_key}"})
+    completion_type = "chat" if args.endpoint == "/v1/chat/completions" else "generate"
+    return headers, completion_type
+
+
+def split_evenly(total: int, num_shards: int, shard_index: int) -> int:
+    return total // num_shards + (1 if shard_index < total % num_shards else 0)
+
+
+def time_bound(args: Args) -> bool:
+    # Bounded by duration_time rather than a request budget or a trace
+    return not args.trace and args.num_request < 1 and args.duration_time >= 1
+
+
+async def run_load(
+    args: Args,
+    balancer: LoadBalancer,
+    datasets_cycle: Iterator[Prompt],
+    samples: Samples,
+    concurrency: int,
+    num_request: int,
+    schedule: list[float] | None = None,
+    dispatch_start: float | None = None,
+    on_request_done: Callable[[], None] | None = None,
+    show_timer: bool = True,
+    on_result: Callable[[RequestResult], None] | None = None,
+    stop: asyncio.Event | None = None,
+    result_log: ResultLog | None = None,
+    metrics: MetricsRecorder | None = None,
+    slot_offset: int = 0,
+) -> None:
+    """
+    Drive one load generator until its request budget, schedule or deadline
+    is exhausted, appending results to ``samples``.
+
+    ``schedule`` switches to open-loop mode (offsets in seconds from
+    ``dispatch_start``); otherwise ``concurrency`` closed-loop workers are
+    used for ``num_request`` requests or ``args.duration_time`` seconds.
+    A duration run ends at a hard deadline; ``args.deadline_policy`` decides
+    whether requests still in flight then are cancelled or drained.
+    A prompt with ``follow_up_turns`` is replayed as one multi-turn session
+    and counts as a single unit of the budget / schedule; all its turns go
+    to the same backend so follow-ups can reuse that server's cache.
+    ``on_result`` sees every finished request; setting ``stop`` ends the run
+    early and cancels requests still in flight. ``result_log`` gets one
+    record per request as it finishes; ``metrics`` feeds the live
+    ``/metrics`` endpoint. Closed-loop requests are tagged with the
+    concurrency slot they ran in, numbered from ``slot_offset``.
+    """
+    headers, completion_type = build_request_target(args)
+    if dispatch_start is None:
+        dispatch_start = time.perf_counter()
+
+    # A ramp starts with no free slot and opens them over args.ramp_time
+    ramp = schedule is None and args.ramp_time > 0
+    semaphore = asyncio.Semaphore(0 if ramp else max(concurrency, 1))
+    # Free closed-loop slots; the semaphore guarantees one is left per holder
+    free_slots = list(range(slot_offset + max(concurrency, 1) - 1, slot_offset - 1, -1))
+    payload_pool = PayloadPool(completion_type=completion_type, args=args)
+    # Re-tokenizes replies of streams without usage; needs their text
+    counter = (
+        TokenCounter(args.tokenizer or args.model) if args.usage_fallback == "tokenizer" else None
+    )
+    # Nothing new is sent once a duration-bound run is over
+    deadline = dispatch_start + args.duration_time if time_bound(args) else None
+    # Requests cancelled at the deadline, with what they streamed before it
+    cut_off: list[RequestResult] = list()
+
+    async def worker(scheduled_at: float | None = None):
+        prompt = next(datasets_cycle)
+        payload = payload_pool.get(prompt) if prompt.follow_up_turns is None else None
+        if scheduled_at is None:
+            async with semaphore:
+                # A slot may only open (ramp) after the deadline
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                slot = free_slots.pop()
+                try:
+                    await run_unit(prompt, payload, slot)
+                finally:
+                    free_slots.append(slot)
+        else:
+            # Open-loop: never wait for a free slot, only record how late the send was
+            samples.schedule_lag.add(time.perf_counter() - scheduled_at)
+            await run_unit(prompt, payload)
+        if on_request_done is not None:
+            on_request_done()
+
+    async def run_unit(prompt: Prompt, payload: bytes | None, slot: int = -1):
+        if payload is not None:
+            await send(payload, prompt, prompt_text=prompt.text, slot=slot)
+        else:
+            await run_session(prompt, slot)
+
+    async def send(
+        payload: bytes,
+        prompt: Prompt,
+        turn: int = 0,
+        collect_text: bool = False,
+        backend: Backend | None = None,
+        prompt_text: str | None = None,
+        slot: int = -1,
+    ) -> RequestResult:
+        if backend is None:
+            backend = balancer.pick()
+        backend.outstanding += 1
+        if metrics is not None:
+            metrics.request_started()
+        try:
+            result = await request_openai_format(
+                aclient=backend.aclient,
+                url=backend.url,
+                headers=headers,
+                payload=payload,
+                timeout=args.timeout,
+                error_record=samples.error_record,
+                collect_text=collect_text or counter is not None,
+                cut_off=cut_off if deadline is not None else None,
+            )
+        finally:
+            backend.outstanding -= 1
+            if metrics is not None:
+                metrics.request_ended()
+        finished = time.perf_counter() - dispatch_start
+        # The prompt length only describes the first turn of a session
+        fill_missing_usage(
+            result,
+            prompt.input_tokens if not turn else None,
+            counter,
+            prompt_text,
+        )
+
+        samples.num_requests += 1
+        samples.num_chunks += result.num_chunks
+        samples.timeline.append(
+            result.start - dispatch_start,
+            finished,
+            result.ttft if result.success else None,
+            result.latency if result.success else None,
+            result.output_tokens,
+            result.prompt_tokens,
+            result.token,
+            backend.index,
+            slot,
+            len(result.token_times),
+            result.has_usage,
+        )
+        samples.chunk_processing.extend(result.chunk_processing)
+        if result.pool_wait is not None:
+            samples.pool_wait.add(result.pool_wait)
+        if result.new_connection:
+            samples.num_new_connections += 1
+            if result.connect is not None:
+                samples.connect.add(result.connect)
+        if result.response_headers is not None:
+            samples.response_headers.add(result.response_headers)
+        if result.success:
+            samples.ttft.add(result.ttft)
+            samples.latency.add(result.latency)
+            samples.token.add(result.token)
+            samples.output_tokens.add(result.output_tokens)
+            if result.prompt_tokens is not None:
+                samples.prompt_tokens.add(result.prompt_tokens)
+            samples.num_deltas += len(result.token_times)
+            if not result.has_usage:
+                samples.num_missing_usage += 1
+            samples.itl.extend(result.itl)
+            if result.tpot is not None:
+                samples.tpot.add(result.tpot)
+                samples.decode_speed.add(result.decode_speed)
+        if balancer.multiple:
+            per_backend = samples.backends.setdefault(backend.base_url, Samples())
+            per_backend.num_requests += 1
+            if result.success:
+                per_backend.ttft.add(result.ttft)
+                per_backend.latency.add(result.latency)
+                per_backend.token.add(result.token)
+        if metrics is not None:
+            metrics.observe(result)
+        if result_log is not None:
+            result_log.append(
+                result, result.start - dispatch_start, finished, backend.index, prompt, turn, slot
+            )
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    async def run_session(prompt: Prompt, slot: int = -1):
+        # Each turn resends the whole conversation so far, including the
+        # server's own replies, so follow-ups can hit its prefix / KV cache.
+        messages: list[dict] = list()
+        backend = balancer.pick()
+        for turn, content in enumerate([prompt.text, *prompt.follow_up_turns]):
+            if turn:
+                if args.think_time > 0:
+                    await asyncio.sleep(args.think_time)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                if stop is not None and stop.is_set():
+                    break
+            messages.append({"role": "user", "content": content})
+            payload = encode_payload(
+                build_payload(
+                    completion_type=completion_type,
+                    prompt=content,
+                    args=args,
+                    max_tokens=prompt.max_tokens,
+                    messages=messages,
+                )
+            )
+            result = await send(
+                payload,
+                prompt,
+                turn=turn,
+                collect_text=True,
+                backend=backend,
+                slot=slot,
+                prompt_text="\n".join(message["content"] for message in messages)
+                if counter is not None
+                else None,
+            )
+            if not result.success:
+                # A failed turn leaves no reply to build the next one on
+                break
+            if turn:
+                samples.ttft_follow_up.add(result.ttft)
+            else:
+                samples.ttft_first_turn.add(result.ttft)
+            messages.append({"role": "assistant", "content": result.text})
+        samples.num_sessions += 1
+
+    # All request handling runs on this thread, so its CPU time is the client cost
+    cpu_start = time.thread_time()
+    lag_probe = asyncio.create_task(probe_loop_lag(samples.loop_lag))
+    ramp_up = None
+    if ramp:
+        ramp_up = asyncio.create_task(
+            open_slots(semaphore, max(concurrency, 1), args.ramp_time, args.ramp_steps, dispatch_start)
+        )
+    try:
+        await _dispatch(
+            args=args,
+            worker=worker,
+            concurrency=concurrency,
+            num_request=num_request,
+            schedule=schedule,
+            dispatch_start=dispatch_start,
+            show_timer=show_timer,
+            stop=stop,
+            deadline=deadline if args.deadline_policy != "drain" else None,
+        )
+        samples.num_cut_off += len(cut_off)
+        if args.deadline_policy == "partial":
+            samples.cut_off_tokens += sum(
+                sum(1 for t in result.token_times if result.start + t <= deadline)
+                for result in cut_off
+            )
+    finally:
+        lag_probe.cancel()
+        if ramp_up is not None:
+            ramp_up.cancel()
+        samples.client_cpu_time += time.thread_time() - cpu_start
+
+
+def ramp_offsets(concurrency: int, ramp_time: float, steps: int = 0) -> list[float]:
+    """
+    When each of ``concurrency`` slots opens, in seconds from the dispatch
+    start: evenly spread over ``ramp_time``, or in ``steps`` equal batches.
+    """
+    if steps > 0:
+        return [
+            math.floor(slot * steps / concurrency) * ramp_time / steps
+            for slot in range(concurrency)
+        ]
+    return [slot * ramp_time / concurrency for slot in range(concurrency)]
+
+
+async def open_slots(
+    semaphore: asyncio.Semaphore,
+    concurrency: int,
+    ramp_time: float,
+    steps: int,
+    dispatch_start: float,
+) -> None:
+    for offset in ramp_offsets(concurrency, ramp_time, steps):
+        await sleep_until(dispatch_start + offset)
+        semaphore.release()
+
+
+# Period of the event-loop lag probe (s)
+LOOP_LAG_INTERVAL = 0.01
+
+
+async def probe_loop_lag(histogram: Histogram, interval: float = LOOP_LAG_INTERVAL) -> None:
+    """
+    Record how late the event loop wakes a timer every ``interval`` seconds.
+    A socket that became readable waits in the same ready queue, so this lag
+    is also added to the TTFT / ITL of every chunk received meanwhile.
+    """
+    while True:
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        histogram.add(max(time.perf_counter() - due, 0.0))
+
+
+# asyncio timers fire late by up to a millisecond or so; sleep until just
+# before the deadline, then yield to the loop until it has passed.
+SPIN_THRESHOLD = 0.002
+
+
+async def sleep_until(deadline: float) -> None:
+    """Sleep until ``time.perf_counter()`` reaches ``deadline``, sub-millisecond."""
+    delay = deadline - time.perf_counter() - SPIN_THRESHOLD
+    if delay > 0:
+        await asyncio.sleep(delay)
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(0)
+
+
+async def _dispatch(
+    args: Args,
+    worker: Callable[..., Awaitable[None]],
+    concurrency: int,
+    num_request: int,
+    schedule: list[float] | None,
+    dispatch_start: float,
+    show_timer: bool,
+    stop: asyncio.Event | None = None,
+    deadline: float | None = None,
+) -> None:
+    # ``deadline`` cancels whatever is still in flight once it passes
+    if schedule is not None:
+        # Requests go out at their scheduled offsets regardless of completions
+        tasks = list()
+        for offset in schedule:
+            if stop is not None and stop.is_set():
+                break
+            scheduled_at = dispatch_start + offset
+            if scheduled_at > time.perf_counter():
+                await sleep_until(scheduled_at)
+            tasks.append(asyncio.create_task(worker(scheduled_at=scheduled_at)))
+        await _gather(tasks, stop, deadline)
+
+    elif args.num_request >= 1:
+        tasks = [asyncio.create_task(worker()) for _ in range(num_request)]
+        await _gather(tasks, stop)
+
+    elif args.duration_time >= 1:
+
+        async def print_timer(duration: int):
+            for i in range(duration):
+                # Tick on the run's clock so the display does not drift
+                await asyncio.sleep(max(dispatch_start + i + 1 - time.perf_counter(), 0))
+                print(
+                    f"\rElapsed time: {i + 1}/{duration} sec",
+                    end="",
+                    flush=True,
+                )
+
+        stress_test_end_time = dispatch_start + args.duration_time
+
+        async def loop_stress_test():
+            while time.perf_counter() < stress_test_end_time:
+                if stop is not None and stop.is_set():
+                    break
+                await worker()
+
+        runners = [
+            asyncio.create_task(loop_stress_test()) for _ in range(concurrency)
+        ]
+        timer = asyncio.create_task(print_timer(duration=args.duration_time)) if show_timer else None
+        try:
+            await _gather(runners, stop, deadline)
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+
+async def _gather(
+    tasks: list[asyncio.Task], stop: asyncio.Event | None, deadline: float | None = None
+) -> None:
+    if stop is None and deadline is None:
+        await asyncio.gather(*tasks)
+        return
+
+    all_done = asyncio.gather(*tasks)
+    waiters = {all_done}
+    if stop is not None:
+        waiters.add(asyncio.ensure_future(stop.wait()))
+    if deadline is not None:
+        waiters.add(asyncio.ensure_future(sleep_until(deadline)))
+    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    for waiter in waiters - {all_done}:
+        waiter.cancel()
+    if not all_done.done():
+        # Stopped early or out of time: drop whatever is still in flight
+        all_done.cancel()
+        try:
+            await all_done
+        except asyncio.CancelledError:
+            pass
+        return
+    all_done.result()
+
+
+# ===== Multi-process load generation =====
+# Each worker process owns its event loop, dataset iterator and httpx clients.
+# The parent releases all shards at the same wall-clock instant and merges
+# their samples afterwards.
+_completed = None
+_ready = None
+_go = None
+_start_wall = None
+_live_values = None
+
+
+def _init_shard_process(completed, ready, go, start_wall, live_values) -> None:
+    global _completed, _ready, _go, _start_wall, _live_values
+    _completed, _ready, _go, _start_wall = completed, ready, go, start_wall
+    _live_values = live_values
+
+
+def _count_completed() -> None:
+    with _completed.get_lock():
+        _completed.value += 1
+
+
+def run_shard_process(
+    args: Args, shard_index: int, num_shards: int, schedule: list[float] | None
+) -> Samples:
+    async def run() -> Samples:
+        datasets_cycle = await build_dataset(args)
+        if args.trace:
+            # Keep every trace record paired with its own schedule[shard_index::num_shards] slot
+            datasets_cycle = itertools.islice(datasets_cycle, shard_index, None, num_shards)
+        samples = Samples()
+        concurrency = split_evenly(args.concurrency, num_shards, shard_index)
+        metrics = None
+        if _live_values is not None:
+            metrics = MetricsRecorder(shard_slice(shard_view(_live_values), shard_index))
+        result_log = None
+        if args.result_log:
+            result_log = ResultLog(
+                shard_log_path(args.result_log, shard_index),
+                log_header(args, shard=shard_index),
+            )
+        try:
+            async with build_load_balancer(args, concurrency) as balancer:
+                with _ready.get_lock():
+                    _ready.value += 1
+                _go.wait()
+                # Translate the shared wall-clock start into this process' perf_counter
+                dispatch_start = time.perf_counter() + (_start_wall.value - time.time())
+                await sleep_until(dispatch_start)
+
+                await run_load(
+                    args=args,
+                    balancer=balancer,
+                    datasets_cycle=datasets_cycle,
+                    samples=samples,
+                    concurrency=concurrency,
+                    num_request=split_evenly(args.num_request, num_shards, shard_index),
+                    schedule=schedule,
+                    dispatch_start=dispatch_start,
+                    on_request_done=_count_completed,
+                    show_timer=False,
+                    result_log=result_log,
+                    metrics=metrics,
+                    slot_offset=sum(
+                        split_evenly(args.concurrency, num_shards, i) for i in range(shard_index)
+                    ),
+                )
+        finally:
+            if result_log is not None:
+                result_log.close()
+        return samples
+
+    return asyncio.run(run())
+
+
+async def run_load_multiprocess(
+    args: Args,
+    samples: Samples,
+    schedule: list[float] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+    live_metrics: LiveMetrics | None = None,
+) -> tuple[float, float]:
+    """
+    Shard the request budget (or arrival schedule) across ``args.workers``
+    processes and merge their samples into ``samples``. Each process records
+    into its own slice of ``live_metrics``, which must be sized for
+    ``args.workers`` shards.
+
+    Returns the ``time.perf_counter()`` values at which the shards were
+    released and at which the last one finished, so process start-up and
+    shutdown stay out of the measured duration.
+    """
+    num_shards = args.workers
+    if args.seed is None:
+        # Every shard builds the dataset on its own: a common seed keeps the
+        # synthetic prompts (and their shared prefix) and the sampled records
+        # the same across them
+        args = replace(args, seed=random.randrange(2**32))
+    ctx = multiprocessing.get_context("spawn")
+    completed = ctx.Value("i", 0)
+    ready = ctx.Value("i", 0)
+    go = ctx.Event()
+    start_wall = ctx.Value("d", 0.0)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(
+        max_workers=num_shards,
+        mp_context=ctx,
+        initializer=_init_shard_process,
+        initargs=(
+            completed,
+            ready,
+            go,
+            start_wall,
+            live_metrics.shared if live_metrics is not None else None,
+        ),
+    ) as executor:
+        futures = [
+            loop.run_in_executor(
+                executor,
+                run_shard_process,
+                args,
+                shard_index,
+                num_shards,
+                schedule[shard_index::num_shards] if schedule is not None else None,
+            )
+            for shard_index in range(num_shards)
+        ]
+
+        # Hold the start until every shard has its dataset and client ready
+        while ready.value < num_shards and not any(f.done() for f in futures):
+            await asyncio.sleep(0.05)
+        start_wall.value = time.time() + 0.1
+        dispatch_start = time.perf_counter() + 0.1
+        go.set()
+
+        pending = set(futures)
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=0.2)
+            if on_progress is not None:
+                on_progress(completed.value)
+        dispatch_end = time.perf_counter()
+
+        for future in futures:
+            samples.merge(future.result())
+
+    return dispatch_start, dispatch_end
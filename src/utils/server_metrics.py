@@ -0,0 +1,238 @@
+import asyncio
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+import httpx
+
+from type.metrics import ServerMetrics, ServerPhase
+from type.request import RequestResult
+
+# Prometheus series per quantity, first match wins: vLLM V1 / V0, then SGLang.
+# Series with several label sets (e.g. one per engine) are summed.
+SERVER_SERIES = {
+    "running": ("vllm:num_requests_running", "sglang:num_running_reqs"),
+    "waiting": ("vllm:num_requests_waiting", "sglang:num_queue_reqs"),
+    "kv_cache_usage": (
+        "vllm:kv_cache_usage_perc",
+        "vllm:gpu_cache_usage_perc",
+        "sglang:token_usage",
+    ),
+    "preemptions": ("vllm:num_preemptions_total", "sglang:num_retracted_reqs_total"),
+}
+_WANTED = {name for names in SERVER_SERIES.values() for name in names}
+
+# Latency ranges (s) the correlation is broken down by
+TTFT_EDGES = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+TPOT_EDGES = (0.01, 0.02, 0.05, 0.1, 0.25)
+
+
+def parse_prometheus_text(text: str) -> dict[str, float]:
+    """Sum the samples of every wanted series in a text-format scrape."""
+    values: dict[str, float] = dict()
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        brace = line.find("{")
+        if brace >= 0:
+            name = line[:brace]
+            rest = line[line.rfind("}") + 1 :]
+        else:
+            name, _, rest = line.partition(" ")
+        if name not in _WANTED:
+            continue
+        try:
+            value = float(rest.split()[0])
+        except (IndexError, ValueError):
+            continue
+        values[name] = values.get(name, 0.0) + value
+    return values
+
+
+def _pick(values: dict[str, float], quantity: str) -> float:
+    for name in SERVER_SERIES[quantity]:
+        if name in values:
+            return values[name]
+    return math.nan
+
+
+class ServerMetricsScraper:
+    """
+    Polls a Prometheus endpoint every ``interval`` seconds on the running
+    event loop. Samples are stamped with ``time.perf_counter()``, the clock
+    request results use, so they line up with client-side phases.
+    """
+
+    def __init__(self, url: str, interval: float = 1.0):
+        self.url = url
+        self.interval = interval
+        self.times = array("d")
+        self.series = {quantity: array("d") for quantity in SERVER_SERIES}
+        self.num_errors = 0
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient()
+        self._task = asyncio.create_task(self._poll())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _poll(self) -> None:
+        next_at = time.perf_counter()
+        while True:
+            sent = time.perf_counter()
+            try:
+                response = await self._client.get(self.url, timeout=max(self.interval, 1.0))
+                response.raise_for_status()
+                values = parse_prometheus_text(response.text)
+            except httpx.HTTPError:
+                self.num_errors += 1
+            else:
+                # Stamp the middle of the scrape round trip
+                self.times.append((sent + time.perf_counter()) / 2)
+                for quantity, column in self.series.items():
+                    column.append(_pick(values, quantity))
+            next_at += self.interval
+            await asyncio.sleep(max(next_at - time.perf_counter(), 0.0))
+
+    def mean(self, quantity: str, start: float, end: float) -> float:
+        """
+        Mean of ``quantity`` over samples in ``[start, end]``, or the last
+        sample before ``end`` if none fell inside; NaN when unknown.
+        """
+        times = self.times
+        lo = bisect_left(times, start)
+        hi = bisect_right(times, end)
+        column = self.series[quantity]
+        if hi > lo:
+            window = [value for value in column[lo:hi] if not math.isnan(value)]
+            if window:
+                return sum(window) / len(window)
+        return column[hi - 1] if hi > 0 else math.nan
+
+
+class PhaseCorrelator:
+    """
+    Looks up the server state behind every finished request: running /
+    waiting / KV usage during its prefill (send to first token) and during
+    its decode (first token to end). Results are accumulated per TTFT and
+    TPOT range, so memory stays constant however long the run is.
+    """
+
+    QUANTITIES = ("running", "waiting", "kv_cache_usage")
+
+    def __init__(self, scraper: ServerMetricsScraper):
+        self.scraper = scraper
+        # Per range: [requests, then (sum, known count) per quantity]
+        self.prefill = [[0] + [0.0, 0] * len(self.QUANTITIES) for _ in range(len(TTFT_EDGES) + 1)]
+        self.decode = [[0] + [0.0, 0] * len(self.QUANTITIES) for _ in range(len(TPOT_EDGES) + 1)]
+
+    def _add(self, row: list, start: float, end: float) -> None:
+        row[0] += 1
+        for i, quantity in enumerate(self.QUANTITIES):
+            value = self.scraper.mean(quantity, start, end)
+            if not math.isnan(value):
+                row[1 + 2 * i] += value
+                row[2 + 2 * i] += 1
+
+    def observe(self, result: RequestResult) -> None:
+        if not result.success:
+            return
+        first_token = result.start + result.ttft
+        self._add(self.prefill[bisect_left(TTFT_EDGES, result.ttft)], result.start, first_token)
+        tpot = result.tpot
+        if tpot is not None:
+            self._add(
+                self.decode[bisect_left(TPOT_EDGES, tpot)], first_token, result.start + result.latency
+            )
+
+
+def _range_label(edges: tuple, index: int) -> str:
+    # "100-250 ms", "> 5000 ms"
+    bounds = [round(edge * 1000) for edge in edges]
+    if index == 0:
+        return f"<= {bounds[0]} ms"
+    if index == len(bounds):
+        return f"> {bounds[-1]} ms"
+    return f"{bounds[index - 1]}-{bounds[index]} ms"
+
+
+def _phase_rows(phase: str, rows: list, edges: tuple) -> list[ServerPhase]:
+    phases = list()
+    for index, row in enumerate(rows):
+        if not row[0]:
+            continue
+        averages = [
+            row[1 + 2 * i] / row[2 + 2 * i] if row[2 + 2 * i] else None
+            for i in range(len(PhaseCorrelator.QUANTITIES))
+        ]
+        running, waiting, kv_cache_usage = averages
+        phases.append(
+            ServerPhase(
+                phase=phase,
+                latency_range=_range_label(edges, index),
+                requests=row[0],
+                avg_running=round(running, 2) if running is not None else None,
+                avg_waiting=round(waiting, 2) if waiting is not None else None,
+                avg_kv_cache_usage=round(kv_cache_usage * 100, 2)
+                if kv_cache_usage is not None
+                else None,
+            )
+        )
+    return phases
+
+
+def summarize_server_metrics(
+    scraper: ServerMetricsScraper,
+    correlator: PhaseCorrelator | None,
+    start: float = -math.inf,
+    end: float = math.inf,
+) -> ServerMetrics:
+    """
+    Summary of the scrapes taken within ``[start, end]`` (``time.perf_counter()``
+    values), so samples from warm-up or after the run do not dilute it.
+    """
+    lo = bisect_left(scraper.times, start)
+    hi = bisect_right(scraper.times, end)
+
+    def in_window(quantity: str) -> list[float]:
+        return [value for value in scraper.series[quantity][lo:hi] if not math.isnan(value)]
+
+    def stats(quantity: str, scale: float = 1.0) -> tuple[float | None, float | None]:
+        values = in_window(quantity)
+        if not values:
+            return None, None
+        return round(sum(values) / len(values) * scale, 2), round(max(values) * scale, 2)
+
+    preemptions = in_window("preemptions")
+    avg_running, max_running = stats("running")
+    avg_waiting, max_waiting = stats("waiting")
+    avg_kv_cache_usage, max_kv_cache_usage = stats("kv_cache_usage", 100.0)
+    phases = list()
+    if correlator is not None:
+        phases = _phase_rows("prefill", correlator.prefill, TTFT_EDGES) + _phase_rows(
+            "decode", correlator.decode, TPOT_EDGES
+        )
+    return ServerMetrics(
+        url=scraper.url,
+        num_samples=hi - lo,
+        num_errors=scraper.num_errors,
+        avg_running=avg_running,
+        max_running=max_running,
+        avg_waiting=avg_waiting,
+        max_waiting=max_waiting,
+        avg_kv_cache_usage=avg_kv_cache_usage,
+        max_kv_cache_usage=max_kv_cache_usage,
+        preemptions=preemptions[-1] - preemptions[0] if preemptions else None,
+        phases=phases,
+    )
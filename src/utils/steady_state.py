@@ -0,0 +1,137 @@
+import copy
+import math
+import statistics
+
+from type.histogram import Histogram
+from type.metrics import RunPhase
+from type.samples import Samples
+from type.timeline import Timeline
+
+# Width of the completion-count bins steady state is detected on (s)
+BIN_WIDTH = 1.0
+
+
+def completion_bins(timeline: Timeline, run_end: float, width: float = BIN_WIDTH) -> list[int]:
+    """Completed requests per ``width``-second bin; a partial last bin is dropped."""
+    bins = [0] * int(run_end // width)
+    for end in timeline.columns["end"]:
+        index = int(end // width)
+        if 0 <= index < len(bins):
+            bins[index] += 1
+    return bins
+
+
+def detect_steady_window(
+    timeline: Timeline,
+    run_end: float,
+    window: int,
+    tolerance: float,
+    start_after: float = 0.0,
+) -> tuple[float, float] | None:
+    """
+    Steady state is the span, after ``start_after``, where completions per
+    second averaged over ``window`` seconds stay above ``1 - tolerance``
+    times their median level. The start-up ramp and the tail (only a few
+    stragglers left) fall below it and are cut off. Returns None when the
+    run is shorter than three windows.
+    """
+    bins = completion_bins(timeline, run_end)
+    first = math.ceil(start_after / BIN_WIDTH)
+    if len(bins) - first < 3 * window:
+        return None
+    means = list()
+    for i in range(first, len(bins)):
+        # Centered moving average, clipped at the edges
+        lo = max(first, min(i - window // 2, len(bins) - window))
+        means.append(sum(bins[lo : lo + window]) / window)
+    floor = (1 - tolerance) * statistics.median(means)
+    steady = [i for i, mean in enumerate(means, start=first) if mean >= floor and mean > 0]
+    if not steady:
+        return None
+    return steady[0] * BIN_WIDTH, (steady[-1] + 1) * BIN_WIDTH
+
+
+def window_samples(
+    samples: Samples, start: float, end: float, backend_urls: list[str]
+) -> tuple[Samples, int]:
+    """
+    Copy of ``samples`` whose per-request histograms (TTFT, latency, tokens,
+    TPOT, decode speed, per-backend rows) and content-delta / missing-usage
+    counts only cover requests that finished within ``[start, end]``. Per-token and client-side figures (ITL,
+    connection phases, loop lag, ...) stay whole-run. Also returns the number
+    of requests that finished in the window.
+    """
+    window = copy.copy(samples)
+    for name in ("ttft", "latency", "token", "tpot", "decode_speed", "prompt_tokens", "output_tokens"):
+        setattr(window, name, Histogram())
+    window.backends = {url: Samples() for url in samples.backends}
+    window.num_deltas = window.num_missing_usage = 0
+    columns = samples.timeline.columns
+    requests = 0
+    for i, finished in enumerate(columns["end"]):
+        if not start <= finished <= end:
+            continue
+        requests += 1
+        per_backend = None
+        if window.backends:
+            per_backend = window.backends.get(backend_urls[columns["backend"][i]])
+        if per_backend is not None:
+            per_backend.num_requests += 1
+        latency = columns["latency"][i]
+        if math.isnan(latency):
+            continue
+        ttft = columns["ttft"][i]
+        output_tokens = columns["output_tokens"][i]
+        total_tokens = max(columns["total_tokens"][i], 0)
+        window.ttft.add(ttft)
+        window.latency.add(latency)
+        window.token.add(total_tokens)
+        window.output_tokens.add(output_tokens)
+        if columns["deltas"][i] >= 0:
+            window.num_deltas += columns["deltas"][i]
+        if columns["usage"][i] == 0:
+            window.num_missing_usage += 1
+        if columns["prompt_tokens"][i] >= 0:
+            window.prompt_tokens.add(columns["prompt_tokens"][i])
+        if output_tokens >= 2:
+            tpot = (latency - ttft) / (output_tokens - 1)
+            window.tpot.add(tpot)
+            if tpot > 0:
+                window.decode_speed.add(1.0 / tpot)
+        if per_backend is not None:
+            per_backend.ttft.add(ttft)
+            per_backend.latency.add(latency)
+            per_backend.token.add(total_tokens)
+    window.num_requests = requests
+    window.measured_span = (start, end)
+    return window, requests
+
+
+def phase_row(phase: str, timeline: Timeline, start: float, end: float) -> RunPhase:
+    """Requests that finished within ``[start, end]`` of ``timeline``."""
+    columns = timeline.columns
+    requests = successful = output_tokens = 0
+    ttft, latency = Histogram(), Histogram()
+    for i, finished in enumerate(columns["end"]):
+        if not start <= finished <= end:
+            continue
+        requests += 1
+        if math.isnan(columns["latency"][i]):
+            continue
+        successful += 1
+        output_tokens += columns["output_tokens"][i]
+        ttft.add(columns["ttft"][i])
+        latency.add(columns["latency"][i])
+    duration = end - start
+    return RunPhase(
+        phase=phase,
+        start=round(start, 2),
+        end=round(end, 2),
+        requests=requests,
+        successful_requests=successful,
+        request_per_sec=round(requests / duration, 2) if duration > 0 else 0.0,
+        decode_throughput=round(output_tokens / duration, 2) if duration > 0 else 0.0,
+        avg_ttft=round(ttft.mean * 1000, 2),
+        p99_ttft=round(ttft.percentile(99) * 1000, 2),
+        avg_latency=round(latency.mean, 2),
+    )
@@ -0,0 +1,127 @@
+import json
+
+from anyio import open_file
+
+from type.report import Report
+from utils.reporting import VERSION
+
+
+def parse_concurrency_levels(text: str) -> list[int]:
+    levels = sorted({int(level) for level in text.split(",") if level.strip()})
+    if not levels or levels[0] < 1:
+        raise ValueError(f"Invalid concurrency levels: {text!r}")
+    return levels
+
+
+def decode_throughput(report: Report) -> float:
+    # Completion tokens only: prompt tokens would hide decode saturation
+    return report.tokens.decode_throughput if report.tokens is not None else 0.0
+
+
+def scaling_efficiency(reports: list[Report]) -> list[float | None]:
+    """
+    Marginal decode-throughput gain relative to the concurrency increase for
+    each level: 1.0 means linear scaling, 0 means no gain at all.
+    """
+    efficiency: list[float | None] = [None]
+    for prev, cur in zip(reports, reports[1:]):
+        concurrency_gain = cur.num_concurrency / prev.num_concurrency - 1
+        if decode_throughput(prev) <= 0 or concurrency_gain <= 0:
+            efficiency.append(None)
+            continue
+        throughput_gain = decode_throughput(cur) / decode_throughput(prev) - 1
+        efficiency.append(throughput_gain / concurrency_gain)
+    return efficiency
+
+
+def detect_knee(reports: list[Report], min_efficiency: float = 0.1) -> Report | None:
+    """
+    Return the last level before saturation: the next level adds less than
+    ``min_efficiency`` of linear decode-throughput scaling while TTFT or ITL
+    keeps growing. ``None`` means the sweep never saturated.
+    """
+    efficiency = scaling_efficiency(reports)
+    for i in range(1, len(reports)):
+        prev, cur = reports[i - 1], reports[i]
+        latency_grew = cur.ttft.p50_ttft > prev.ttft.p50_ttft or (
+            cur.itl is not None
+            and prev.itl is not None
+            and cur.itl.p50_itl > prev.itl.p50_itl
+        )
+        if efficiency[i] is not None and efficiency[i] < min_efficiency and latency_grew:
+            return prev
+    return None
+
+
+def build_sweep_report(
+    model: str, dataset: str, reports: list[Report], min_efficiency: float
+) -> dict:
+    efficiency = scaling_efficiency(reports)
+    knee = detect_knee(reports, min_efficiency=min_efficiency)
+    return {
+        "Version": VERSION,
+        "Model": model,
+        "Dataset": dataset,
+        "Knee threshold (scaling efficiency)": min_efficiency,
+        "Knee": {
+            "Concurrency": knee.num_concurrency,
+            "Request per second (req/s)": knee.request_per_sec,
+            "Throughput token (tok/s)": knee.throughput_token,
+            "Decode throughput (tok/s)": decode_throughput(knee),
+            "P50 ttft (ms)": knee.ttft.p50_ttft,
+            "P99 ttft (ms)": knee.ttft.p99_ttft,
+        }
+        if knee is not None
+        else None,
+        "Sweep": [
+            {
+                "Concurrency": report.num_concurrency,
+                "Successful requests": report.successful_requests,
+                "Request per second (req/s)": report.request_per_sec,
+                "Throughput token (tok/s)": report.throughput_token,
+                "Decode throughput (tok/s)": decode_throughput(report),
+                "Scaling efficiency": round(eff, 3) if eff is not None else None,
+                "Avg ttft (ms)": report.ttft.avg_ttft,
+                "P50 ttft (ms)": report.ttft.p50_ttft,
+                "P99 ttft (ms)": report.ttft.p99_ttft,
+                "P50 itl (ms)": report.itl.p50_itl if report.itl else None,
+                "P99 itl (ms)": report.itl.p99_itl if report.itl else None,
+                "Avg latency (s)": report.latency.avg_latency,
+                "P99 latency (s)": report.latency.p99_latency,
+            }
+            for report, eff in zip(reports, efficiency)
+        ],
+    }
+
+
+def print_sweep_report(report: dict) -> None:
+    print("\n***** 📈 CONCURRENCY SWEEP *****")
+    print(
+        f"{'conc':>6} {'req/s':>9} {'tok/s':>10} {'dec tok/s':>10} {'eff':>6} "
+        f"{'ttft p50':>9} {'ttft p99':>9} {'itl p50':>8} {'itl p99':>8}"
+    )
+    for row in report["Sweep"]:
+        eff = row["Scaling efficiency"]
+        print(
+            f"{row['Concurrency']:>6} {row['Request per second (req/s)']:>9} "
+            f"{row['Throughput token (tok/s)']:>10} {row['Decode throughput (tok/s)']:>10} "
+            f"{eff if eff is not None else '-':>6} "
+            f"{row['P50 ttft (ms)']:>9} {row['P99 ttft (ms)']:>9} "
+            f"{row['P50 itl (ms)'] if row['P50 itl (ms)'] is not None else '-':>8} "
+            f"{row['P99 itl (ms)'] if row['P99 itl (ms)'] is not None else '-':>8}"
+        )
+
+    knee = report["Knee"]
+    if knee is None:
+        print("Knee: not reached, throughput still scales at the highest level")
+    else:
+        print(
+            f"Knee: concurrency {knee['Concurrency']} "
+            f"({knee['Decode throughput (tok/s)']} decode tok/s, P99 ttft {knee['P99 ttft (ms)']} ms)"
+        )
+
+
+async def save_sweep_report_as_file(data: dict, save_path: str) -> None:
+    async with await open_file(save_path, "w") as f:
+        encode_data = json.dumps(data, indent=2, ensure_ascii=True)
+        await f.write(encode_data)
@@ -0,0 +1,83 @@
+import math
+import random
+
+from type.prompt import Prompt
+from type.run_args import Args
+
+# Common words that are one token in GPT / Llama style BPE vocabularies and
+# four characters with the leading space, so the chars/4 heuristic agrees.
+VOCABULARY = (
+    " the", " and", " for", " you", " are", " not", " but", " can", " all",
+    " any", " one", " out", " our", " new", " now", " way", " who", " its",
+    " how", " may", " use", " her", " his", " get", " has", " had", " day",
+    " man", " old", " see", " two", " boy", " did", " own", " say", " too",
+    " big", " end", " far", " few", " run", " set", " try", " ask", " top",
+)
+DEFAULT_POOL_SIZE = 1000
+
+
+def random_text(rng: random.Random, num_tokens: int) -> str:
+    return "".join(rng.choices(VOCABULARY, k=num_tokens))
+
+
+def draw_lengths(
+    rng: random.Random, count: int, dist: str, mean: float, std: float
+) -> list[int]:
+    """``count`` token lengths (>= 1) with the given mean and standard deviation."""
+    if dist == "uniform":
+        # Same std as requested: half-width of a uniform is std * sqrt(3)
+        half = std * math.sqrt(3)
+        values = [rng.uniform(mean - half, mean + half) for _ in range(count)]
+    elif dist == "normal":
+        values = [rng.gauss(mean, std) for _ in range(count)]
+    elif dist == "lognormal":
+        sigma2 = math.log(1 + (std / mean) ** 2)
+        mu = math.log(mean) - sigma2 / 2
+        values = [rng.lognormvariate(mu, math.sqrt(sigma2)) for _ in range(count)]
+    else:
+        values = [mean] * count
+    return [max(round(value), 1) for value in values]
+
+
+def build_synthetic_prompts(args: Args, count: int) -> list[Prompt]:
+    """
+    Pre-generate ``count`` prompts so nothing is built on the request path.
+    A ``shared_prefix_ratio`` share of them start with the same
+    ``shared_prefix_len``-token prefix; the rest of every prompt is random
+    words, so only the intended prefix is cacheable.
+    """
+    rng = random.Random(args.seed)
+    prefix = random_text(rng, args.shared_prefix_len)
+    lengths = draw_lengths(
+        rng, count, args.input_len_dist, args.input_len, args.input_len_std
+    )
+    num_shared = round(count * args.shared_prefix_ratio) if args.shared_prefix_len else 0
+    shared = set(rng.sample(range(count), num_shared))
+
+    prompts = list()
+    for i, length in enumerate(lengths):
+        if i in shared:
+            unique = max(length - args.shared_prefix_len, 1)
+            text = prefix + random_text(rng, unique)
+            length = args.shared_prefix_len + unique
+        else:
+            text = random_text(rng, length)
+        prompts.append(Prompt(text=text.lstrip(), input_tokens=length, prompt_id=i))
+    return prompts
+
+
+def synthetic_pool_size(args: Args) -> int:
+    if args.num_prompts > 0:
+        return args.num_prompts
+    if args.num_request > 0:
+        return args.num_request
+    return DEFAULT_POOL_SIZE
+
+
+def synthetic_label(args: Args) -> str:
+    label = f"synthetic({args.input_len_dist} {args.input_len}"
+    if args.input_len_dist != "fixed":
+        label += f"±{args.input_len_std:g}"
+    if args.shared_prefix_len:
+        label += f", prefix {args.shared_prefix_len}x{args.shared_prefix_ratio:g}"
+    return label + ")"
@@ -0,0 +1,99 @@
+import bisect
+import math
+
+from type.metrics import RunnerBreakdown, TimeSeries, TimeWindow
+from type.ring_buffer import percentile
+from type.timeline import Timeline
+
+
+def _percentile(values: list[float], p: float, scale: float = 1.0) -> float | None:
+    return round(percentile(values, p) * scale, 2) if values else None
+
+
+def build_timeseries(timeline: Timeline, interval: float) -> TimeSeries:
+    """
+    Bucket every request of ``timeline`` into ``interval``-second windows by
+    its finish time, from the dispatch start to the last completion. The
+    last window may be shorter; its rates use its actual length.
+    """
+    columns = timeline.columns
+    span = timeline.span
+    count = max(math.ceil(span / interval), 1) if len(timeline) else 0
+    members: list[list[int]] = [list() for _ in range(count)]
+    for i, end in enumerate(columns["end"]):
+        members[min(int(end // interval), count - 1)].append(i)
+    # In flight at t = sent by t minus finished by t
+    starts = sorted(columns["start"])
+    ends = sorted(columns["end"])
+
+    windows = list()
+    for index, rows in enumerate(members):
+        start = index * interval
+        close = min(start + interval, span)
+        width = close - start
+        ttft, latency = list(), list()
+        errors = output_tokens = 0
+        for i in rows:
+            if math.isnan(columns["latency"][i]):
+                errors += 1
+                continue
+            ttft.append(columns["ttft"][i])
+            latency.append(columns["latency"][i])
+            output_tokens += columns["output_tokens"][i]
+        windows.append(
+            TimeWindow(
+                start=round(start, 3),
+                requests=len(rows),
+                errors=errors,
+                request_per_sec=round(len(rows) / width, 2) if width > 0 else 0.0,
+                decode_throughput=round(output_tokens / width, 2) if width > 0 else 0.0,
+                p50_ttft=_percentile(ttft, 50, 1000),
+                p99_ttft=_percentile(ttft, 99, 1000),
+                p50_latency=_percentile(latency, 50),
+                p99_latency=_percentile(latency, 99),
+                in_flight=bisect.bisect_right(starts, close) - bisect.bisect_right(ends, close),
+            )
+        )
+    return TimeSeries(interval=interval, windows=windows)
+
+
+def runner_breakdown(
+    timeline: Timeline,
+    concurrency: int,
+    duration: float,
+    span: tuple[float, float] | None = None,
+) -> list[RunnerBreakdown] | None:
+    """
+    One row per closed-loop concurrency slot, over the requests that finished
+    within ``span`` (the whole run when None). None when the requests carry
+    no slot (open loop, result logs written before slots were logged).
+    """
+    columns = timeline.columns
+    runners = columns["runner"]
+    if not len(runners) or max(runners) < 0:
+        return None
+    lo, hi = span if span is not None else (-math.inf, math.inf)
+    requests, successful = [0] * concurrency, [0] * concurrency
+    ttft, latency, token = [0.0] * concurrency, [0.0] * concurrency, [0.0] * concurrency
+    for i, runner in enumerate(runners):
+        if not 0 <= runner < concurrency or not lo <= columns["end"][i] <= hi:
+            continue
+        requests[runner] += 1
+        if math.isnan(columns["latency"][i]):
+            continue
+        successful[runner] += 1
+        ttft[runner] += columns["ttft"][i]
+        latency[runner] += columns["latency"][i]
+        token[runner] += max(columns["total_tokens"][i], 0)
+    return [
+        RunnerBreakdown(
+            runner=runner,
+            requests=requests[runner],
+            successful_requests=successful[runner],
+            request_per_sec=round(requests[runner] / duration, 2) if duration > 0 else 0.0,
+            avg_ttft=round(ttft[runner] / successful[runner] * 1000, 2) if successful[runner] else 0.0,
+            avg_latency=round(latency[runner] / successful[runner] * 1000, 2) if successful[runner] else 0.0,
+            avg_token=round(token[runner] / successful[runner], 2) if successful[runner] else 0.0,
+        )
+        for runner in range(concurrency)
+    ]
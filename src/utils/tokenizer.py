@@ -0,0 +1,36 @@
+HEURISTIC = "heuristic"
+# Rough English average for BPE vocabularies
+CHARS_PER_TOKEN = 4
+
+
+def heuristic_token_count(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class TokenCounter:
+    """Count tokens with a locally available tokenizer, else a chars/4 heuristic."""
+
+    def __init__(self, name: str | None):
+        self.name = HEURISTIC
+        self._tokenizer = None
+        if not name:
+            return
+        # Imported only when a tokenizer is asked for: transformers is slow to
+        # import and most runs count with the heuristic
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            print(f"transformers not installed, counting tokens with the {HEURISTIC} instead of {name}")
+            return
+        try:
+            # Never download during a benchmark run
+            self._tokenizer = AutoTokenizer.from_pretrained(name, local_files_only=True)
+            self.name = name
+        except Exception as e:
+            print(f"Tokenizer {name} not available locally ({e!r}), using the {HEURISTIC}")
+
+    def count(self, texts: list[str]) -> list[int]:
+        if self._tokenizer is None:
+            return [heuristic_token_count(text) for text in texts]
+        encoded = self._tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
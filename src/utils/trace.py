@@ -0,0 +1,78 @@
+import functools
+import random
+from typing import Literal
+
+import orjson
+
+from type.prompt import Prompt
+from utils.synthetic import random_text
+
+# Accepted field names, first match wins (native, then Mooncake/Azure style)
+_TIMESTAMP_KEYS = ("timestamp", "offset")
+_INPUT_TOKENS_KEYS = ("input_tokens", "input_length", "prompt_tokens")
+_OUTPUT_TOKENS_KEYS = ("max_tokens", "output_tokens", "output_length")
+
+
+def _first(record: dict, keys: tuple[str, ...]):
+    for key in keys:
+        value = record.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+@functools.lru_cache(maxsize=4)
+def load_trace(
+    path: str,
+    speed: float = 1.0,
+    time_unit: Literal["s", "ms"] = "s",
+    seed: int | None = None,
+) -> tuple[tuple[float, ...], tuple[Prompt, ...]]:
+    """
+    Read a JSONL request trace into send offsets (seconds from the first
+    record, divided by ``speed``) and the matching prompts.
+
+    Each line needs a ``timestamp`` and either a ``prompt`` or an
+    ``input_tokens`` length (filled with synthetic words, pre-generated
+    here so nothing is built at send time); ``max_tokens`` is optional.
+    Records are sorted by timestamp.
+    """
+    scale = (1000.0 if time_unit == "ms" else 1.0) * speed
+    rng = random.Random(seed)
+    records = list()
+    with open(path, "rb") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                raise RuntimeError(f"Trace {path}:{line_no}: JSON decode error") from None
+            timestamp = _first(record, _TIMESTAMP_KEYS)
+            if timestamp is None:
+                raise RuntimeError(f"Trace {path}:{line_no}: missing timestamp")
+            records.append((float(timestamp), line_no, record))
+    if not records:
+        raise RuntimeError(f"Trace {path} has no records")
+
+    records.sort(key=lambda item: item[0])
+    origin = records[0][0]
+    offsets, prompts = list(), list()
+    for timestamp, line_no, record in records:
+        text = record.get("prompt")
+        input_tokens = _first(record, _INPUT_TOKENS_KEYS)
+        if text is None:
+            if input_tokens is None:
+                raise RuntimeError(f"Trace {path}:{line_no}: needs prompt or input_tokens")
+            text = random_text(rng, int(input_tokens)).lstrip()
+        max_tokens = _first(record, _OUTPUT_TOKENS_KEYS)
+        offsets.append((timestamp - origin) / scale)
+        prompts.append(
+            Prompt(
+                text=text,
+                input_tokens=int(input_tokens) if input_tokens is not None else None,
+                max_tokens=max(int(max_tokens), 1) if max_tokens is not None else None,
+                prompt_id=line_no,
+            )
+        )
+    return tuple(offsets), tuple(prompts)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The benchmark modules import each other from src/ (``from utils...``)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+
+from utils.client_openai import _is_token_event, request_openai_format
+
+
+class _SSEStream(httpx.AsyncByteStream):
+    # Streamed body, one server-sent event per chunk
+    def __init__(self, *events: bytes):
+        self.events = events
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield b"data: " + event + b"\n\n"
+
+
+class _Body(httpx.AsyncByteStream):
+    # Streamed body that is not framed as server-sent events
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def __aiter__(self):
+        yield self.body
+
+
+def _request(stream: httpx.AsyncByteStream, error_record: list[dict] | None = None):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=stream))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await request_openai_format(
+                client,
+                "http://mock/v1/chat/completions",
+                {},
+                b"{}",
+                timeout=5,
+                error_record=error_record,
+            )
+
+    return asyncio.run(run())
+
+
+def test_only_deltas_with_text_are_tokens():
+    assert _is_token_event(b'{"choices":[{"delta":{"content":"hi"}}]}')
+    assert _is_token_event(b'{"choices":[{"delta":{"reasoning_content":"hm"}}]}')
+    assert _is_token_event(b'{"choices":[{"text": "hi"}]}')
+    assert not _is_token_event(b'{"choices":[{"delta":{"role":"assistant","content":""}}]}')
+    assert not _is_token_event(b'{"choices":[{"delta":{},"finish_reason":"stop"}]}')
+    assert not _is_token_event(b'{"choices":[{"delta":{"tool_calls":[{"index":0}]}}]}')
+    assert not _is_token_event(b'{"choices":[],"usage":{"completion_tokens":3}}')
+
+
+def test_empty_finish_delta_is_not_a_token():
+    stream = _SSEStream(
+        b'{"choices":[{"delta":{"role":"assistant","content":""}}]}',
+        b'{"choices":[{"delta":{"content":"a"}}]}',
+        b'{"choices":[{"delta":{"content":"b"}}]}',
+        b'{"choices":[{"delta":{"content":"c"}}]}',
+        b'{"choices":[{"delta":{},"finish_reason":"stop"}]}',
+        b"[DONE]",
+    )
+    result = _request(stream)
+    assert len(result.token_times) == 3
+    # No usage in the stream: the fallback counts content deltas
+    assert result.output_tokens == 3
+    assert result.num_chunks == 5
+
+
+def test_stream_without_events_is_a_failure():
+    error_record: list[dict] = list()
+    for stream in (_SSEStream(b"[DONE]"), _Body(b'{"error": {"message": "overloaded"}}')):
+        result = _request(stream, error_record)
+        assert result.status == 200
+        assert result.ttft is None
+        assert not result.success
+    assert len(error_record) == 2
+    assert "overloaded" in error_record[1]["response"]
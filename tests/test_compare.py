@@ -0,0 +1,77 @@
+import math
+import random
+
+from type.comparison import Estimate, MetricDelta
+from type.ring_buffer import percentile
+from utils.compare import (
+    bootstrap_percentile,
+    build_comparison_report,
+    compare_estimates,
+    comparison_status,
+)
+
+
+def test_bootstrap_percentile_matches_brute_force_resampling():
+    n, resamples = 200, 4000
+    ordered = [float(i) for i in range(n)]
+    for p in (50, 99):
+        estimate = bootstrap_percentile(ordered, p, resamples, random.Random(1))
+        assert estimate.value == percentile(ordered, p)
+
+        rng = random.Random(2)
+        brute = [percentile(rng.choices(ordered, k=n), p) for _ in range(resamples)]
+        # Same distribution of the resampled percentile: compare its quantiles
+        for q in (5, 25, 50, 75, 95):
+            assert abs(percentile(estimate.replicates, q) - percentile(brute, q)) <= 1
+        mean = sum(estimate.replicates) / resamples
+        assert abs(mean - sum(brute) / resamples) <= 0.5
+
+
+def _delta(regression: bool, gated: bool) -> MetricDelta:
+    return MetricDelta(
+        metric="P99 ttft (ms)",
+        baseline=100.0,
+        candidate=120.0 if regression else 100.0,
+        change=20.0 if regression else 0.0,
+        ci_low=(15.0 if regression else -1.0) if gated else None,
+        ci_high=(25.0 if regression else 1.0) if gated else None,
+        significant=regression and gated,
+        beyond_threshold=regression,
+        regression=regression and gated,
+    )
+
+
+def _status(*candidates: list[MetricDelta]) -> int:
+    report = build_comparison_report(
+        "base",
+        [(f"candidate {i}", deltas) for i, deltas in enumerate(candidates)],
+        threshold=5,
+        confidence=0.95,
+        resamples=1000,
+    )
+    return comparison_status(report)
+
+
+def test_comparison_status_exit_codes():
+    assert _status([_delta(regression=False, gated=True)]) == 0
+    assert _status([_delta(regression=True, gated=True)]) == 1
+    # Point values only: a 20% slowdown cannot be gated
+    assert _status([_delta(regression=True, gated=False)]) == 2
+    assert _status([_delta(regression=False, gated=True)], []) == 2
+    # A regression outranks a candidate that could not be gated
+    assert _status([_delta(regression=True, gated=True)], [_delta(False, False)]) == 1
+
+
+def test_regression_needs_an_interval_beyond_the_threshold():
+    rng = random.Random(3)
+    base = Estimate(value=100.0, replicates=[rng.gauss(100, 1) for _ in range(500)])
+    slower = Estimate(value=110.0, replicates=[rng.gauss(110, 1) for _ in range(500)])
+    (delta,) = compare_estimates({"P99 ttft (ms)": base}, {"P99 ttft (ms)": slower}, 5, 0.95)
+    assert math.isclose(delta.change, 10.0)
+    assert delta.significant and delta.regression
+    (delta,) = compare_estimates({"P99 ttft (ms)": base}, {"P99 ttft (ms)": slower}, 15, 0.95)
+    assert delta.significant and not delta.regression
+    (delta,) = compare_estimates(
+        {"P99 ttft (ms)": Estimate(100.0)}, {"P99 ttft (ms)": Estimate(110.0)}, 5, 0.95
+    )
+    assert delta.ci_low is None and delta.beyond_threshold and not delta.regression
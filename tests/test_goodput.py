@@ -0,0 +1,61 @@
+from type.request import RequestResult
+from type.samples import Samples
+from type.slo import SLO
+from utils.goodput import SLOTracker, allowed_violations, evaluate_slos, slos_met
+
+
+def _result(ttft: float) -> RequestResult:
+    return RequestResult(ttft=ttft, latency=ttft + 0.1, output_tokens=16)
+
+
+def test_allowed_violations_follow_the_percentile_rank():
+    # p99 of 40 requests is the 39th smallest: one violation still passes
+    assert allowed_violations(99, 40) == 1
+    assert allowed_violations(99, 101) == 1
+    assert allowed_violations(99, 201) == 2
+    assert allowed_violations(50, 11) == 5
+    assert allowed_violations(100, 40) == 0
+
+
+def test_single_early_outlier_does_not_fail_a_passing_step():
+    slo = SLO(metric="ttft", percentile=99, threshold_ms=80)
+    tracker = SLOTracker([slo], total_requests=40)
+    samples = Samples()
+    results = [_result(0.2)] + [_result(0.05)] * 39
+    for result in results:
+        tracker.observe(result)
+        samples.ttft.add(result.ttft)
+        samples.latency.add(result.latency)
+    assert not tracker.stop.is_set()
+    assert slos_met(samples, [slo])
+
+
+def test_step_stops_once_it_can_no_longer_pass():
+    slo = SLO(metric="ttft", percentile=99, threshold_ms=80)
+    tracker = SLOTracker([slo], total_requests=40)
+    tracker.observe(_result(0.2))
+    assert not tracker.stop.is_set()
+    tracker.observe(_result(0.2))
+    assert tracker.stop.is_set()
+
+
+def test_failed_requests_count_as_violations():
+    slo = SLO(metric="ttft", percentile=90, threshold_ms=80)
+    samples = Samples()
+    for result in [_result(0.05)] * 18:
+        samples.ttft.add(result.ttft)
+        samples.latency.add(result.latency)
+    # p90 of 20 requests is the 18th smallest, the last success
+    assert slos_met(samples, [slo], failures=2)
+    # p90 of 21 requests is the 19th smallest, a failed request
+    assert not slos_met(samples, [slo], failures=3)
+    assert evaluate_slos(samples, [slo], failures=3) == {slo.name: None}
+
+    tracker = SLOTracker([slo], total_requests=20)
+    tracker.observe(RequestResult())
+    tracker.observe(RequestResult())
+    assert tracker.violations[slo.name] == 2
+    assert tracker.met == 0
+    assert not tracker.stop.is_set()
+    tracker.observe(RequestResult())
+    assert tracker.stop.is_set()
@@ -0,0 +1,42 @@
+import random
+
+from type.histogram import Histogram
+from type.ring_buffer import percentile
+
+
+def test_percentiles_are_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-3, 1.5) for _ in range(20000)]
+    histogram = Histogram(relative_accuracy=0.01)
+    histogram.extend(values)
+    for q in (1, 10, 50, 90, 99, 99.9):
+        exact = percentile(values, q)
+        assert abs(histogram.percentile(q) - exact) <= 0.01 * exact * 1.0001
+    assert histogram.percentile(0) == min(values)
+    assert histogram.percentile(100) == max(values)
+    assert abs(histogram.mean - sum(values) / len(values)) < 1e-9
+
+
+def test_merge_matches_a_single_histogram():
+    rng = random.Random(11)
+    values = [rng.expovariate(20) for _ in range(5000)]
+    whole, left, right = Histogram(), Histogram(), Histogram()
+    whole.extend(values)
+    left.extend(values[:1234])
+    right.extend(values[1234:])
+    left.merge(right)
+    assert left.count == whole.count
+    assert left.min == whole.min and left.max == whole.max
+    assert abs(left.total - whole.total) < 1e-9
+    assert left.percentiles() == whole.percentiles()
+
+
+def test_out_of_range_values_are_clamped_to_the_observed_range():
+    histogram = Histogram(min_value=1e-3, max_value=10.0)
+    histogram.extend([1e-5] * 10 + [1.0] * 80 + [1e4] * 10)
+    # Underflow and overflow buckets report the exact min and max
+    assert histogram.percentile(5) == 1e-5
+    assert histogram.percentile(95) <= 1e4
+    assert histogram.percentile(95) >= 10.0 / (1 + histogram.relative_accuracy)
+    assert histogram.percentile(99.9) <= histogram.max == 1e4
+    assert abs(histogram.percentile(50) - 1.0) <= 0.01
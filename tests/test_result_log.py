@@ -0,0 +1,139 @@
+import math
+import struct
+
+import orjson
+
+from type.prompt import Prompt
+from type.request import RequestResult
+from utils import result_log
+from utils.result_log import (
+    ResultLog,
+    load_result_log,
+    samples_from_log,
+    shard_log_path,
+)
+
+HEADER = {"args": {}, "backends": ["http://127.0.0.1:8000"]}
+FOOTER = {"duration": 1.0}
+
+
+def _result(ttft: float, tokens: int) -> RequestResult:
+    return RequestResult(
+        ttft=ttft,
+        latency=ttft + 0.01 * (tokens - 1),
+        token=tokens + 8,
+        prompt_tokens=8,
+        output_tokens=tokens,
+        has_usage=True,
+        num_chunks=tokens,
+        token_times=[ttft + 0.01 * i for i in range(tokens)],
+        status=200,
+    )
+
+
+def _write_log(path: str, results: list[RequestResult], flush_after: int | None = None) -> None:
+    log = ResultLog(path, HEADER)
+    for i, result in enumerate(results):
+        log.append(result, 0.1 * i, 0.1 * i + (result.latency or 0.0), 0, Prompt("p", prompt_id=i))
+        if i + 1 == flush_after:
+            log.flush()
+    log.close(FOOTER)
+
+
+def test_round_trip_ignores_a_block_cut_short(tmp_path):
+    path = str(tmp_path / "run.rlog")
+    results = [
+        _result(0.05, 4),
+        _result(0.02, 8),
+        RequestResult(status=500),
+        _result(0.03, 1),
+        _result(0.04, 2),
+    ]
+    _write_log(path, results, flush_after=3)
+
+    header, footer, columns = load_result_log(path)
+    assert header["backends"] == HEADER["backends"]
+    assert footer == FOOTER
+    assert list(columns["prompt_id"]) == [0, 1, 2, 3, 4]
+    assert math.isnan(columns["latency"][2]) and columns["status"][2] == 500
+    assert columns["deltas"][1] == 8
+    assert math.isclose(columns["itl_mean"][1], 0.01)
+
+    samples = samples_from_log(columns, header["backends"])
+    assert samples.num_requests == 5
+    assert samples.latency.count == 4
+    assert samples.num_deltas == 4 + 8 + 1 + 2
+    assert samples.tpot.count == 3
+    assert samples.client_cpu_time is None
+
+    # A crash mid-write of the footer, then of the second batch
+    with open(path, "rb") as f:
+        data = f.read()
+    footer_size = struct.calcsize("<4sI") + len(orjson.dumps(FOOTER))
+    with open(path, "wb") as f:
+        f.write(data[: len(data) - 3])
+    _, footer, columns = load_result_log(path)
+    assert footer is None
+    assert len(columns["start"]) == 5
+    with open(path, "wb") as f:
+        f.write(data[: len(data) - footer_size - 10])
+    _, footer, columns = load_result_log(path)
+    assert footer is None
+    assert list(columns["prompt_id"]) == [0, 1, 2]
+    assert samples_from_log(columns, HEADER["backends"]).latency.count == 2
+
+
+def test_shard_logs_are_merged_in_order(tmp_path):
+    path = str(tmp_path / "run.rlog")
+    _write_log(path, [_result(0.01, 2)])
+    _write_log(shard_log_path(path, 0), [_result(0.02, 2), _result(0.03, 2)])
+    _write_log(shard_log_path(path, 1), [_result(0.04, 2)])
+
+    _, _, columns = load_result_log(path)
+    assert list(columns["ttft"]) == [0.01, 0.02, 0.03, 0.04]
+    assert all(len(column) == 4 for column in columns.values())
+
+
+def test_columns_missing_from_an_older_log_read_as_unknown(tmp_path):
+    path = str(tmp_path / "old.rlog")
+    # A log written before deltas and ITL were logged
+    old_columns = {
+        name: code
+        for name, code in result_log.COLUMNS.items()
+        if name not in ("end", "deltas", "itl_mean", "itl_max")
+    }
+    rows = {
+        "start": [0.0, 0.5],
+        "ttft": [0.05, math.nan],
+        "latency": [0.2, math.nan],
+        "output_tokens": [16, 0],
+        "total_tokens": [24, -1],
+        "input_tokens": [8, -1],
+        "num_chunks": [16, 0],
+        "status": [200, 0],
+        "backend": [0, 0],
+        "prompt_id": [0, 1],
+        "turn": [0, 0],
+        "runner": [-1, -1],
+    }
+    header = orjson.dumps({**HEADER, "columns": old_columns, "byteorder": "little"})
+    payload = struct.pack("<I", 2) + b"".join(
+        struct.pack(f"<2{code}", *rows[name]) for name, code in old_columns.items()
+    )
+    block = struct.Struct("<4sI")
+    with open(path, "wb") as f:
+        f.write(b"LBRL" + struct.pack("<I", 1))
+        f.write(block.pack(b"HEAD", len(header)) + header)
+        f.write(block.pack(b"ROWS", len(payload)) + payload)
+
+    _, footer, columns = load_result_log(path)
+    assert footer is None
+    assert list(columns) == list(result_log.COLUMNS)
+    assert list(columns["deltas"]) == [-1, -1]
+    assert all(math.isnan(value) for value in columns["itl_mean"])
+    assert all(math.isnan(value) for value in columns["end"])
+    assert list(result_log.finish_times(columns)) == [0.2, 0.5]
+
+    samples = samples_from_log(columns, HEADER["backends"])
+    assert samples.latency.count == 1
+    assert samples.num_deltas == 0